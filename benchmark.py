@@ -0,0 +1,552 @@
+import jwt
+import json
+import time
+import uuid
+import hashlib
+import threading
+import requests
+import numpy as np
+import pandas as pd
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs, urlencode, unquote
+
+from lib.datasets import find_gaps, get_empty_ranges, fill_gaps
+from lib.schema import concat_universe
+from lib.transport import HTTPTransport
+from lib.engines import UpbitExchanger, RateLimiter, KRXFetcher
+from lib.execution import ExecutionEngine
+from lib.portfolio import Portfolio
+from lib.metrics import MetricsRegistry
+from lib.backtest import SimulatedBookExchanger
+from lib.slicing import TWAPSlicer, IcebergSlicer
+from lib.store import OHLCVStore
+from lib.resample import resample_ohlcv
+from lib.screener import UniverseScreener
+from lib.indicators import add_indicators
+from lib.volume_profile import find_zones, VolumeProfile, scan_universe
+
+
+def _timeit(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def make_minute_candles(years=5, missing_ratio=0.05, seed=0):
+    """
+    벤치마크용 1분봉 데이터 생성 (missing_ratio 비율만큼 행을 비움)
+    """
+    rng = np.random.default_rng(seed)
+    index = pd.date_range('2019-01-01', periods=years * 365 * 24 * 60, freq='1min', name='timestamp')
+    close = 50000000 * np.exp(np.cumsum(rng.normal(0, 0.001, len(index))))
+    df = pd.DataFrame({
+        'open': close * (1 + rng.normal(0, 0.0005, len(index))),
+        'high': close * 1.001,
+        'low': close * 0.999,
+        'close': close,
+        'volume': rng.random(len(index)),
+    }, index=index)
+
+    keep = rng.random(len(index)) > missing_ratio
+    keep[0] = keep[-1] = True
+
+    return df[keep]
+
+
+def _legacy_get_empty_rows(df):
+    df.loc[:,'timestamp'] = pd.to_datetime(df.timestamp)
+    df = df.sort_values(by='timestamp')
+    all_timestamps = pd.date_range(start=df.timestamp.min(), end=df.timestamp.max(), freq='1min')
+    return list(set(all_timestamps) - set(df.timestamp))
+
+
+def _legacy_fill_empty_rows_volume_zero(df):
+    df.reset_index(inplace=True)
+    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    df['delta'] = df['timestamp'].diff()
+    common_delta = df['delta'].mode()[0]
+    full_range = pd.date_range(start=df['timestamp'].min(), end=df['timestamp'].max(), freq=common_delta)
+    new_df = pd.DataFrame(full_range, columns=['timestamp'])
+    df = new_df.merge(df, on='timestamp', how='left')
+    df['close'] = df['close'].ffill()
+    mask = df['open'].isna() & df['high'].isna() & df['low'].isna() & df['close'].notna()
+    df.loc[mask, ['open', 'high', 'low']] = df.loc[mask, 'close']
+    df['volume'] = df['volume'].fillna(0)
+    df.drop(columns=['delta'], inplace=True)
+    df.set_index('timestamp', inplace=True)
+    return df
+
+
+def bench_gap_fill(years=5):
+    """
+    lib.datasets 빈 행 검사/채우기 벤치마크 (기존 set/merge 방식 대비)
+    """
+    df = make_minute_candles(years=years)
+    print(f"[gap] {years}년 1분봉 {len(df):,}행")
+
+    legacy, _ = _timeit(_legacy_get_empty_rows, df.reset_index())
+    fast, _ = _timeit(get_empty_ranges, df.reset_index(), '1min')
+    print(f"[gap] 빈 행 검사  기존 {legacy:.3f}s / 신규 {fast:.3f}s ({legacy / fast:.1f}x)")
+    fast, gaps = _timeit(find_gaps, df.index, '1min')
+    print(f"[gap] find_gaps   {fast:.3f}s ({legacy / fast:.1f}x, 빈 구간 {len(gaps):,}개)")
+
+    legacy, _ = _timeit(_legacy_fill_empty_rows_volume_zero, df.copy())
+    fast, _ = _timeit(fill_gaps, df, '1min')
+    print(f"[gap] 빈 행 채우기 기존 {legacy:.3f}s / 신규 {fast:.3f}s ({legacy / fast:.1f}x)")
+
+    tickers = pd.concat([df.assign(ticker=t) for t in ['KRW-BTC', 'KRW-ETH', 'KRW-XRP']])
+    fast, _ = _timeit(fill_gaps, tickers, '1min', by='ticker')
+    print(f"[gap] 3종목 동시 채우기 {fast:.3f}s")
+
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        body = json.dumps([{'candle_date_time_utc': '2024-01-01T00:00:00'}]).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_local_server(handler):
+    """
+    벤치마크용 로컬 HTTP 서버를 띄우고 주소를 반환
+    """
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def bench_transport(n=500):
+    """
+    매 요청 새 연결(requests.get) 대비 keep-alive HTTPTransport 요청 속도 벤치마크
+    """
+    server, url = start_local_server(_JSONHandler)
+
+    def bare():
+        for _ in range(n):
+            requests.get(url + '/candles/days').json()
+
+    transport = HTTPTransport()
+
+    def pooled():
+        for _ in range(n):
+            transport.get(url + '/candles/days')
+
+    legacy, _ = _timeit(bare)
+    fast, _ = _timeit(pooled)
+    print(f"[http] {n}회 요청 requests.get {legacy:.3f}s / HTTPTransport {fast:.3f}s ({legacy / fast:.1f}x)")
+    print(f"[http] {transport.stats()}")
+    server.shutdown()
+
+
+class MockExchangeHandler(BaseHTTPRequestHandler):
+    """
+    Upbit 거래소 API(/accounts, /orders, /order)를 흉내 내는 로컬 모의 거래소
+    요청마다 latency초 지연하고, 주문은 다음 조회 때 체결(done)된다.
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.02
+    orders = {}
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, data, status=200):
+        body = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _read_json(self):
+        length = int(self.headers.get('Content-Length', 0))
+        return json.loads(self.rfile.read(length) or b'{}')
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        url = urlparse(self.path)
+        query = parse_qs(url.query)
+        if url.path.endswith('/accounts'):
+            return self._send([
+                {'currency': 'KRW', 'balance': '10000000', 'locked': '0', 'avg_buy_price': '0'},
+                {'currency': 'BTC', 'balance': '1', 'locked': '0', 'avg_buy_price': '50000000'},
+            ])
+        if url.path.endswith('/ticker'):
+            return self._send([{'market': m, 'trade_price': 1000.0} for m in query['markets'][0].split(',')])
+        with self.lock:
+            if url.path.endswith('/orders'):
+                uuids = query.get('uuids[]', list(self.orders))
+                for u in uuids:
+                    if u in self.orders:
+                        self.orders[u]['state'] = 'done'
+                return self._send([self.orders[u] for u in uuids if u in self.orders])
+            if url.path.endswith('/order'):
+                return self._send(self.orders.get(query['uuid'][0], {'error': {'name': 'order_not_found'}}))
+        self._send({'error': {'name': 'not_found'}}, 404)
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        params = self._read_json()
+        order = dict(params, uuid=str(uuid.uuid4()), state='wait')
+        with self.lock:
+            self.orders[order['uuid']] = order
+        self._send(order, 201)
+
+    def do_DELETE(self):
+        time.sleep(self.latency)
+        query = parse_qs(urlparse(self.path).query)
+        with self.lock:
+            order = self.orders.get(query['uuid'][0])
+            if order is not None and order['state'] == 'wait':
+                order['state'] = 'cancel'
+        self._send(order or {'error': {'name': 'order_not_found'}})
+
+
+def bench_execution(n=20):
+    """
+    n개 종목 리밸런싱: 종목마다 잔고 조회 + 주문을 순서대로 보내는 방식 대비 ExecutionEngine 속도 벤치마크
+    """
+    server, url = start_local_server(MockExchangeHandler)
+    exchanger = UpbitExchanger('access', 'secret' * 6, server_url=url, transport=HTTPTransport(),
+                               rate_limiter=RateLimiter(rate=1000), order_rate_limiter=RateLimiter(rate=1000))
+    decisions = [(f"KRW-C{i}", 'buy', 0.01, None) for i in range(n)]
+
+    def serial():
+        for ticker, _, percentage, _ in decisions:
+            krw = float([a for a in exchanger.get_account() if a['currency'] == 'KRW'][0]['balance'])
+            exchanger.request_order(ticker, 'bid', 'price', price=round(krw * percentage * 0.9995))
+
+    engine = ExecutionEngine(exchanger, poll_interval=0.05)
+
+    def concurrent():
+        engine.rebalance(decisions, wait=True)
+
+    legacy, _ = _timeit(serial)
+    fast, _ = _timeit(concurrent)
+    print(f"[execution] {n}개 종목 순차 주문 {legacy:.3f}s / ExecutionEngine(체결 확인 포함) {fast:.3f}s ({legacy / fast:.1f}x)")
+    server.shutdown()
+
+
+def bench_slicing(volume=4000, depth=500, resilience=10):
+    """
+    얇은 호가창(SimulatedBookExchanger)에서 시장가 주문 대비 TWAP, iceberg 매수의 slippage 비교
+    """
+    book = SimulatedBookExchanger(price=1000, depth=depth, resilience=resilience)
+    order = book.request_order('KRW-XRP', 'bid', 'market', volume=volume)
+    arrival = 1000.5
+    market = (order['executed_funds'] / order['executed_volume'] - arrival) / arrival * 10000
+    print(f"[slicing] 시장가 {volume} 매수 slippage {market:.1f} bps")
+
+    algorithms = {
+        'twap': lambda b: TWAPSlicer(b, b.get_orderbook, duration=300, slices=10, sleep=b.sleep, clock=b.clock),
+        'iceberg': lambda b: IcebergSlicer(b, b.get_orderbook, participation=0.5, refresh=5, sleep=b.sleep, clock=b.clock),
+    }
+    for name, make in algorithms.items():
+        book = SimulatedBookExchanger(price=1000, depth=depth, resilience=resilience)
+        report = make(book).run('KRW-XRP', 'bid', volume=volume)
+        print(f"[slicing] {name} slippage {report['slippage_bps']:.1f} bps, child {report['children']}개, "
+              f"{report['elapsed']:.0f}s, 미체결 {report['remaining']:.2f}")
+
+
+class MockKRXHandler(BaseHTTPRequestHandler):
+    """
+    KRX getJsonData.cmd를 흉내 내는 로컬 서버 (요청마다 latency초 지연, 문자열 숫자 응답)
+    """
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    latency = 0.05
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        time.sleep(self.latency)
+        length = int(self.headers.get('Content-Length', 0))
+        query = parse_qs(self.rfile.read(length).decode())
+        date = query['trdDd'][0]
+        output = [
+            {'ISU_CD': f'KR4101{m}000', 'ISU_NM': f'코스피200 F {m}', 'TDD_CLSPRC': f'{350 + i * 0.25:,.2f}',
+             'ACC_TRDVOL': f'{100000 + i:,}', 'ACC_TRDVAL': f'{12345678901234 + i:,}', 'ACC_OPNINT_QTY': '-' if i == 3 else f'{2000 + i:,}'}
+            for i, m in enumerate(['W3', 'W6', 'W9', 'WC'])
+        ]
+        body = json.dumps({'output': output, 'CURRENT_DATETIME': date}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def bench_schema(tickers=50, days=30):
+    """
+    전 종목 1분봉 메모리: 기존 방식(object ticker + float64) 대비 concat_universe(category ticker + float32)
+    """
+    df = make_minute_candles(years=1, missing_ratio=0)[:days * 1440]
+    frames = {f"KRW-C{i}": df for i in range(tickers)}
+
+    legacy = pd.concat([d.assign(ticker=t) for t, d in frames.items()])
+    compact, universe = _timeit(concat_universe, frames)
+    before = legacy.memory_usage(deep=True).sum() / 2 ** 20
+    after = universe.memory_usage(deep=True).sum() / 2 ** 20
+    print(f"[schema] {tickers}종목 {len(universe):,}행 메모리 {before:.0f}MB -> {after:.0f}MB ({after / before:.0%}), {compact:.2f}s")
+
+
+def bench_krx(days=250, cache_dir='./data/bench_krx'):
+    """
+    KRX 선물 기간 조회: 하루씩 순차 요청(기존 방식, sleep 제외) 대비 동시 요청, 캐시 재실행 속도
+    """
+    import shutil
+    shutil.rmtree(cache_dir, ignore_errors=True)
+    server, url = start_local_server(MockKRXHandler)
+    end = pd.Timestamp('2023-12-29')
+    start = end - pd.offsets.BDay(days - 1)
+
+    fetcher = KRXFetcher(transport=HTTPTransport(), cache_dir=None, rate_limiter=RateLimiter(rate=1000), max_workers=1, url=url)
+    legacy, _ = _timeit(fetcher.get_kospi200_future_range, start, end)
+
+    fetcher = KRXFetcher(transport=HTTPTransport(), cache_dir=cache_dir, rate_limiter=RateLimiter(rate=100), max_workers=8, url=url)
+    first, df = _timeit(fetcher.get_kospi200_future_range, start, end)
+    cached, _ = _timeit(fetcher.get_kospi200_future_range, start, end)
+
+    print(f"[krx] {days}일 순차 {legacy:.2f}s / 동시(초당 100회 제한) {first:.2f}s / 캐시 {cached:.3f}s")
+    print(f"[krx] dtypes {dict(df.dtypes.astype(str))}, {df.memory_usage(deep=True).sum() / 1024:.0f}KB")
+    server.shutdown()
+    shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def _legacy_authorization(access_key, secret_key, query=None):
+    # 기존 UpbitExchanger._get_authorization
+    payload = {'access_key': access_key, 'nonce': str(uuid.uuid4())}
+    if query != None:
+        query_string = unquote(urlencode(query, doseq=True)).replace("%5B%5D=", "[]=").encode("utf-8")
+        m = hashlib.sha512()
+        m.update(query_string)
+        payload['query_hash'] = m.hexdigest()
+        payload['query_hash_alg'] = 'SHA512'
+    return 'Bearer {}'.format(jwt.encode(payload, secret_key, algorithm="HS256"))
+
+
+def bench_signing(n=20000):
+    """
+    초당 서명 수: 기존 jwt.encode 방식 대비 UpbitExchanger._get_authorization
+    """
+    access_key, secret_key = 'access' * 7, 'secret' * 7
+    exchanger = UpbitExchanger(access_key, secret_key)
+    queries = {
+        'no query': None,
+        'order': {'market': 'KRW-BTC', 'side': 'bid', 'ord_type': 'price', 'price': 10000},
+        'cancel': {'uuid': str(uuid.uuid4())},
+    }
+    for name, query in queries.items():
+        legacy, _ = _timeit(lambda: [_legacy_authorization(access_key, secret_key, query) for _ in range(n)])
+        fast, _ = _timeit(lambda: [exchanger._get_authorization(query) for _ in range(n)])
+        print(f"[signing] {name}: jwt.encode {n / legacy:,.0f}/s / UpbitExchanger {n / fast:,.0f}/s ({legacy / fast:.1f}x)")
+
+
+def _notebook_zones(df):
+    # test/find_volume_profile_with__hdbscan.ipynb 방식: RobustScaler + HDBSCAN 군집별 close min/max
+    import hdbscan
+    from sklearn.preprocessing import RobustScaler
+    scaled = RobustScaler().fit_transform(df[['close']].to_numpy())
+    labels = hdbscan.HDBSCAN(min_cluster_size=20).fit_predict(scaled)
+    close = df['close'].to_numpy()
+    return [(close[labels == n].min(), close[labels == n].max()) for n in np.unique(labels) if n != -1]
+
+
+def bench_volume_profile(tickers=200, days=2000, root='./data/bench_store'):
+    """
+    전 종목 매물대: 노트북 HDBSCAN 방식(설치된 경우) 대비 find_zones, 저장소 전체 scan_universe, 캔들당 update 시간
+    """
+    import shutil
+    shutil.rmtree(root, ignore_errors=True)
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2019-01-01', periods=days, freq='D', name='timestamp')
+    store = OHLCVStore(f"{root}/upbit")
+    frames = {}
+    for i in range(tickers):
+        close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        frames[f"KRW-C{i}"] = pd.DataFrame({
+            'open': close, 'high': close * 1.02, 'low': close * 0.98, 'close': close, 'volume': rng.random(days) * 1000,
+        }, index=index)
+        store.write(frames[f"KRW-C{i}"], f"KRW-C{i}", 'days')
+
+    sample = list(frames.values())[:10]
+    try:
+        notebook, _ = _timeit(lambda: [_notebook_zones(df) for df in sample])
+        notebook = f"{notebook / len(sample) * 1000:.1f}ms"
+    except ImportError:
+        notebook = "hdbscan/sklearn 미설치"
+    fast, _ = _timeit(lambda: [find_zones(df) for df in sample])
+    print(f"[volume_profile] 종목당 HDBSCAN {notebook} / find_zones {fast / len(sample) * 1000:.2f}ms")
+
+    elapsed, zones = _timeit(scan_universe, 'days', store=store)
+    print(f"[volume_profile] 저장소 {len(zones)}종목 x {days}일 scan_universe {elapsed:.2f}s")
+
+    df = frames['KRW-C0']
+    profile = VolumeProfile(halflife=250).seed(df.iloc[:-500])
+    rows = df.iloc[-500:][['high', 'low', 'volume']].to_numpy()
+    update, _ = _timeit(lambda: [profile.update(*row) for row in rows])
+    zones_time, _ = _timeit(profile.zones)
+    print(f"[volume_profile] update {update / len(rows) * 1e6:.1f}us/캔들, zones {zones_time * 1000:.2f}ms")
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_resample(years=5):
+    """
+    1분봉 -> 상위 interval: pandas resample 대비 resample_ohlcv, 수집해야 하는 API 요청 수
+    """
+    df = make_minute_candles(years=years, missing_ratio=0.05)
+    targets = {'5m': '5min', '60m': '60min', '240m': '240min', 'days': '1D', 'weeks': 'W-MON', 'months': 'MS'}
+    agg = {'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last', 'volume': 'sum'}
+    for interval, rule in targets.items():
+        kwargs = {'closed': 'left', 'label': 'left'} if interval == 'weeks' else {}
+        legacy, _ = _timeit(lambda: df.resample(rule, **kwargs).agg(agg).dropna())
+        fast, _ = _timeit(resample_ohlcv, df, interval)
+        print(f"[resample] {len(df):,}행 -> {interval}: pandas {legacy:.3f}s / resample_ohlcv {fast:.3f}s ({legacy / fast:.1f}x)")
+
+    # 캔들 200개당 요청 1회: interval별로 따로 수집 vs 1m 하나만 수집
+    minutes = years * 365 * 1440
+    per_interval = {i: -(-minutes // m // 200) for i, m in [('1m', 1), ('5m', 5), ('60m', 60), ('240m', 240), ('days', 1440), ('weeks', 10080)]}
+    print(f"[resample] {years}년 API 요청 수: interval별 수집 {sum(per_interval.values()):,}회 / 1m만 수집 {per_interval['1m']:,}회")
+
+
+def _legacy_screen(frames):
+    # 종목마다 DataFrame으로 지표를 계산한 뒤 마지막 행만 모으는 방식
+    rows = {}
+    for ticker, df in frames.items():
+        df = add_indicators(df.copy())
+        close = df['close']
+        rows[ticker] = {
+            'momentum_7': close.iloc[-1] / close.iloc[-8] - 1,
+            'momentum_30': close.iloc[-1] / close.iloc[-31] - 1,
+            'volatility': np.log(close).diff().iloc[-20:].std(),
+            'volume_surge': df['volume'].iloc[-1] / df['volume'].iloc[-21:-1].mean(),
+            'trend': close.iloc[-1] / df['SMA_60'].iloc[-1] - 1,
+        }
+    return pd.DataFrame(rows).T.rank(pct=True).sum(axis=1).sort_values(ascending=False)
+
+
+def bench_screener(tickers=200, days=1000, root='./data/bench_screener'):
+    """
+    전 종목 screening: 종목별 pandas 지표 계산 대비 UniverseScreener (처음 읽기, 새 캔들 갱신, 계산만)
+    """
+    import shutil
+    shutil.rmtree(root, ignore_errors=True)
+    rng = np.random.default_rng(0)
+    index = pd.date_range('2021-01-01', periods=days, freq='D', name='timestamp')
+    store = OHLCVStore(root)
+    frames = {}
+    for i in range(tickers):
+        close = 10000 * np.exp(np.cumsum(rng.normal(0, 0.03, days)))
+        frames[f"KRW-C{i}"] = pd.DataFrame({
+            'open': close, 'high': close, 'low': close, 'close': close, 'volume': rng.random(days) * 1000,
+        }, index=index)
+        store.write(frames[f"KRW-C{i}"].iloc[:-1], f"KRW-C{i}", 'days')
+
+    legacy, _ = _timeit(lambda: _legacy_screen({t: store.read(t, 'days') for t in frames}))
+
+    screener = UniverseScreener(store=store)
+    first, _ = _timeit(screener.screen)
+    for ticker, df in frames.items():
+        store.write(df.iloc[-2:], ticker, 'days')
+    refresh, _ = _timeit(screener.screen)
+    compute, _ = _timeit(screener.screen, refresh=False)
+    print(f"[screener] {tickers}종목 x {days}일 종목별 pandas {legacy:.2f}s / UniverseScreener 처음 {first:.2f}s, 갱신 {refresh:.3f}s, 계산만 {compute:.3f}s")
+    shutil.rmtree(root, ignore_errors=True)
+
+
+def bench_portfolio(strategies=5, tickers=4):
+    """
+    전략 여러 개가 한 계좌로 주문: 주문마다 잔고 조회(기존 execute_buy_upbit) 대비 Portfolio (잔고 캐시 + 전략별 ledger)
+    """
+    server, url = start_local_server(MockExchangeHandler)
+    exchanger = UpbitExchanger('access', 'secret' * 6, server_url=url, transport=HTTPTransport(),
+                               rate_limiter=RateLimiter(rate=1000), order_rate_limiter=RateLimiter(rate=1000))
+    plans = {f"st{i}": [(f"KRW-C{j}", 'buy', 0.2, None) for j in range(tickers)] for i in range(strategies)}
+
+    def serial():
+        for decisions in plans.values():
+            for ticker, _, percentage, _ in decisions:
+                krw = float([a for a in exchanger.get_account() if a['currency'] == 'KRW'][0]['balance'])
+                exchanger.request_order(ticker, 'bid', 'price', price=round(krw * percentage * 0.9995))
+
+    engine = ExecutionEngine(exchanger, poll_interval=0.05, balance_ttl=60)
+    portfolio = Portfolio(engine, get_prices=exchanger.get_current_price, max_position=0.3, state_path=None)
+    engine.on_fill = portfolio.on_fill
+    for name in plans:
+        portfolio.allocate(name, 1000000)
+
+    def shared():
+        for name, decisions in plans.items():
+            orders = portfolio.plan(name, decisions)
+            portfolio.track(name, orders, engine.submit(orders))
+
+    legacy, _ = _timeit(serial)
+    fast, _ = _timeit(shared)
+    print(f"[portfolio] {strategies}개 전략 x {tickers}종목: 주문마다 잔고 조회 {legacy:.3f}s / Portfolio {fast:.3f}s ({legacy / fast:.1f}x)")
+    server.shutdown()
+
+
+def bench_metrics(observations=100000, names=20):
+    """
+    metrics 기록 비용: 빈 루프 대비 timer/observe/trace 관측당 시간과 summary/Prometheus 출력 시간
+    """
+    registry = MetricsRegistry()
+    labels = [f"KRW-C{i}" for i in range(names)]
+
+    def empty():
+        for i in range(observations):
+            pass
+
+    def timed():
+        for i in range(observations):
+            with registry.timer('bench', ticker=labels[i % names]):
+                pass
+
+    def observed():
+        for i in range(observations):
+            registry.observe('bench', 0.001, ticker=labels[i % names])
+
+    def traced():
+        for i in range(observations // 100):
+            with registry.trace('bench_trace'):
+                for j in range(100):
+                    registry.observe('bench', 0.001, ticker=labels[j % names])
+
+    base, _ = _timeit(empty)
+    timer, _ = _timeit(timed)
+    observe, _ = _timeit(observed)
+    trace, _ = _timeit(traced)
+    summary, _ = _timeit(registry.summary)
+    prometheus, _ = _timeit(registry.prometheus)
+    per = lambda t: (t - base) / observations * 1e6
+    print(f"[metrics] 관측당 timer {per(timer):.2f}μs / observe {per(observe):.2f}μs / trace 안 observe {per(trace):.2f}μs, "
+          f"{len(registry.stats)}개 metric summary {summary * 1000:.1f}ms / prometheus {prometheus * 1000:.1f}ms")
+
+
+if __name__ == "__main__":
+    bench_gap_fill()
+    bench_transport()
+    bench_execution()
+    bench_slicing()
+    bench_signing()
+    bench_krx()
+    bench_schema()
+    bench_volume_profile()
+    bench_resample()
+    bench_screener()
+    bench_portfolio()
+    bench_metrics()
@@ -0,0 +1,458 @@
+import uuid
+import numpy as np
+import pandas as pd
+
+from lib.utils import load_ohlcv
+
+
+class SimulatedExchanger:
+    """
+    UpbitExchanger와 같은 메서드를 제공하는 모의 거래소
+    Backtester가 봉마다 on_bar를 호출하면 대기 중인 주문을 체결한다.
+
+    - 시장가 주문은 다음 봉 시가에 slippage만큼 불리하게 체결
+    - 지정가 매수는 저가가, 지정가 매도는 고가가 주문 가격에 닿으면 주문 가격에 체결
+    - 체결 금액의 fee 비율만큼 수수료 차감 (Upbit 0.05%)
+
+    :param balance: 시작 KRW 잔고
+    :param fee: 수수료 비율
+    :param slippage: 시장가 주문 체결 가격에 더할 불리한 비율 (0.001 = 0.1%)
+    """
+    def __init__(self, balance=1000000, fee=0.0005, slippage=0.0):
+        self.fee = fee
+        self.slippage = slippage
+        self.balances = {'KRW': float(balance)}
+        self.avg_buy_prices = {}
+        self.orders = {}
+        self.trades = []
+        self.prices = {}
+        self.now = None
+
+    def _currency(self, ticker):
+        return ticker.split('-')[1]
+
+    def get_account(self):
+        """
+        자산 조회 메서드
+        """
+        return [
+            {'currency': c, 'balance': str(b), 'avg_buy_price': str(self.avg_buy_prices.get(c, 0))}
+            for c, b in self.balances.items() if b > 0 or c == 'KRW'
+        ]
+
+    def get_balance(self, currency='KRW'):
+        """
+        보유 수량 조회 메서드 (ticker를 넣어도 됨)
+        """
+        if '-' in currency:
+            currency = self._currency(currency)
+        return self.balances.get(currency, 0.0)
+
+    def request_order(self, ticker, side, ord_type, volume=None, price=None):
+        """
+        주문 요청 메서드 (인자는 UpbitExchanger.request_order와 동일)
+        """
+        order = {
+            'uuid': str(uuid.uuid4()),
+            'market': ticker,
+            'side': side,
+            'ord_type': ord_type,
+            'price': price,
+            'volume': volume,
+            'remaining_volume': volume,
+            'executed_volume': 0.0,
+            'executed_funds': 0.0,
+            'paid_fee': 0.0,
+            'state': 'wait',
+            'trades': [],
+            'created_at': self.now,
+        }
+        self.orders[order['uuid']] = order
+
+        return dict(order)
+
+    def get_order_list(self, done=False, uuids=None):
+        """
+        주문 리스트 조회 메서드
+
+        :param done: False - 미체결 주문 조회, True - 완료 주문 조회
+        :param uuids: 조회할 주문 UUID list (입력 시 상태와 관계없이 해당 주문만 조회)
+        """
+        if uuids:
+            return [dict(self.orders[u]) for u in uuids if u in self.orders]
+        states = ('done', 'cancel') if done else ('wait', 'watch')
+        return [dict(o) for o in self.orders.values() if o['state'] in states]
+
+    def get_order(self, uuid):
+        """
+        개별 주문 조회 메서드
+        """
+        return dict(self.orders[uuid])
+
+    def cancel_order(self, uuid):
+        """
+        주문 취소 메서드
+        """
+        order = self.orders[uuid]
+        if order['state'] == 'wait':
+            order['state'] = 'cancel'
+        return dict(order)
+
+    def _fill(self, order, price, volume):
+        currency = self._currency(order['market'])
+        amount = price * volume
+        fee = amount * self.fee
+
+        if order['side'] == 'bid':
+            if amount + fee > self.balances['KRW'] + 1e-9:
+                order['state'] = 'cancel'
+                return
+            held = self.balances.get(currency, 0.0)
+            self.avg_buy_prices[currency] = (self.avg_buy_prices.get(currency, 0.0) * held + amount) / (held + volume)
+            self.balances[currency] = held + volume
+            self.balances['KRW'] -= amount + fee
+        else:
+            volume = min(volume, self.balances.get(currency, 0.0))
+            amount = price * volume
+            fee = amount * self.fee
+            self.balances[currency] = self.balances.get(currency, 0.0) - volume
+            self.balances['KRW'] += amount - fee
+
+        # Upbit 주문 조회 응답과 같은 체결 필드 (ExecutionEngine, Portfolio가 사용)
+        order['state'] = 'done'
+        order['remaining_volume'] = 0.0
+        order['executed_volume'] = volume
+        order['executed_funds'] = amount
+        order['paid_fee'] = fee
+        order['trades'] = [{'price': price, 'volume': volume, 'funds': amount, 'created_at': self.now}]
+        self.trades.append({
+            'timestamp': self.now, 'ticker': order['market'], 'side': order['side'],
+            'price': price, 'volume': volume, 'fee': fee,
+        })
+
+    def on_bar(self, ticker, timestamp, open, high, low, close):
+        """
+        새 봉이 열릴 때 ticker의 대기 주문을 체결하는 메서드
+        """
+        self.now = timestamp
+        self.prices[ticker] = close
+
+        for order in list(self.orders.values()):
+            if order['state'] != 'wait' or order['market'] != ticker:
+                continue
+
+            side, ord_type = order['side'], order['ord_type']
+            if ord_type == 'price':
+                # 시장가 매수: price는 주문 총액
+                fill_price = open * (1 + self.slippage)
+                self._fill(order, fill_price, float(order['price']) / fill_price)
+            elif ord_type == 'market':
+                self._fill(order, open * (1 - self.slippage), float(order['volume']))
+            elif ord_type == 'limit':
+                price = float(order['price'])
+                if side == 'bid' and low <= price:
+                    self._fill(order, min(price, open), float(order['volume']))
+                elif side == 'ask' and high >= price:
+                    self._fill(order, max(price, open), float(order['volume']))
+
+    def equity(self):
+        """
+        현재 종가 기준 평가 금액
+        """
+        total = self.balances['KRW']
+        for currency, balance in self.balances.items():
+            if currency != 'KRW' and balance > 0:
+                total += balance * self.prices.get(f"KRW-{currency}", 0.0)
+        return total
+
+
+class SimulatedBookExchanger:
+    """
+    호가창을 흉내 내는 모의 거래소 (주문 분할 알고리즘 검증용)
+    - 주문은 반대편 호가를 주문 가격까지 순서대로 먹고, 남은 수량은 대기
+    - 먹힌 잔량은 resilience초 반감기로 처음 잔량까지 회복
+    - 대기 주문은 시간이 지나 회복된 반대편 호가가 주문 가격에 닿으면 체결
+    시간은 sleep(seconds)로만 진행되므로 OrderSlicer의 sleep, clock에 이 객체의 sleep, clock을 넘긴다.
+
+    :param ticker: 종목
+    :param price: 시작 최우선 매수 호가 (최우선 매도 호가는 price + tick)
+    :param tick: 호가 단위
+    :param depth: 단계별 잔량 (숫자면 모든 단계 같은 값, list면 단계별 값)
+    :param levels: 호가 단계 수
+    :param resilience: 잔량 회복 반감기 (초)
+    :param fee: 수수료 비율
+    """
+    def __init__(self, ticker='KRW-XRP', price=1000, tick=1, depth=1000, levels=15, resilience=10, fee=0.0005):
+        self.ticker = ticker
+        self.fee = fee
+        self.resilience = resilience
+        self.base = np.broadcast_to(np.asarray(depth, dtype=np.float64), (levels,)).copy()
+        self.prices = {
+            'ask': price + tick * np.arange(1, levels + 1),
+            'bid': price - tick * np.arange(levels),
+        }
+        self.sizes = {'ask': self.base.copy(), 'bid': self.base.copy()}
+        self.orders = {}
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        """
+        가상 시간을 seconds만큼 진행하고 잔량 회복 후 대기 주문을 체결하는 메서드
+        """
+        self.now += seconds
+        recover = 1 - 0.5 ** (seconds / self.resilience)
+        for key in ('ask', 'bid'):
+            self.sizes[key] += (self.base - self.sizes[key]) * recover
+        for order in self.orders.values():
+            if order['state'] == 'wait':
+                self._match(order)
+
+    def get_orderbook(self, ticker=None):
+        """
+        pyupbit.get_orderbook과 같은 형식의 현재 호가
+        """
+        units = [
+            {'ask_price': float(ap), 'bid_price': float(bp), 'ask_size': float(asz), 'bid_size': float(bsz)}
+            for ap, bp, asz, bsz in zip(self.prices['ask'], self.prices['bid'], self.sizes['ask'], self.sizes['bid'])
+        ]
+        return {
+            'market': self.ticker,
+            'timestamp': int(self.now * 1000),
+            'total_ask_size': float(self.sizes['ask'].sum()),
+            'total_bid_size': float(self.sizes['bid'].sum()),
+            'orderbook_units': units,
+        }
+
+    def _match(self, order):
+        # 매수는 매도 호가를, 매도는 매수 호가를 가격이 좋은 순서대로 먹음
+        key = 'ask' if order['side'] == 'bid' else 'bid'
+        prices, sizes = self.prices[key], self.sizes[key]
+        limit = order['price'] if order['ord_type'] == 'limit' else None
+
+        for i in range(len(prices)):
+            if order['ord_type'] == 'price':
+                left = (order['price'] - order['executed_funds']) / prices[i]
+            else:
+                left = order['remaining_volume']
+            if left <= 1e-12:
+                break
+            if limit is not None and ((key == 'ask' and prices[i] > limit) or (key == 'bid' and prices[i] < limit)):
+                break
+            take = min(left, sizes[i])
+            if take <= 0:
+                continue
+            sizes[i] -= take
+            funds = take * prices[i]
+            order['trades'].append({'price': float(prices[i]), 'volume': take, 'funds': funds, 'created_at': self.now})
+            order['executed_volume'] += take
+            order['executed_funds'] += funds
+            order['paid_fee'] += funds * self.fee
+            if order['ord_type'] != 'price':
+                order['remaining_volume'] -= take
+
+        if order['ord_type'] == 'limit':
+            if order['remaining_volume'] <= 1e-12:
+                order['state'] = 'done'
+        else:
+            # 시장가 주문은 남은 수량을 대기시키지 않음
+            order['state'] = 'done' if order['executed_volume'] > 0 else 'cancel'
+
+    def request_order(self, ticker, side, ord_type, volume=None, price=None):
+        """
+        주문 요청 메서드 (인자는 UpbitExchanger.request_order와 동일)
+        """
+        order = {
+            'uuid': str(uuid.uuid4()),
+            'market': ticker,
+            'side': side,
+            'ord_type': ord_type,
+            'price': float(price) if price is not None else None,
+            'volume': float(volume) if volume is not None else None,
+            'remaining_volume': float(volume) if volume is not None else 0.0,
+            'executed_volume': 0.0,
+            'executed_funds': 0.0,
+            'paid_fee': 0.0,
+            'state': 'wait',
+            'trades': [],
+            'created_at': self.now,
+        }
+        self._match(order)
+        self.orders[order['uuid']] = order
+
+        return dict(order, trades=list(order['trades']))
+
+    def get_order(self, uuid):
+        """
+        개별 주문 조회 메서드 (체결 내역 포함)
+        """
+        order = self.orders[uuid]
+        return dict(order, trades=list(order['trades']))
+
+    def get_order_list(self, done=False, uuids=None):
+        """
+        주문 리스트 조회 메서드
+        """
+        if uuids:
+            return [self.get_order(u) for u in uuids if u in self.orders]
+        states = ('done', 'cancel') if done else ('wait', 'watch')
+        return [self.get_order(u) for u, o in self.orders.items() if o['state'] in states]
+
+    def cancel_order(self, uuid):
+        """
+        주문 취소 메서드
+        """
+        order = self.orders[uuid]
+        if order['state'] == 'wait':
+            order['state'] = 'cancel'
+        return self.get_order(uuid)
+
+
+def execute_decision(exchanger, ticker, action, percentage, price=None):
+    """
+    trading.execute_buy_upbit / execute_sell_upbit와 같은 방식으로 결정을 주문으로 바꾸는 메서드
+    매수 시 수수료를 위해 금액의 0.9995만 사용
+
+    :return: 주문 dict, 주문하지 않으면 None
+    """
+    if action == 'buy':
+        amount = exchanger.get_balance('KRW') * percentage * 0.9995
+        if amount <= 0:
+            return None
+        if price:
+            return exchanger.request_order(ticker, 'bid', 'limit', volume=amount / price, price=price)
+        return exchanger.request_order(ticker, 'bid', 'price', price=amount)
+    elif action == 'sell':
+        volume = exchanger.get_balance(ticker) * percentage
+        if volume <= 0:
+            return None
+        if price:
+            return exchanger.request_order(ticker, 'ask', 'limit', volume=volume, price=price)
+        return exchanger.request_order(ticker, 'ask', 'market', volume=volume)
+    return None
+
+
+class Backtester:
+    """
+    저장된 OHLCV를 봉 단위로 재생하며 전략을 실행하는 이벤트 기반 백테스터
+
+    strategy(history)는 각 봉 마감 시점에 호출되며 history는 {ticker: 해당 시점까지의 DataFrame}이다.
+    반환값은 live 전략과 같은 (ticker, action, percentage, price) 또는 그 list, 아무것도 안 하면 None.
+    주문은 다음 봉부터 체결된다.
+
+    :param strategy: 전략 함수
+    :param data: {ticker: OHLCV DataFrame}
+    :param exchanger: SimulatedExchanger (비우면 기본값으로 생성)
+    """
+    def __init__(self, strategy, data, exchanger=None):
+        self.strategy = strategy
+        self.data = {t: df.sort_index() for t, df in data.items()}
+        self.exchanger = exchanger if exchanger is not None else SimulatedExchanger()
+
+    @classmethod
+    def from_store(cls, strategy, tickers, interval='days', start=None, end=None, source='upbit', exchanger=None):
+        """
+        ./data/store 저장소의 OHLCV로 Backtester를 만드는 메서드
+        """
+        data = {t: load_ohlcv(t, interval, start=start, end=end, source=source) for t in tickers}
+        return cls(strategy, data, exchanger)
+
+    def run(self):
+        """
+        :return: {'equity': 평가금액 Series, 'trades': 체결 DataFrame, 'stats': 성과 dict}
+        """
+        timeline = pd.DatetimeIndex(sorted(set().union(*[df.index for df in self.data.values()])))
+        positions = {t: df.index.get_indexer(timeline) for t, df in self.data.items()}
+        arrays = {t: df[['open', 'high', 'low', 'close']].to_numpy(dtype=np.float64) for t, df in self.data.items()}
+
+        equity = np.empty(len(timeline))
+        for i, timestamp in enumerate(timeline):
+            history = {}
+            for ticker, df in self.data.items():
+                pos = positions[ticker][i]
+                if pos >= 0:
+                    self.exchanger.on_bar(ticker, timestamp, *arrays[ticker][pos])
+                    history[ticker] = df.iloc[:pos + 1]
+
+            decisions = self.strategy(history)
+            if decisions is not None:
+                if isinstance(decisions, tuple):
+                    decisions = [decisions]
+                for decision in decisions:
+                    execute_decision(self.exchanger, *decision)
+
+            equity[i] = self.exchanger.equity()
+
+        equity = pd.Series(equity, index=timeline, name='equity')
+        trades = pd.DataFrame(self.exchanger.trades, columns=['timestamp', 'ticker', 'side', 'price', 'volume', 'fee'])
+
+        return {'equity': equity, 'trades': trades, 'stats': summarize(equity.to_numpy())}
+
+
+def summarize(equity, periods_per_year=365):
+    """
+    평가 금액 곡선의 성과 지표를 계산하는 메서드
+    마지막 축이 아닌 첫 축(시간)을 따라 계산하므로 (T, ...) 배열도 한 번에 처리
+
+    :param equity: 평가 금액 배열 (T,) 또는 (T, ...)
+    :param periods_per_year: 연간 봉 수 (일봉 365, 1분봉 525600)
+    :return: {'total_return', 'max_drawdown', 'sharpe'} dict
+    """
+    equity = np.asarray(equity, dtype=np.float64)
+    returns = equity[1:] / equity[:-1] - 1
+    peak = np.maximum.accumulate(equity, axis=0)
+    std = returns.std(axis=0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        sharpe = np.where(std > 0, returns.mean(axis=0) / std * np.sqrt(periods_per_year), 0.0)
+
+    return {
+        'total_return': equity[-1] / equity[0] - 1,
+        'max_drawdown': (equity / peak - 1).min(axis=0),
+        'sharpe': sharpe,
+    }
+
+
+def vectorized_backtest(close, signals, fee=0.0005, slippage=0.0, periods_per_year=365):
+    """
+    목표 비중(signal) 배열로 백테스트하는 벡터화 메서드
+    t 시점 종가에서 낸 signal은 t+1 봉부터 적용되며, 비중이 바뀐 만큼 fee + slippage 비용을 차감한다.
+
+    close의 NaN(상장 전 종목 등)은 직전 종가로 채우며, 직전 종가가 없으면 수익률 0으로 계산한다.
+
+    close와 signals는 첫 축이 시간이며 broadcasting 되므로
+    close (T, N)와 signals (T, N, P)처럼 종목 N개 × 파라미터 조합 P개를 한 번에 계산할 수 있다.
+
+    :param close: 종가 배열 (T,) 또는 (T, N)
+    :param signals: 목표 비중 배열 (0 ~ 1), close와 broadcasting 가능한 (T, ...) 배열
+    :return: {'equity': 평가 금액 배열 (시작 1.0), 'turnover': 총 비중 변화, 'stats': summarize 결과}
+    """
+    close = np.asarray(close, dtype=np.float64)
+    signals = np.asarray(signals, dtype=np.float64)
+    while close.ndim < signals.ndim:
+        close = close[..., np.newaxis]
+
+    # 상장 전/거래 없는 봉의 NaN 종가는 직전 종가로 채우고, 그래도 NaN인 구간(상장 전)은 수익률 0
+    # (NaN이 남으면 cumprod가 이후 모든 봉의 평가 금액을 NaN으로 만듦)
+    rows = np.where(np.isnan(close), 0, np.arange(len(close)).reshape((-1,) + (1,) * (close.ndim - 1)))
+    close = np.take_along_axis(close, np.maximum.accumulate(rows, axis=0), axis=0)
+    returns = np.zeros_like(close)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns[1:] = np.nan_to_num(close[1:] / close[:-1] - 1, nan=0.0, posinf=0.0, neginf=0.0)
+
+    # t 봉 수익률에는 t-1 봉까지의 signal을 적용
+    positions = np.zeros(np.broadcast_shapes(close.shape, signals.shape))
+    positions[1:] = signals[:-1]
+    positions = np.nan_to_num(positions)
+
+    changes = np.abs(np.diff(positions, axis=0, prepend=0))
+    strategy_returns = positions * returns - changes * (fee + slippage)
+    equity = np.cumprod(1 + strategy_returns, axis=0)
+
+    return {
+        'equity': equity,
+        'turnover': changes.sum(axis=0),
+        'stats': summarize(np.concatenate([np.ones((1,) + equity.shape[1:]), equity]), periods_per_year),
+    }
@@ -0,0 +1,75 @@
+import time
+import threading
+
+from collections import OrderedDict
+
+
+class TTLCache:
+    """
+    유효 시간(TTL)이 있는 thread-safe 캐시
+    get_or_compute는 같은 key를 동시에 요청하면 한 번만 계산하고 나머지는 그 결과를 기다린다.
+
+    :param ttl: 기본 유효 시간 (초)
+    :param maxsize: 최대 보관 개수 (넘으면 오래된 것부터 삭제)
+    """
+    def __init__(self, ttl=60, maxsize=1024):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+        self.key_locks = {}    # {key: [Lock, 기다리는 스레드 수]}, 계산 중인 key만 보관
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        with self.lock:
+            item = self.items.get(key)
+            if item is None or item[1] < time.monotonic():
+                return default
+            self.items.move_to_end(key)
+            return item[0]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self.lock:
+            self.items[key] = (value, expires_at)
+            self.items.move_to_end(key)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def get_or_compute(self, key, func, ttl=None):
+        """
+        캐시에 있으면 반환하고, 없으면 func()을 한 번만 실행해 저장한 뒤 반환하는 메서드
+        """
+        missing = object()
+        value = self.get(key, missing)
+        if value is not missing:
+            self.hits += 1
+            return value
+
+        with self.lock:
+            entry = self.key_locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+
+        try:
+            with entry[0]:
+                # 기다리는 동안 다른 스레드가 계산했으면 그 결과를 사용
+                value = self.get(key, missing)
+                if value is not missing:
+                    self.hits += 1
+                    return value
+
+                self.misses += 1
+                value = func()
+                self.set(key, value, ttl)
+                return value
+        finally:
+            # 마지막 스레드가 key lock을 지워서 key_locks가 요청한 key 수만큼 커지지 않게 함
+            with self.lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.key_locks[key]
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
@@ -1,65 +1,171 @@
+import numpy as np
 import pandas as pd
 
 
-def get_empty_rows(df):
+# Upbit interval별 캔들 주기 (months는 주기가 일정하지 않아 제외)
+INTERVAL_FREQ = {
+    '1m': '1min', '3m': '3min', '5m': '5min', '10m': '10min', '15m': '15min',
+    '30m': '30min', '60m': '60min', '240m': '240min',
+    'days': '1D', 'weeks': '7D',
+}
+
+
+def _to_epoch_ns(timestamps):
     """
-    DataFrame의 비어있는 행의 timestamp를 확인하는 메서드
-    
-    :param df: 검사할 DataFrame 
-    :return: 비어있는 행의 timestamp가 담겨있는 list
+    timestamp 컬럼/index를 int64 epoch-ns numpy 배열로 변환
     """
-    # timestamp 컬럼을 datetime 형식으로 변환
-    df.loc[:,'timestamp'] = pd.to_datetime(df.timestamp)
-    df = df.sort_values(by='timestamp')
+    return pd.DatetimeIndex(pd.to_datetime(timestamps)).as_unit('ns').asi8
 
-    # 모든 1분 간격의 timestamp 생성
-    start_date = df.timestamp.min()
-    end_date = df.timestamp.max()
-    all_timestamps = pd.date_range(start=start_date, end=end_date, freq='1T')
 
-    # 비어있는 행의 timestamp 확인
-    empty_rows_timestamp = list(set(all_timestamps) - set(df.timestamp))
+def _common_step(timestamps):
+    """
+    인접한 timestamp 간의 가장 흔한 차이(주기)를 ns 단위로 계산
+    서로 다른 timestamp가 2개보다 적어 주기를 알 수 없으면 None
+    """
+    deltas = np.diff(timestamps)
+    deltas = deltas[deltas > 0]
+    if len(deltas) == 0:
+        return None
+    values, counts = np.unique(deltas, return_counts=True)
+    return int(values[np.argmax(counts)])
+
 
-    return empty_rows_timestamp
+def find_gaps(timestamps, freq):
+    """
+    정렬된 timestamp 배열에서 비어있는 구간을 찾는 메서드
+
+    :param timestamps: 정렬된 int64 epoch-ns 배열 또는 DatetimeIndex
+    :param freq: 캔들 주기 (예: '1min', '1D')
+    :return: (구간 수, 2) int64 배열, 각 행은 [비어있는 첫 timestamp, 비어있는 마지막 timestamp]
+    """
+    timestamps = _to_epoch_ns(timestamps)
+    step = pd.Timedelta(freq).value
 
-def fill_empty_rows_volume_zero(df):
-    df.reset_index(inplace=True)
+    idx = np.flatnonzero(np.diff(timestamps) > step)
 
-    # 'timestamp' 열을 datetime 객체로 변환
-    df['timestamp'] = pd.to_datetime(df['timestamp'])
+    return np.column_stack([timestamps[idx] + step, timestamps[idx + 1] - step])
 
-    # 데이터 주기 계산
-    df['delta'] = df['timestamp'].diff()  # 인접한 timestamp 간의 차이 계산
-    common_delta = df['delta'].mode()[0]  # 가장 흔한 차이(주기) 계산
 
-    # 완전한 timestamp 시퀀스 생성
-    full_range = pd.date_range(start=df['timestamp'].min(), end=df['timestamp'].max(), freq=common_delta)
+def get_empty_ranges(df, freq='1min'):
+    """
+    비어있는 행을 연속된 구간으로 묶어 반환하는 메서드
 
-    # 새로운 DataFrame 생성 및 기존 데이터 병합
-    new_df = pd.DataFrame(full_range, columns=['timestamp'])
-    df = new_df.merge(df, on='timestamp', how='left')
+    :param df: 검사할 DataFrame ('timestamp' 컬럼 필요)
+    :param freq: 캔들 주기 (기본값: 1min)
+    :return: (구간 시작 timestamp, 구간 끝 timestamp) list
+    """
+    timestamps = np.sort(_to_epoch_ns(df['timestamp']))
+    gaps = find_gaps(timestamps, freq)
 
-    # 누락된 'close' 값들 채우기
-    df['close'].ffill(inplace=True)
+    starts = pd.DatetimeIndex(gaps[:, 0].view('datetime64[ns]'))
+    ends = pd.DatetimeIndex(gaps[:, 1].view('datetime64[ns]'))
 
-    # 'open', 'high', 'low'가 NaN이고 'close'에 값이 있는 행 찾기
-    mask = df['open'].isna() & df['high'].isna() & df['low'].isna() & df['close'].notna()
+    return list(zip(starts, ends))
 
-    # 해당 행들의 'open', 'high', 'low'를 'close' 값으로 채우기
-    df.loc[mask, ['open', 'high', 'low']] = df.loc[mask, 'close']
 
-    # 데이터에 adjclose 있으면 수행
-    if 'adjclose' in df.columns:
-        adjmask = df['adjclose'].isna() & df['close'].notna()
-        df.loc[adjmask, ['adjclose']] = df.loc[adjmask, 'close']
+def get_empty_rows(df, freq='1min'):
+    """
+    DataFrame의 비어있는 행의 timestamp를 확인하는 메서드
+    구간만 필요하면 get_empty_ranges, find_gaps를 사용
+    
+    :param df: 검사할 DataFrame 
+    :param freq: 캔들 주기 (기본값: 1min)
+    :return: 비어있는 행의 timestamp가 담겨있는 list
+    """
+    timestamps = np.sort(_to_epoch_ns(df['timestamp']))
+    gaps = find_gaps(timestamps, freq)
+    if len(gaps) == 0:
+        return []
 
-    # 누락된 'volume' 값 채우기
-    df['volume'] = df['volume'].fillna(0)
+    # 구간별 np.arange를 한 번에 펼침
+    step = pd.Timedelta(freq).value
+    lengths = (gaps[:, 1] - gaps[:, 0]) // step + 1
+    starts = np.repeat(gaps[:, 0], lengths)
+    offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    empty_rows_timestamp = starts + offsets * step
 
-    # 불필요한 'delta' 열 삭제
-    df.drop(columns=['delta'], inplace=True)
+    return list(pd.DatetimeIndex(empty_rows_timestamp))
 
-    # index를 timestamp로
-    df.set_index('timestamp', inplace=True)
+def fill_gaps(df, freq=None, by=None):
+    """
+    비어있는 행을 한 번에 채우는 메서드
+    close는 직전 값으로, open/high/low/adjclose는 채운 close로, volume은 0으로 채우고
+    나머지 컬럼은 NaN으로 둔다.
+
+    :param df: timestamp index 또는 'timestamp' 컬럼을 가진 DataFrame
+    :param freq: 캔들 주기 (비우면 가장 흔한 주기를 사용, 주기를 알 수 없으면 채우지 않고 반환)
+    :param by: 여러 종목을 함께 처리할 때 종목 구분 컬럼 이름 (예: 'ticker')
+    :return: timestamp index를 가진 DataFrame
+    """
+    if 'timestamp' in df.columns:
+        df = df.set_index('timestamp')
+    if len(df) == 0:
+        return df
+
+    timestamps = _to_epoch_ns(df.index)
+    if by is not None:
+        codes, groups = pd.factorize(df[by], sort=True)
+    else:
+        codes, groups = np.zeros(len(df), dtype=np.int64), None
+
+    # 종목, 시간 순으로 정렬
+    order = np.lexsort((timestamps, codes))
+    timestamps, codes = timestamps[order], codes[order]
+    step = pd.Timedelta(freq).value if freq is not None else _common_step(timestamps)
+    if step is None:
+        return df
+
+    # 종목별 시작/끝 위치와 채운 뒤의 행 수
+    n_groups = int(codes.max()) + 1 if len(codes) else 0
+    first = np.searchsorted(codes, np.arange(n_groups), side='left')
+    last = np.searchsorted(codes, np.arange(n_groups), side='right') - 1
+    t0 = timestamps[first]
+    sizes = (timestamps[last] - t0) // step + 1
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    # 원래 행이 들어갈 위치
+    positions = offsets[codes] + (timestamps - t0[codes]) // step
+    total = int(sizes.sum())
+
+    # 채울 행이 참조할 직전 원래 행 (각 종목의 첫 행은 항상 존재하므로 종목 경계를 넘지 않음)
+    source = np.full(total, -1, dtype=np.int64)
+    source[positions] = np.arange(len(positions))
+    source = np.maximum.accumulate(source)
+    missing = np.ones(total, dtype=bool)
+    missing[positions] = False
+
+    out_codes = np.repeat(np.arange(n_groups), sizes)
+    out_timestamps = np.repeat(t0, sizes) + (np.arange(total) - np.repeat(offsets, sizes)) * step
+
+    data = {}
+    close = df['close'].to_numpy(dtype=np.float64)[order][source] if 'close' in df.columns else None
+    for column in df.columns:
+        if column == by:
+            continue
+        values = df[column].to_numpy()[order]
+        if column == 'close':
+            data[column] = close
+        elif column in ('open', 'high', 'low', 'adjclose') and close is not None:
+            data[column] = np.where(missing, close, values[source])
+        elif column == 'volume':
+            data[column] = np.where(missing, 0, values[source])
+        else:
+            filled = values[source].astype(np.float64) if values.dtype.kind in 'iub' else values[source].copy()
+            filled[missing] = np.nan
+            data[column] = filled
+
+    result = pd.DataFrame(data, index=pd.DatetimeIndex(out_timestamps.view('datetime64[ns]'), name='timestamp'))
+    if by is not None:
+        result.insert(0, by, groups[out_codes])
+
+    return result
+
+def fill_empty_rows_volume_zero(df, freq=None):
+    """
+    비어있는 행을 거래량 0인 캔들로 채우는 메서드 (fill_gaps 참조)
 
-    return df
+    :param df: timestamp index 또는 'timestamp' 컬럼을 가진 DataFrame
+    :param freq: 캔들 주기 (비우면 가장 흔한 주기를 사용)
+    :return: timestamp index를 가진 DataFrame
+    """
+    return fill_gaps(df, freq=freq)
@@ -1,19 +1,97 @@
-import jwt
+import os
+import hmac
+import json
 import uuid
+import base64
 import hashlib
-import random
 
+import io
 import time
-import requests
+import threading
+import numpy as np
 import pandas as pd
 
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlencode, unquote
 
+from lib.transport import get_transport
+from lib.metrics import metrics
+from lib.schema import normalize_ohlcv, parse_krx_numbers
+
+try:
+    import exchange_calendars
+except ImportError:
+    exchange_calendars = None
+
+
+class RateLimiter:
+    """
+    토큰 버킷 방식의 요청 속도 제한기 (스레드 간 공유 가능)
+    Upbit 응답의 Remaining-Req 헤더로 남은 토큰 수를 서버 기준에 맞춰 보정한다.
+
+    :param rate: 초당 허용 요청 수 (Upbit 시세 조회 API 기본 10회/초)
+    :param capacity: 한 번에 몰아서 보낼 수 있는 최대 요청 수 (비우면 rate와 동일)
+    """
+    def __init__(self, rate=10, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self):
+        """
+        토큰 하나를 얻을 때까지 대기하는 메서드
+        """
+        while True:
+            with self.lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+    def update_from_header(self, remaining_req):
+        """
+        Remaining-Req 헤더 값으로 남은 토큰 수를 보정하는 메서드
+
+        :param remaining_req: 예시: 'group=candles; min=1800; sec=29'
+        """
+        if not remaining_req:
+            return
+        fields = dict(item.strip().split('=', 1) for item in remaining_req.split(';') if '=' in item)
+        if 'sec' not in fields:
+            return
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, float(fields['sec']))
+
+    def penalize(self, seconds=1.0):
+        """
+        429 응답을 받았을 때 seconds 동안 토큰 발급을 멈추는 메서드
+        """
+        with self.lock:
+            self._refill()
+            self.tokens = min(self.tokens, -seconds * self.rate)
+
 
 class UpbitOHLCVFetcher:
-    def __init__(self):
-        self.server_url = 'https://api.upbit.com/v1'
+    def __init__(self, server_url='https://api.upbit.com/v1', rate_limiter=None, transport=None):
+        """
+        :param server_url: API 서버 주소 (테스트 시 로컬 서버 주소로 변경 가능)
+        :param rate_limiter: 공유할 RateLimiter (비우면 초당 10회 제한기 생성)
+        :param transport: 공유할 HTTPTransport (비우면 기본 transport)
+        """
+        self.server_url = server_url
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(rate=10)
+        self.transport = transport if transport is not None else get_transport()
 
     def get_all_tickers_list(self, isDetails=False):
         """
@@ -26,32 +104,48 @@ class UpbitOHLCVFetcher:
             d = "false"
         url = f"{self.server_url}/market/all?isDetails={d}"
         headers = {"accept": "application/json"}
-        response = requests.get(url, headers=headers)
-        tickers = response.json()
+        _, tickers = self.transport.get(url, headers=headers, rate_limiter=self.rate_limiter)
 
         tickers_list = [item['market'] for item in tickers if 'market' in item and item['market'].startswith('KRW-')]
 
         return tickers_list
 
     def _convert_list_to_df(self, data_list):
-        
-        df = pd.DataFrame(data_list)
-        df = df[['candle_date_time_utc', 'opening_price', 'high_price', 'low_price', 'trade_price', 'candle_acc_trade_volume']]
-        df = df.rename(columns={
-            'candle_date_time_utc' : 'timestamp', 
-            'opening_price' : 'open',
-            'high_price' : 'high', 
-            'low_price' : 'low', 
-            'trade_price' : 'close', 
-            'candle_acc_trade_volume' : 'volume',
-        })
-        df.loc[:,'timestamp'] = pd.to_datetime(df.timestamp)
-        df = df[::-1].reset_index(drop=True)
-        df = df.set_index('timestamp')
+        """
+        Upbit 캔들 list(최신순)를 upbit schema의 DataFrame(과거순)으로 변환하는 메서드
+        """
+        data_list = data_list[::-1]
+        index = pd.DatetimeIndex(
+            pd.to_datetime([c['candle_date_time_utc'] for c in data_list], format='%Y-%m-%dT%H:%M:%S'),
+            name='timestamp',
+        ).as_unit('ns')
+        df = pd.DataFrame({
+            'open': np.array([c['opening_price'] for c in data_list], dtype=np.float64),
+            'high': np.array([c['high_price'] for c in data_list], dtype=np.float64),
+            'low': np.array([c['low_price'] for c in data_list], dtype=np.float64),
+            'close': np.array([c['trade_price'] for c in data_list], dtype=np.float64),
+            'volume': np.array([c['candle_acc_trade_volume'] for c in data_list], dtype=np.float64),
+        }, index=index)
 
         return df
 
-    def get_ohlcv(self, ticker, interval="days", start_date=datetime(2016,1,1), end_date=datetime.now(), count=200):
+    def _request_candles(self, url, params):
+        """
+        캔들 한 페이지를 요청하는 메서드
+        요청 전 rate_limiter에서 토큰을 얻고, 429/5xx 응답 시 transport가 backoff 후 재시도
+        페이지마다 rate limiter 대기와 재시도를 포함한 시간을 metrics의 ohlcv_page에 기록
+
+        :return: 캔들 dict의 list
+        """
+        headers = {"accept": "application/json"}
+        with metrics.timer('ohlcv_page', endpoint=url.rsplit('/candles/', 1)[-1]):
+            _, data = self.transport.get(url, headers=headers, params=params, rate_limiter=self.rate_limiter)
+
+        if isinstance(data, dict):
+            raise Exception(f"[Upbit] 캔들 조회 실패: {data}")
+        return data
+
+    def get_ohlcv(self, ticker, interval="days", start_date=datetime(2016,1,1), end_date=None, count=200):
         """
         과거 모든 OHLCV 데이터를 Pandas DataFrame으로 가져오는 메서드
 
@@ -60,6 +154,9 @@ class UpbitOHLCVFetcher:
         :param end_date: 수집할 마지막 캔들 시간의 datetime 비우면 현재 시간
         :return: Pandas DataFrame
         """
+        if end_date is None:
+            end_date = datetime.now()
+
         if interval[-1] == 'm':
             url = f"{self.server_url}/candles/minutes/{interval[:-1]}"
         else:
@@ -69,12 +166,10 @@ class UpbitOHLCVFetcher:
             "count": count, 
             "to": end_date.strftime("%Y-%m-%dT%H:%M:%S"),
         }
-        headers = {"accept": "application/json"}
 
         data_list = []
         while True:
-            response = requests.get(url, headers=headers, params=params)
-            data = response.json()
+            data = self._request_candles(url, params)
 
             if len(data) == 0:
                 break
@@ -86,18 +181,62 @@ class UpbitOHLCVFetcher:
             if pd.to_datetime(dt) < start_date:
                 break
 
-            time.sleep(0.101)
-
         df = self._convert_list_to_df(data_list)
 
         print(f"[Upbit] {ticker} {interval} OHLCV 수집 완료")
 
         return df
-    
+
+    def get_ohlcv_many(self, tickers, intervals=None, start_date=datetime(2016,1,1), end_date=None, max_workers=8, callback=None, fetch=None):
+        """
+        여러 ticker, interval의 OHLCV 데이터를 동시에 가져오는 메서드
+        모든 요청은 self.rate_limiter 하나를 공유하므로 전체 속도는 Upbit 요청 제한에 맞춰진다.
+        작업 하나가 실패해도(수집, callback 예외) 나머지 작업은 계속 진행하고 실패한 작업은 마지막에 모아서 보고한다.
+
+        :param tickers: 티커 list
+        :param intervals: interval list (비우면 ["days"])
+        :param max_workers: 동시에 수집할 (ticker, interval) 수
+        :param callback: 수집이 끝날 때마다 callback(ticker, interval, df) 호출. 지정하면 결과를 모아두지 않음
+        :param fetch: (ticker, interval)을 받아 DataFrame을 반환하는 함수 (비우면 get_ohlcv(start_date, end_date),
+            저장소 증분 수집처럼 작업 내용을 바꿀 때 사용)
+        :return: ({(ticker, interval): DataFrame}, {(ticker, interval): 예외})
+        """
+        intervals = ["days"] if intervals is None else intervals
+        if fetch is None:
+            fetch = lambda ticker, interval: self.get_ohlcv(ticker, interval, start_date, end_date)
+
+        jobs = [(ticker, interval) for ticker in tickers for interval in intervals]
+        results, failures = {}, {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {executor.submit(fetch, ticker, interval): (ticker, interval) for ticker, interval in jobs}
+            for future in as_completed(futures):
+                ticker, interval = futures[future]
+                try:
+                    df = future.result()
+                    if callback is not None:
+                        callback(ticker, interval, df)
+                    else:
+                        results[(ticker, interval)] = df
+                except Exception as e:
+                    print(f"[Upbit] {ticker} {interval} OHLCV 수집 실패: {e}")
+                    failures[(ticker, interval)] = e
+
+        if failures:
+            print(f"[Upbit] {len(jobs)}개 중 {len(failures)}개 수집 실패: {sorted(failures)}")
+
+        return results, failures
+
 
 class YHFOHLCVFetcher:
-    def __init__(self):
+    def __init__(self, transport=None):
         self.server_url = "https://query1.finance.yahoo.com/v7"
+        self.transport = transport if transport is not None else get_transport()
+
+    def _read_csv(self, url):
+        response, _ = self.transport.get(url, parse_json=False)
+        response.raise_for_status()
+        return pd.read_csv(io.StringIO(response.text), parse_dates=True)
 
     def get_ohlcv(self, ticker, interval="1d", start_date=None, end_date=None):
         """
@@ -128,7 +267,7 @@ class YHFOHLCVFetcher:
         url = f"{self.server_url}/finance/download/{ticker}"
         params = f"?interval={interval}&period1={period1}&period2={period2}&events=history&includeAdjustedClose=true"
         
-        df = pd.read_csv(url+params, parse_dates=True)
+        df = self._read_csv(url+params)
         df = df[['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
         df = df.rename(columns={
             'Date' : 'timestamp', 
@@ -139,8 +278,7 @@ class YHFOHLCVFetcher:
             'Adj Close' : 'adjclose',
             'Volume' : 'volume',
         })
-        df = df.set_index('timestamp')
-
+        df = normalize_ohlcv(df.set_index('timestamp'), source='yf')
 
         print(f"[YahooFinance] {ticker} {interval} 수집 완료")
 
@@ -150,7 +288,7 @@ class YHFOHLCVFetcher:
         url = f"{self.server_url}/finance/download/{ticker}"
         params = f"?interval={interval}&events=history&includeAdjustedClose=true"
         
-        df = pd.read_csv(url+params, parse_dates=True)
+        df = self._read_csv(url+params)
         df = df[['Date', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
         df = df.rename(columns={
             'Date' : 'timestamp', 
@@ -161,51 +299,91 @@ class YHFOHLCVFetcher:
             'Adj Close' : 'adjclose',
             'Volume' : 'volume',
         })
-        df = df.set_index('timestamp')
+        df = normalize_ohlcv(df.set_index('timestamp'), source='yf')
 
         return df
 
 
+def _b64url(data):
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode('ascii')
+
+
+# 거래소 API query에 그대로 써도 되는 문자 (이 문자만 있으면 urlencode/unquote 없이 query string 생성)
+_SAFE_QUERY_CHARS = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_.[]')
+
+
 class UpbitExchanger:
-    def __init__(self, access_key, secret_key):
-        self.server_url = 'https://api.upbit.com/v1'
+    JWT_HEADER = _b64url(b'{"alg":"HS256","typ":"JWT"}')
+
+    def __init__(self, access_key, secret_key, server_url='https://api.upbit.com/v1', transport=None, rate_limiter=None, order_rate_limiter=None):
+        """
+        :param server_url: API 서버 주소 (테스트 시 로컬 모의 거래소 주소로 변경 가능)
+        :param rate_limiter: 주문 외 거래소 API 속도 제한기 (기본 30회/초)
+        :param order_rate_limiter: 주문 요청 속도 제한기 (기본 8회/초)
+        """
+        self.server_url = server_url
         self.access_key = access_key
         self.secret_key = secret_key
+        self.transport = transport if transport is not None else get_transport()
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(rate=30)
+        self.order_rate_limiter = order_rate_limiter if order_rate_limiter is not None else RateLimiter(rate=8)
+
+        # 서명 준비: HMAC key 설정과 payload의 고정 부분 base64는 한 번만 계산
+        # prefix를 공백으로 3바이트 배수에 맞추면 prefix의 base64 뒤에 나머지의 base64를 그대로 이어 붙일 수 있다.
+        self.signer = hmac.new((secret_key or '').encode('utf-8'), digestmod=hashlib.sha256)
+        prefix = ('{"access_key":' + json.dumps(access_key) + ',').encode('utf-8')
+        prefix += b' ' * (-len(prefix) % 3)
+        self.payload_prefix = self.JWT_HEADER + '.' + _b64url(prefix)
+        self.query_hashes = {}
+
+    def _query_string(self, query):
+        parts = []
+        for key, value in query.items():
+            values = value if isinstance(value, (list, tuple)) else [value]
+            for v in values:
+                part = f"{key}={v}"
+                if not _SAFE_QUERY_CHARS.issuperset(part.replace('=', '', 1)):
+                    # 특수 문자가 있으면 기존 방식으로 생성
+                    return unquote(urlencode(query, doseq=True)).replace("%5B%5D=", "[]=")
+                parts.append(part)
+        return '&'.join(parts)
+
+    def _query_hash(self, query):
+        query_string = self._query_string(query)
+        query_hash = self.query_hashes.get(query_string)
+        if query_hash is None:
+            if len(self.query_hashes) >= 1024:
+                self.query_hashes.clear()
+            query_hash = hashlib.sha512(query_string.encode('utf-8')).hexdigest()
+            self.query_hashes[query_string] = query_hash
+        return query_hash
 
     def _get_authorization(self, query=None):
         """
         requests 시에 headers에 사용할 authorization 생성 메서드
         params 입력 시 SHA512 사용
-        """
-        payload = {
-            'access_key': self.access_key,
-            'nonce': str(uuid.uuid4()),
-        }
 
+        Upbit는 같은 nonce를 다시 받지 않으므로 token은 매번 새로 만들고,
+        nonce와 query_hash를 뺀 나머지(JWT header, access_key 부분, HMAC key)는 미리 계산한 값을 사용한다.
+        """
+        payload = '"nonce":"' + str(uuid.uuid4()) + '"'
         if query != None:
-            query_string = unquote(urlencode(query, doseq=True)).replace("%5B%5D=", "[]=").encode("utf-8")
-
-            m = hashlib.sha512()
-            m.update(query_string)
-            query_hash = m.hexdigest()
+            payload += ',"query_hash":"' + self._query_hash(query) + '","query_hash_alg":"SHA512"'
 
-            payload['query_hash'] = query_hash
-            payload['query_hash_alg'] = 'SHA512'
+        signing_input = self.payload_prefix + _b64url((payload + '}').encode('utf-8'))
+        signer = self.signer.copy()
+        signer.update(signing_input.encode('ascii'))
 
-        jwt_token = jwt.encode(payload, self.secret_key, algorithm="HS256")
-        authorization = 'Bearer {}'.format(jwt_token)
-
-        return authorization
+        return 'Bearer ' + signing_input + '.' + _b64url(signer.digest())
 
     def get_account(self):
         """
         자산 조회 메서드
         """
-        authorization = self._get_authorization()
-        headers = {'Authorization': authorization}
-        res = requests.get(self.server_url + '/accounts', headers=headers)
+        headers = lambda: {'Authorization': self._get_authorization()}
+        _, data = self.transport.get(self.server_url + '/accounts', headers=headers, rate_limiter=self.rate_limiter)
 
-        return res.json()
+        return data
     
     def request_order(self, ticker, side, ord_type, volume=None, price=None):
         """
@@ -228,28 +406,65 @@ class UpbitExchanger:
         if ord_type == 'limit' or ord_type == 'market':
             params['volume'] = volume
 
-        authorization = self._get_authorization(query=params)
-        headers = {'Authorization': authorization}
-        res = requests.post(self.server_url + '/orders', json=params, headers=headers)
+        # 주문은 중복 실행되면 안 되므로 429(요청 거부)일 때만 재시도
+        headers = lambda: {'Authorization': self._get_authorization(query=params)}
+        _, data = self.transport.post(
+            self.server_url + '/orders', json=params, headers=headers, rate_limiter=self.order_rate_limiter, idempotent=False
+        )
 
-        return res.json()
+        return data
     
-    def get_order_list(self, done=False):
+    def get_orderbook(self, ticker):
+        """
+        호가 조회 메서드 (인증 불필요, pyupbit.get_orderbook과 같은 형식)
+
+        :param ticker: 조회할 ticker
+        """
+        _, data = self.transport.get(self.server_url + '/orderbook', params={'markets': ticker}, rate_limiter=self.rate_limiter)
+
+        return data[0]
+
+    def get_current_price(self, tickers):
+        """
+        현재가 조회 메서드 (인증 불필요, 여러 종목을 한 번에 조회)
+
+        :param tickers: 조회할 ticker list
+        :return: {ticker: 현재가}
+        """
+        _, data = self.transport.get(self.server_url + '/ticker', params={'markets': ','.join(tickers)}, rate_limiter=self.rate_limiter)
+
+        return {d['market']: float(d['trade_price']) for d in data}
+
+    def get_order_list(self, done=False, uuids=None):
         """
         주문 리스트 조회 메서드
 
         :param done: False - 미체결 주문 조회, True - 완료 주문 조회
+        :param uuids: 조회할 주문 UUID list (입력 시 상태와 관계없이 해당 주문만 조회)
         """
-        if done:
+        if uuids:
+            params = {'uuids[]': list(uuids)}
+        elif done:
             params = {'states[]': ['done', 'cancel']}
         else:
             params = {'states[]': ['wait', 'watch']}
     
-        authorization = self._get_authorization(query=params)
-        headers = {'Authorization': authorization}
-        res = requests.post(self.server_url + '/orders', json=params, headers=headers)
+        headers = lambda: {'Authorization': self._get_authorization(query=params)}
+        _, data = self.transport.get(self.server_url + '/orders', params=params, headers=headers, rate_limiter=self.rate_limiter)
+
+        return data
 
-        return res.json()
+    def get_order(self, uuid):
+        """
+        개별 주문 조회 메서드 (체결 내역 포함)
+
+        :param uuid: 조회할 주문의 UUID
+        """
+        params = {'uuid': uuid}
+        headers = lambda: {'Authorization': self._get_authorization(query=params)}
+        _, data = self.transport.get(self.server_url + '/order', params=params, headers=headers, rate_limiter=self.rate_limiter)
+
+        return data
 
     def cancel_order(self, uuid):
         """
@@ -260,15 +475,63 @@ class UpbitExchanger:
         params = {
             'uuid': uuid
         }
-        authorization = self._get_authorization(query=params)
-        headers = {'Authorization': authorization}
-        res = requests.post(self.server_url + '/order', json=params, headers=headers)
+        headers = lambda: {'Authorization': self._get_authorization(query=params)}
+        _, data = self.transport.delete(
+            self.server_url + '/order', params=params, headers=headers, rate_limiter=self.rate_limiter
+        )
+
+        return data
+
+_default_exchanger = None
+_exchanger_lock = threading.Lock()
+
+
+def get_upbit_exchanger():
+    """
+    trading.py와 전략 모듈이 함께 쓰는 UpbitExchanger (UPBIT_ACCESS_KEY, UPBIT_SECRET_KEY 환경 변수 사용)
+    하나의 객체를 공유해 주문/조회 속도 제한을 프로세스 전체에서 지킨다.
+    """
+    global _default_exchanger
+    with _exchanger_lock:
+        if _default_exchanger is None:
+            _default_exchanger = UpbitExchanger(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+        return _default_exchanger
+
+def krx_trading_days(start, end):
+    """
+    start ~ end 사이의 KRX 거래일 list ('YYYYMMDD')
+    exchange_calendars 패키지가 있으면 XKRX 휴장일을 반영하고, 없으면 평일을 모두 사용한다.
+    (휴장일 요청은 빈 응답이 캐시되므로 두 번째부터는 요청하지 않음)
+    """
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if exchange_calendars is not None:
+        calendar = exchange_calendars.get_calendar("XKRX")
+        first, last = max(start, calendar.first_session), min(end, calendar.last_session)
+        days = calendar.sessions_in_range(first, last)
+    else:
+        days = pd.bdate_range(start, end)
+    return list(days.strftime('%Y%m%d'))
 
-        return res.json()
 
 class KRXFetcher:
-    def __init__(self):
-        self.url = "http://data.krx.co.kr/comm/bldAttendant/getJsonData.cmd"
+    """
+    KRX 정보데이터시스템 조회 클래스
+    일자별 조회 결과(raw JSON)를 cache_dir/{stat}/{prodId}/{date}.json에 저장해 같은 날짜를 다시 받지 않는다.
+    단위(share, money) 등 조회 옵션이 기본값이 아니면 {date}_s{share}_m{money}_c{csvxls_isNo}.json에 따로 저장한다.
+    오늘 이후 날짜는 장중 값이 바뀔 수 있으므로 캐시하지 않는다.
+
+    :param transport: HTTP 요청 계층 (비우면 공유 transport)
+    :param cache_dir: 응답 캐시 폴더 (None이면 캐시 사용 안 함)
+    :param rate_limiter: 요청 속도 제한기 (기본 초당 2회, KRX 서버 부담을 줄이기 위함)
+    :param max_workers: 기간 조회 시 동시 요청 수
+    :param url: 조회 주소 (테스트 시 로컬 서버 주소로 변경 가능)
+    """
+    def __init__(self, transport=None, cache_dir="./data/krx", rate_limiter=None, max_workers=4, url="http://data.krx.co.kr/comm/bldAttendant/getJsonData.cmd"):
+        self.transport = transport if transport is not None else get_transport()
+        self.cache_dir = cache_dir
+        self.rate_limiter = rate_limiter if rate_limiter is not None else RateLimiter(rate=2)
+        self.max_workers = max_workers
+        self.url = url
         self.headers = {
             "Accept": "application/json, text/javascript, */*; q=0.01",
             "Accept-Language": "ko-KR,ko;q=0.9,en;q=0.8",
@@ -279,24 +542,77 @@ class KRXFetcher:
             "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
             "X-Requested-With": "XMLHttpRequest",
         }
-    
-    def get_kospi200_future(self, date, share=1, money=1, csvxls_isNo='false'):
+
+    def _cache_path(self, stat, prod_id, date, share=1, money=1, csvxls_isNo='false'):
+        # 단위가 다른 응답이 같은 캐시를 쓰지 않도록 기본값이 아닌 옵션은 파일 이름에 포함 (기본값은 기존 캐시 이름 유지)
+        if (str(share), str(money), str(csvxls_isNo)) == ('1', '1', 'false'):
+            name = f"{date}.json"
+        else:
+            name = f"{date}_s{share}_m{money}_c{csvxls_isNo}.json"
+        return os.path.join(self.cache_dir, stat, prod_id, name)
+
+    def _fetch_daily(self, stat, prod_id, date, share=1, money=1, csvxls_isNo='false'):
         """
-        코스피 200 선물 조회
+        일자별 파생상품 조회 결과(output list)를 반환하는 메서드 (캐시가 있으면 캐시 사용)
         """
-        stat = "MDCSTAT12501"
-        prod_id = "KRDRVFUK2I"
+        path = self._cache_path(stat, prod_id, date, share, money, csvxls_isNo) if self.cache_dir else None
+        if path is not None and os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                return json.load(file)
 
-        response = requests.post(
-            url=self.url,
+        _, data = self.transport.post(
+            self.url,
             headers=self.headers,
+            rate_limiter=self.rate_limiter,
             data=f"bld=dbms/MDC/STAT/standard/{stat}&locale=ko_KR&trdDd={date}&prodId={prod_id}&trdDdBox1={date}&trdDdBox2={date}&mktTpCd=T&rghtTpCd=T&share={share}&money={money}&csvxls_isNo={csvxls_isNo}"
         )
+        output = data['output']
+
+        if path is not None and date < datetime.now().strftime('%Y%m%d'):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            temp = f"{path}.tmp"
+            with open(temp, 'w', encoding='utf-8') as file:
+                json.dump(output, file, ensure_ascii=False)
+            os.replace(temp, path)
+
+        return output
+
+    def _fetch_range(self, stat, prod_id, start_date, end_date, **kwargs):
+        """
+        거래일마다 _fetch_daily를 동시에 실행해 하나의 DataFrame으로 합치는 메서드
+
+        :return: date 컬럼(datetime64)이 추가되고 숫자 컬럼이 변환된 DataFrame
+        """
+        days = krx_trading_days(start_date, end_date)
 
-        rand_value = random.random()
-        time.sleep(rand_value)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            outputs = list(executor.map(lambda date: self._fetch_daily(stat, prod_id, date, **kwargs), days))
 
-        df = pd.DataFrame(response.json()['output'])
+        frames = [pd.DataFrame(output).assign(date=date) for date, output in zip(days, outputs) if output]
+        if not frames:
+            return pd.DataFrame()
+
+        df = pd.concat(frames, ignore_index=True)
+        df['date'] = pd.to_datetime(df['date'], format='%Y%m%d')
+
+        return parse_krx_numbers(df)
+
+    def _option_prod_id(self, weekly):
+        if weekly == 1:
+            return "KRDRVOPK2I"
+        elif weekly == 2:  # 위클리 옵션(월)
+            return "KRDRVOPWKI"
+        elif weekly == 3:  # 위클리 옵션(목)
+            return "KRDRVOPWKM"
+
+    def get_kospi200_future(self, date, share=1, money=1, csvxls_isNo='false'):
+        """
+        코스피 200 선물 조회
+        """
+        stat = "MDCSTAT12501"
+        prod_id = "KRDRVFUK2I"
+
+        df = pd.DataFrame(self._fetch_daily(stat, prod_id, date, share, money, csvxls_isNo))
 
         return df
     
@@ -305,49 +621,49 @@ class KRXFetcher:
         코스피 200 옵션 조회
         """
         stat = "MDCSTAT12502"
+        prod_id = self._option_prod_id(weekly)
 
-        if weekly == 1:
-            prod_id = "KRDRVOPK2I"
-        elif weekly == 2:  # 위클리 옵션(월)
-            prod_id = "KRDRVOPWKI"
-        elif weekly == 3:  # 위클리 옵션(목)
-            prod_id = "KRDRVOPWKM"
+        df = pd.DataFrame(self._fetch_daily(stat, prod_id, date, share, money, csvxls_isNo))
 
-        response = requests.post(
-            url=self.url,
-            headers=self.headers,
-            data=f"bld=dbms/MDC/STAT/standard/{stat}&locale=ko_KR&trdDd={date}&prodId={prod_id}&trdDdBox1={date}&trdDdBox2={date}&mktTpCd=T&rghtTpCd=T&share={share}&money={money}&csvxls_isNo={csvxls_isNo}"
-        )
+        return df
 
-        rand_value = random.random()
-        time.sleep(rand_value)
+    def get_kospi200_future_range(self, start_date, end_date, share=1, money=1):
+        """
+        기간 코스피 200 선물 조회 (거래일별 동시 요청, 날짜별 캐시)
 
-        df = pd.DataFrame(response.json()['output'])
+        :param start_date: 시작일 ('20200101' 또는 datetime)
+        :param end_date: 종료일
+        """
+        return self._fetch_range("MDCSTAT12501", "KRDRVFUK2I", start_date, end_date, share=share, money=money)
 
-        return df
+    def get_kospi200_option_range(self, start_date, end_date, weekly=1, share=1, money=1):
+        """
+        기간 코스피 200 옵션 조회 (거래일별 동시 요청, 날짜별 캐시)
+        """
+        return self._fetch_range("MDCSTAT12502", self._option_prod_id(weekly), start_date, end_date, share=share, money=money)
 
     def get_etf_info(self):
         stat = "MDCSTAT04601"
 
-        response = requests.post(
-            url=self.url,
+        _, data = self.transport.post(
+            self.url,
             headers=self.headers,
             data=f"bld=dbms/MDC/STAT/standard/{stat}&locale=ko_KR&share=1&csvxls_isNo=false"
         )
-        df = pd.DataFrame(response.json()['output'])
+        df = pd.DataFrame(data['output'])
 
         return df
     
     def get_individual_performence_by_investor(self, short_code, full_code, start_date, end_date, money=1):
         stat = "MDCSTAT04903"
         
-        response = requests.post(
-            url=self.url,
+        _, data = self.transport.post(
+            self.url,
             headers=self.headers,
             data=f"bld=dbms/MDC/STAT/standard/{stat}&locale=ko_KR&inqTpCd=2&inqCondTpCd1=1&inqCondTpCd2=1&tboxisuCd_finder_secuprodisu1_1={short_code}&isuCd={full_code}&strtDd={start_date}&endDd={end_date}&detailView=1&money={money}&csvxls_isNo=false"
         )
 
-        df = pd.DataFrame(response.json()['output'])
+        df = pd.DataFrame(data['output'])
         if len(df) == 0:
             return df
         
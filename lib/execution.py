@@ -0,0 +1,323 @@
+import time
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.metrics import metrics
+
+
+class ExecutionEngine:
+    """
+    주문 실행 엔진
+    - 잔고와 미체결 주문을 메모리에 보관하고, 잔고는 주문/체결로 바뀌었거나 balance_ttl이 지났을 때만 다시 조회
+    - 여러 주문을 thread pool로 동시에 제출 (속도 제한은 exchanger의 rate limiter가 담당)
+    - 백그라운드 thread가 추적 중인 주문만 uuids로 한 번에 조회해 체결을 확인
+
+    exchanger는 UpbitExchanger, SimulatedExchanger 등 get_account, request_order,
+    get_order_list(done, uuids), cancel_order 메서드를 가진 객체면 된다.
+
+    :param exchanger: 주문을 보낼 거래소 객체
+    :param max_workers: 동시에 보낼 최대 요청 수
+    :param poll_interval: 체결 확인 주기 (초)
+    :param balance_ttl: 잔고 캐시 유효 시간 (초)
+    :param min_order: 최소 주문 금액 (Upbit KRW 마켓 5000원)
+    :param on_fill: 주문이 끝났을 때(done, cancel) 호출할 함수 f(order)
+    :param history: 보관할 종료 주문 수
+    """
+    FINAL_STATES = ('done', 'cancel')
+
+    def __init__(self, exchanger, max_workers=8, poll_interval=1.0, balance_ttl=30, min_order=5000, on_fill=None, history=1000):
+        self.exchanger = exchanger
+        self.poll_interval = poll_interval
+        self.balance_ttl = balance_ttl
+        self.min_order = min_order
+        self.on_fill = on_fill
+        self.history = history
+
+        self.balances = {}
+        self.balances_at = None
+        self.balances_dirty = True
+        self.open_orders = {}
+        self.finished = {}
+        self.submitted_at = {}    # {uuid: 제출 시각}, 체결까지 걸린 시간 기록용
+
+        self.condition = threading.Condition()
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="execution")
+        self.tracker = None
+
+    def _currency(self, ticker):
+        return ticker.split('-')[1] if '-' in ticker else ticker
+
+    def refresh_balances(self, force=False):
+        """
+        잔고 캐시를 반환하는 메서드 (주문/체결 이후이거나 ttl이 지났을 때만 거래소에 조회)
+
+        :return: {currency: {'balance', 'locked', 'avg_buy_price'}}
+        """
+        with self.condition:
+            fresh = (
+                not self.balances_dirty
+                and self.balances_at is not None
+                and time.monotonic() - self.balances_at < self.balance_ttl
+            )
+            if fresh and not force:
+                return self.balances
+
+        account = self.exchanger.get_account()
+        balances = {
+            a['currency']: {
+                'balance': float(a['balance']),
+                'locked': float(a.get('locked', 0)),
+                'avg_buy_price': float(a.get('avg_buy_price', 0)),
+            }
+            for a in account
+        }
+
+        with self.condition:
+            self.balances = balances
+            self.balances_at = time.monotonic()
+            self.balances_dirty = False
+
+        return balances
+
+    def get_balance(self, currency='KRW'):
+        """
+        보유 수량 조회 메서드 (ticker를 넣어도 됨)
+        """
+        return self.refresh_balances().get(self._currency(currency), {}).get('balance', 0.0)
+
+    def refresh_open_orders(self):
+        """
+        거래소의 미체결 주문을 모두 불러와 추적 목록에 넣는 메서드 (시작 시 한 번 호출)
+        """
+        return self.track(self.exchanger.get_order_list(done=False))
+
+    def track(self, orders):
+        """
+        이미 거래소에 있는 주문을 추적 목록에 넣는 메서드 (재시작 후 저장해 둔 미체결 주문 등)
+
+        :param orders: 거래소 주문 조회 결과 list (uuid 필요)
+        """
+        with self.condition:
+            for order in orders:
+                self.open_orders[order['uuid']] = order
+        self._ensure_tracker()
+
+        return orders
+
+    def _finish(self, order):
+        # condition을 잡은 상태에서 호출
+        self.open_orders.pop(order['uuid'], None)
+        submitted_at = self.submitted_at.pop(order['uuid'], None)
+        if submitted_at is not None:
+            metrics.observe('order_fill', time.monotonic() - submitted_at, state=order.get('state'))
+        self.finished[order['uuid']] = order
+        if len(self.finished) > self.history:
+            del self.finished[next(iter(self.finished))]
+        self.balances_dirty = True
+        self.condition.notify_all()
+
+    def _notify(self, orders):
+        if self.on_fill is None:
+            return
+        for order in orders:
+            try:
+                self.on_fill(order)
+            except Exception as e:
+                print(f"[Execution] on_fill 실패: {e}")
+
+    def _submit_one(self, order):
+        start = time.monotonic()
+        try:
+            with metrics.timer('order_submit', side=order['side']):
+                result = self.exchanger.request_order(**order)
+        except Exception as e:
+            print(f"[Execution] {order['ticker']} 주문 실패: {e}")
+            return dict(order, error=str(e))
+
+        if not isinstance(result, dict) or 'uuid' not in result:
+            print(f"[Execution] {order['ticker']} 주문 거부: {result}")
+            return dict(order, error=str(result))
+
+        with self.condition:
+            self.balances_dirty = True
+            self.submitted_at[result['uuid']] = start
+            if result.get('state') in self.FINAL_STATES:
+                self._finish(result)
+                finished = [result]
+            else:
+                self.open_orders[result['uuid']] = result
+                finished = []
+        self._notify(finished)
+
+        return result
+
+    def submit(self, orders):
+        """
+        여러 주문을 동시에 제출하는 메서드
+
+        :param orders: [{'ticker', 'side', 'ord_type', 'volume', 'price'}, ...] (UpbitExchanger.request_order 인자)
+        :return: 주문 순서대로 거래소 응답 list (실패한 주문은 주문 dict에 'error' 추가)
+        """
+        with metrics.timer('order_batch'):
+            results = list(self.executor.map(self._submit_one, orders))
+        self._ensure_tracker()
+
+        return results
+
+    def plan_orders(self, decisions):
+        """
+        전략 결정을 주문 list로 바꾸는 메서드 (캐시된 잔고 사용)
+        매수 비율의 합이 1을 넘으면 KRW 잔고 안에 들어오도록 줄인다.
+
+        :param decisions: [(ticker, action, percentage, price), ...], price가 없으면 시장가
+        :return: submit에 넣을 주문 list
+        """
+        balances = self.refresh_balances()
+        krw = balances.get('KRW', {}).get('balance', 0.0)
+
+        total = sum(percentage for _, action, percentage, _ in decisions if action == 'buy')
+        scale = 1 / total if total > 1 else 1
+
+        orders = []
+        for ticker, action, percentage, price in decisions:
+            if action == 'buy':
+                amount = krw * percentage * scale * 0.9995  # Adjust for fees
+                if amount < self.min_order:
+                    print(f"[Execution] {ticker} 매수 금액 {amount:.0f}원이 최소 주문 금액보다 작아 건너뜀")
+                    continue
+                if price:
+                    orders.append({'ticker': ticker, 'side': 'bid', 'ord_type': 'limit', 'price': price, 'volume': round(amount / price, 8)})
+                else:
+                    orders.append({'ticker': ticker, 'side': 'bid', 'ord_type': 'price', 'price': round(amount)})
+            elif action == 'sell':
+                volume = round(balances.get(self._currency(ticker), {}).get('balance', 0.0) * percentage, 8)
+                if volume <= 0 or (price and price * volume < self.min_order):
+                    print(f"[Execution] {ticker} 매도 수량이 부족해 건너뜀")
+                    continue
+                if price:
+                    orders.append({'ticker': ticker, 'side': 'ask', 'ord_type': 'limit', 'price': price, 'volume': volume})
+                else:
+                    orders.append({'ticker': ticker, 'side': 'ask', 'ord_type': 'market', 'volume': volume})
+
+        return orders
+
+    def rebalance(self, decisions, wait=False, timeout=30):
+        """
+        여러 종목의 결정을 한 번의 동시 주문으로 실행하는 메서드
+
+        :param decisions: [(ticker, action, percentage, price), ...]
+        :param wait: True면 모든 주문이 끝날 때까지 최대 timeout초 대기
+        :return: 주문 결과 list
+        """
+        results = self.submit(self.plan_orders(decisions))
+        if wait:
+            self.wait([r['uuid'] for r in results if 'uuid' in r], timeout=timeout)
+
+        return results
+
+    def execute_sliced(self, decisions, slicer):
+        """
+        결정마다 slicer(TWAPSlicer, IcebergSlicer 등)로 주문을 나눠 종목별로 동시에 실행하는 메서드
+        결정의 price는 child 주문 가격의 상한(매수)/하한(매도)으로 사용한다.
+
+        :param decisions: [(ticker, action, percentage, price), ...]
+        :return: 종목별 실행 결과 list (OrderSlicer.run 참조)
+        """
+        return self.run_sliced(self.plan_orders(decisions), slicer)
+
+    def run_sliced(self, orders, slicer):
+        """
+        이미 만든 주문 list(plan_orders, Portfolio.plan 결과)를 slicer로 종목별 동시에 실행하는 메서드
+
+        :return: 종목별 실행 결과 list (OrderSlicer.run 참조)
+        """
+        if not orders:
+            return []
+
+        def run(order):
+            limit_price = order['price'] if order['ord_type'] == 'limit' else None
+            if order['ord_type'] == 'price':
+                return slicer.run(order['ticker'], 'bid', amount=order['price'])
+            return slicer.run(order['ticker'], order['side'], volume=order['volume'], limit_price=limit_price)
+
+        with ThreadPoolExecutor(max_workers=len(orders), thread_name_prefix="slicer") as pool:
+            reports = list(pool.map(run, orders))
+
+        with self.condition:
+            self.balances_dirty = True
+        for report in reports:
+            print(f"[Execution] {report['ticker']} {report['side']} 체결 {report['executed_volume']:.8f} "
+                  f"평균 {report['avg_price']} slippage {report['slippage_bps']} bps (시장가 추정 {report['sweep_slippage_bps']} bps)")
+
+        return reports
+
+    def cancel(self, uuids=None):
+        """
+        주문을 동시에 취소하는 메서드 (uuids를 비우면 추적 중인 미체결 주문 전체)
+        """
+        if uuids is None:
+            with self.condition:
+                uuids = list(self.open_orders)
+
+        def cancel_one(uuid):
+            try:
+                return self.exchanger.cancel_order(uuid)
+            except Exception as e:
+                return {'uuid': uuid, 'error': str(e)}
+
+        return list(self.executor.map(cancel_one, uuids))
+
+    def poll(self):
+        """
+        추적 중인 주문의 상태를 한 번 확인하는 메서드 (100개씩 묶어 조회)
+
+        :return: 이번에 끝난 주문 list
+        """
+        with self.condition:
+            uuids = list(self.open_orders)
+
+        finished = []
+        for i in range(0, len(uuids), 100):
+            orders = self.exchanger.get_order_list(uuids=uuids[i:i + 100])
+            with self.condition:
+                for order in orders:
+                    if order['uuid'] not in self.open_orders:
+                        continue
+                    if order.get('state') in self.FINAL_STATES:
+                        self._finish(order)
+                        finished.append(order)
+                    else:
+                        self.open_orders[order['uuid']].update(order)
+        self._notify(finished)
+
+        return finished
+
+    def _track(self):
+        while True:
+            with self.condition:
+                if not self.open_orders:
+                    self.tracker = None
+                    return
+            try:
+                self.poll()
+            except Exception as e:
+                print(f"[Execution] 체결 확인 실패: {e}")
+            time.sleep(self.poll_interval)
+
+    def _ensure_tracker(self):
+        with self.condition:
+            if self.tracker is not None or not self.open_orders:
+                return
+            self.tracker = threading.Thread(target=self._track, name="execution-tracker", daemon=True)
+            self.tracker.start()
+
+    def wait(self, uuids, timeout=30):
+        """
+        주문들이 끝날 때까지 기다리는 메서드
+
+        :return: {uuid: 종료된 주문} (timeout 안에 끝나지 않은 주문은 제외)
+        """
+        with self.condition:
+            self.condition.wait_for(lambda: not any(u in self.open_orders for u in uuids), timeout=timeout)
+            return {u: self.finished[u] for u in uuids if u in self.finished}
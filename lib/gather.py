@@ -0,0 +1,61 @@
+import time
+
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+
+_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="gather")
+
+_MISSING = object()
+
+
+def gather_inputs(sources, timeouts=None, fallbacks=None, default_timeout=10):
+    """
+    서로 독립적인 입력 수집 함수들을 동시에 실행하는 메서드
+    전체 소요 시간은 가장 느린 소스 하나의 시간에 가까워진다.
+
+    제한 시간을 넘기거나 실패한 소스는 fallbacks 값으로 대체하고, fallback이 없으면 예외를 발생시킨다.
+    제한 시간을 넘긴 작업은 중단할 수 없으므로 결과만 버리고 백그라운드에서 끝나도록 둔다.
+
+    :param sources: {이름: 인자 없는 함수}
+    :param timeouts: {이름: 제한 시간(초)}, 없으면 default_timeout
+    :param fallbacks: {이름: 실패 시 사용할 값}
+    :param default_timeout: 기본 제한 시간(초)
+    :return: ({이름: 결과}, {이름: {'seconds': 소요 시간, 'status': 'ok'|'timeout'|'error'}})
+    """
+    timeouts = timeouts or {}
+    fallbacks = fallbacks or {}
+
+    start = time.perf_counter()
+    futures = {_executor.submit(func): name for name, func in sources.items()}
+    deadlines = {name: start + timeouts.get(name, default_timeout) for name in sources}
+
+    results, timings = {}, {}
+    pending = set(futures)
+    while pending:
+        now = time.perf_counter()
+        for future in [f for f in pending if deadlines[futures[f]] <= now]:
+            pending.discard(future)
+            timings[futures[future]] = {'seconds': now - start, 'status': 'timeout'}
+        if not pending:
+            break
+
+        next_deadline = min(deadlines[futures[f]] for f in pending)
+        done, pending = wait(pending, timeout=max(next_deadline - now, 0), return_when=FIRST_COMPLETED)
+        for future in done:
+            name = futures[future]
+            try:
+                results[name] = future.result()
+                timings[name] = {'seconds': time.perf_counter() - start, 'status': 'ok'}
+            except Exception as e:
+                timings[name] = {'seconds': time.perf_counter() - start, 'status': 'error', 'error': str(e)}
+
+    for name, timing in timings.items():
+        if timing['status'] == 'ok':
+            continue
+        fallback = fallbacks.get(name, _MISSING)
+        if fallback is _MISSING:
+            raise Exception(f"{name} 수집 실패 ({timing['status']}): {timing.get('error', '')}")
+        print(f"[Gather] {name} 수집 실패 ({timing['status']}), 대체값 사용")
+        results[name] = fallback
+
+    return results, timings
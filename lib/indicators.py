@@ -0,0 +1,264 @@
+import math
+import numpy as np
+import pandas as pd
+
+from collections import deque
+
+
+class SMA:
+    """
+    단순 이동평균 (봉마다 O(1) 갱신)
+    """
+    def __init__(self, length):
+        self.length = length
+        self.window = deque(maxlen=length)
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, x):
+        if len(self.window) == self.length:
+            self.total -= self.window[0]
+        self.window.append(x)
+        self.total += x
+        self.value = self.total / self.length if len(self.window) == self.length else math.nan
+        return self.value
+
+    def seed(self, values):
+        for x in values:
+            self.update(float(x))
+        return self.value
+
+
+class RollingStd:
+    """
+    이동 표준편차 (봉마다 O(1) 갱신, Welford 방식으로 한 값을 빼고 한 값을 더함)
+    """
+    def __init__(self, length, ddof=1):
+        self.length = length
+        self.ddof = ddof
+        self.window = deque(maxlen=length)
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.value = math.nan
+
+    def update(self, x):
+        n = len(self.window)
+        if n < self.length:
+            n += 1
+            delta = x - self.mean
+            self.mean += delta / n
+            self.m2 += delta * (x - self.mean)
+        else:
+            old = self.window[0]
+            old_mean = self.mean
+            self.mean += (x - old) / n
+            self.m2 += (x - old) * (x - self.mean + old - old_mean)
+        self.window.append(x)
+
+        if len(self.window) == self.length:
+            self.value = math.sqrt(max(self.m2, 0.0) / (self.length - self.ddof))
+        else:
+            self.value = math.nan
+        return self.value
+
+    def seed(self, values):
+        for x in values:
+            self.update(float(x))
+        return self.value
+
+
+class EMA:
+    """
+    지수 이동평균 (봉마다 O(1) 갱신)
+    pandas_ta.ema와 같이 처음 length개의 평균으로 시작한 뒤 alpha = 2 / (length + 1)로 갱신
+    """
+    def __init__(self, length):
+        self.length = length
+        self.alpha = 2 / (length + 1)
+        self.count = 0
+        self.total = 0.0
+        self.value = math.nan
+
+    def update(self, x):
+        self.count += 1
+        if self.count < self.length:
+            self.total += x
+        elif self.count == self.length:
+            self.value = (self.total + x) / self.length
+        else:
+            self.value = self.alpha * x + (1 - self.alpha) * self.value
+        return self.value
+
+    def seed(self, values):
+        for x in values:
+            self.update(float(x))
+        return self.value
+
+
+class RMA:
+    """
+    Wilder 이동평균 (pandas ewm(alpha=1/length, adjust=True, min_periods=length)과 같은 값, O(1) 갱신)
+    """
+    def __init__(self, length):
+        self.length = length
+        self.decay = 1 - 1 / length
+        self.weighted_sum = 0.0
+        self.weight = 0.0
+        self.count = 0
+        self.value = math.nan
+
+    def update(self, x):
+        self.weighted_sum = x + self.decay * self.weighted_sum
+        self.weight = 1 + self.decay * self.weight
+        self.count += 1
+        self.value = self.weighted_sum / self.weight if self.count >= self.length else math.nan
+        return self.value
+
+
+class RSI:
+    """
+    Wilder RSI (pandas_ta.rsi와 같은 값, O(1) 갱신)
+    """
+    def __init__(self, length=14):
+        self.length = length
+        self.gain = RMA(length)
+        self.loss = RMA(length)
+        self.prev = None
+        self.value = math.nan
+
+    def update(self, x):
+        if self.prev is not None:
+            change = x - self.prev
+            gain = self.gain.update(max(change, 0.0))
+            loss = self.loss.update(max(-change, 0.0))
+            total = gain + loss
+            self.value = 100 * gain / total if total > 0 else math.nan
+        self.prev = x
+        return self.value
+
+    def seed(self, values):
+        for x in values:
+            self.update(float(x))
+        return self.value
+
+
+class IndicatorEngine:
+    """
+    fetch_and_prepare_data에서 쓰는 지표(SMA_n, RSI_n, Bollinger)를 봉마다 O(1)로 갱신하는 클래스
+    저장된 과거 데이터로 seed 한 뒤 새 캔들의 종가를 update에 넣는다.
+    같은 지표를 한 번에 계산하는 batch와 결과가 같다.
+
+    :param sma: SMA 길이 tuple
+    :param rsi: RSI 길이
+    :param bollinger: (길이, 표준편차 배수)
+    """
+    def __init__(self, sma=(20, 60), rsi=14, bollinger=(20, 2)):
+        self.sma_lengths = sma
+        self.rsi_length = rsi
+        self.bollinger = bollinger
+        self.smas = {n: SMA(n) for n in sma}
+        self.rsi = RSI(rsi)
+        self.band_mean = SMA(bollinger[0])
+        self.band_std = RollingStd(bollinger[0])
+
+    def update(self, close):
+        """
+        :param close: 새 캔들의 종가
+        :return: {컬럼 이름: 값} dict
+        """
+        close = float(close)
+        row = {f'SMA_{n}': s.update(close) for n, s in self.smas.items()}
+        row[f'RSI_{self.rsi_length}'] = self.rsi.update(close)
+
+        middle = self.band_mean.update(close)
+        std = self.band_std.update(close)
+        row['Middle_Band'] = middle
+        row['Upper_Band'] = middle + std * self.bollinger[1]
+        row['Lower_Band'] = middle - std * self.bollinger[1]
+
+        return row
+
+    def seed(self, closes):
+        """
+        과거 종가로 상태를 채우는 메서드
+
+        :return: 마지막 봉의 지표 dict
+        """
+        row = None
+        for close in closes:
+            row = self.update(close)
+        return row
+
+    def batch(self, df):
+        """
+        DataFrame 전체에 지표 컬럼을 추가하는 벡터화 메서드 (update를 반복한 결과와 같음)
+        """
+        close = df['close']
+        for n in self.sma_lengths:
+            df[f'SMA_{n}'] = sma(close, n)
+        df[f'RSI_{self.rsi_length}'] = rsi(close, self.rsi_length)
+
+        middle, upper, lower = bollinger_bands(close, *self.bollinger)
+        df['Middle_Band'] = middle
+        df['Upper_Band'] = upper
+        df['Lower_Band'] = lower
+
+        return df
+
+
+def sma(values, length):
+    """
+    단순 이동평균 (벡터화)
+    """
+    return pd.Series(values, dtype=np.float64).rolling(window=length).mean().to_numpy()
+
+
+def rolling_std(values, length, ddof=1):
+    """
+    이동 표준편차 (벡터화)
+    """
+    return pd.Series(values, dtype=np.float64).rolling(window=length).std(ddof=ddof).to_numpy()
+
+
+def ema(values, length):
+    """
+    지수 이동평균 (벡터화, EMA와 같은 값)
+    """
+    values = pd.Series(values, dtype=np.float64).reset_index(drop=True)
+    result = np.full(len(values), np.nan)
+    if len(values) < length:
+        return result
+
+    seeded = values.copy()
+    seeded.iloc[:length - 1] = np.nan
+    seeded.iloc[length - 1] = values.iloc[:length].mean()
+    result[length - 1:] = seeded.iloc[length - 1:].ewm(span=length, adjust=False).mean().to_numpy()
+    return result
+
+
+def rsi(values, length=14):
+    """
+    Wilder RSI (벡터화, RSI와 같은 값)
+    """
+    change = pd.Series(values, dtype=np.float64).diff()
+    gain = change.clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    loss = (-change).clip(lower=0).ewm(alpha=1 / length, min_periods=length).mean()
+    return (100 * gain / (gain + loss)).to_numpy()
+
+
+def bollinger_bands(values, length=20, k=2):
+    """
+    볼린저 밴드 (벡터화)
+
+    :return: (중간 밴드, 상단 밴드, 하단 밴드) 배열
+    """
+    middle = sma(values, length)
+    std = rolling_std(values, length)
+    return middle, middle + std * k, middle - std * k
+
+
+def add_indicators(df, sma_lengths=(20, 60), rsi_length=14, bollinger=(20, 2)):
+    """
+    fetch_and_prepare_data에서 쓰는 지표 컬럼을 DataFrame에 추가하는 메서드
+    """
+    return IndicatorEngine(sma=sma_lengths, rsi=rsi_length, bollinger=bollinger).batch(df)
@@ -0,0 +1,293 @@
+import json
+import time
+import threading
+import contextvars
+import numpy as np
+
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+class RingStats:
+    """
+    최근 size개 관측값을 고정 크기 배열에 덮어쓰며 보관하는 통계 (관측당 O(1), 메모리 고정)
+    분위수는 summary를 부를 때만 계산한다.
+
+    :param size: 보관할 최근 관측 수
+    """
+    def __init__(self, size=1024):
+        self.values = np.zeros(size)
+        self.size = size
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        with self.lock:
+            self.values[self.count % self.size] = seconds
+            self.count += 1
+            self.total += seconds
+            if error:
+                self.errors += 1
+
+    def summary(self):
+        with self.lock:
+            values = self.values[:min(self.count, self.size)].copy()
+            count, errors, total = self.count, self.errors, self.total
+        if count == 0:
+            return {'count': 0, 'errors': 0, 'sum': 0.0, 'mean': None, 'p50': None, 'p99': None, 'max': None}
+        p50, p99 = np.percentile(values, [50, 99])
+        return {
+            'count': count,
+            'errors': errors,
+            'sum': total,
+            'mean': total / count,
+            'p50': float(p50),
+            'p99': float(p99),
+            'max': float(values.max()),
+        }
+
+
+_current_trace = contextvars.ContextVar('trace', default=None)
+
+
+class _Timer:
+    # with metrics.timer(...) 블록의 시간을 재는 객체 (예외가 나면 error로 기록)
+    __slots__ = ('registry', 'key', 'start')
+
+    def __init__(self, registry, key):
+        self.registry = registry
+        self.key = key
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.registry._observe(self.key, time.perf_counter() - self.start, exc_type is not None)
+        return False
+
+
+class _Trace:
+    # 한 번의 실행(예: make_decision_and_execute) 동안 같은 context에서 잰 단계 시간을 모으는 객체
+    def __init__(self, registry, name, labels):
+        self.registry = registry
+        self.key = registry._key(name, labels)
+        self.record = {'trace': name, **labels, 'stages': []}
+
+    def __enter__(self):
+        self.record['timestamp'] = time.time()
+        self.start = time.perf_counter()
+        self.token = _current_trace.set(self.record['stages'])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        _current_trace.reset(self.token)
+        self.registry._observe(self.key, seconds, exc_type is not None)
+        self.record['seconds'] = seconds
+        self.record['error'] = exc_type is not None
+        self.registry._emit(self.record)
+        return False
+
+
+class MetricsRegistry:
+    """
+    이름과 label별 소요 시간 통계 저장소
+    - timer: with 블록 시간을 재서 RingStats에 기록 (관측당 수 μs, 운영 중 계속 켜둘 수 있음)
+    - trace: 한 번의 실행 동안 같은 thread/context에서 잰 단계 시간을 하나의 record로 묶어 exporter에 전달
+    - collector: transport, scheduler, registry처럼 자체 통계를 가진 객체의 stats 함수를 함께 보고
+    - exporter: trace record와 summary를 JSONL로 쓰거나 Prometheus text로 노출
+
+    :param size: metric마다 보관할 최근 관측 수
+    """
+    def __init__(self, size=1024):
+        self.size = size
+        self.stats = {}
+        self.collectors = {}
+        self.exporters = []
+        self.lock = threading.Lock()
+
+    def _key(self, name, labels):
+        return (name, tuple(sorted(labels.items()))) if labels else (name, ())
+
+    def _get(self, key):
+        stats = self.stats.get(key)
+        if stats is None:
+            with self.lock:
+                stats = self.stats.setdefault(key, RingStats(self.size))
+        return stats
+
+    def _observe(self, key, seconds, error=False):
+        self._get(key).observe(seconds, error)
+        stages = _current_trace.get()
+        if stages is not None:
+            stages.append([key[0], dict(key[1]), seconds] if key[1] else [key[0], seconds])
+
+    def observe(self, name, seconds, error=False, **labels):
+        """
+        이미 잰 시간을 기록하는 메서드
+
+        :param seconds: 소요 시간 (초)
+        :param labels: 구분 label (예: strategy='coinGPT')
+        """
+        self._observe(self._key(name, labels), seconds, error)
+
+    def timer(self, name, **labels):
+        """
+        with 블록의 시간을 기록하는 메서드
+        예: with metrics.timer('order_submit', ticker=ticker): ...
+        """
+        return _Timer(self, self._key(name, labels))
+
+    def trace(self, name, **labels):
+        """
+        with 블록 전체 시간과 그 안에서 잰 단계 시간을 하나의 record로 묶는 메서드
+        thread pool에서 잰 시간은 같은 context가 아니므로 record에 들어가지 않는다. (observe로 다시 기록)
+        """
+        return _Trace(self, name, labels)
+
+    def register_collector(self, name, stats):
+        """
+        자체 통계를 가진 객체의 stats 함수를 등록하는 메서드 (예: transport.stats, scheduler.stats)
+        """
+        self.collectors[name] = stats
+
+    def add_exporter(self, exporter):
+        self.exporters.append(exporter)
+        return exporter
+
+    def _emit(self, record):
+        for exporter in self.exporters:
+            try:
+                exporter.write(record)
+            except Exception as e:
+                print(f"[Metrics] 기록 실패: {e}")
+
+    def summary(self, collectors=True):
+        """
+        :return: {'timings': {'name{label=value}': RingStats.summary()}, collector 이름: stats() 결과}
+        """
+        with self.lock:
+            items = list(self.stats.items())
+        result = {'timings': {_format_key(key): stats.summary() for key, stats in sorted(items)}}
+        if collectors:
+            for name, stats in list(self.collectors.items()):
+                try:
+                    result[name] = stats()
+                except Exception as e:
+                    result[name] = {'error': str(e)}
+        return result
+
+    def export(self):
+        """
+        현재 summary를 모든 exporter에 쓰는 메서드 (scheduler.every로 주기적으로 호출)
+        """
+        self._emit({'summary': self.summary(), 'timestamp': time.time()})
+
+    def prometheus(self):
+        """
+        Prometheus text 형식 (timing은 summary 타입 초 단위, 실패 횟수는 counter, collector 통계는 숫자 값만 gauge로)
+        """
+        # metric family마다 HELP, TYPE 줄 다음에 sample을 모아서 씀 (family가 섞이면 exposition format 위반)
+        families = {}
+
+        def family(metric, kind, help):
+            return families.setdefault(metric, (kind, help, []))[2]
+
+        with self.lock:
+            items = sorted(self.stats.items())
+        summaries = [(name, labels, stats.summary()) for (name, labels), stats in items]
+        for name, labels, summary in summaries:
+            metric = f"bot_{_sanitize(name)}_seconds"
+            samples = family(metric, 'summary', f"{name} 소요 시간 (초)")
+            for q, quantile in (('p50', '0.5'), ('p99', '0.99')):
+                if summary[q] is not None:
+                    samples.append(f"{metric}{_labels(labels + (('quantile', quantile),))} {summary[q]:.6g}")
+            samples.append(f"{metric}_sum{_labels(labels)} {summary['sum']:.6g}")
+            samples.append(f"{metric}_count{_labels(labels)} {summary['count']}")
+        for name, labels, summary in summaries:
+            metric = f"bot_{_sanitize(name)}_errors_total"
+            family(metric, 'counter', f"{name} 실패 횟수").append(f"{metric}{_labels(labels)} {summary['errors']}")
+
+        for collector, stats in list(self.collectors.items()):
+            try:
+                rows = stats()
+            except Exception:
+                continue
+            for key, row in rows.items():
+                if not isinstance(row, dict):
+                    continue
+                for field, value in row.items():
+                    if isinstance(value, (int, float)) and not isinstance(value, bool) and np.isfinite(value):
+                        metric = f"bot_{_sanitize(collector)}_{_sanitize(field)}"
+                        family(metric, 'gauge', f"{collector} {field}").append(f"{metric}{_labels((('name', str(key)),))} {value:.6g}")
+
+        lines = []
+        for metric, (kind, help, samples) in families.items():
+            lines.append(f"# HELP {metric} {help}")
+            lines.append(f"# TYPE {metric} {kind}")
+            lines.extend(samples)
+        return '\n'.join(lines) + '\n'
+
+
+def _sanitize(text):
+    return ''.join(c if c.isalnum() else '_' for c in str(text)).strip('_').lower()
+
+
+def _labels(labels):
+    if not labels:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"') for _, v in labels)
+    return '{' + ','.join(f'{_sanitize(k)}="{v}"' for (k, _), v in zip(labels, escaped)) + '}'
+
+
+def _format_key(key):
+    name, labels = key
+    return name + ('{' + ','.join(f'{k}={v}' for k, v in labels) + '}' if labels else '')
+
+
+class JSONLExporter:
+    """
+    trace record와 summary를 한 줄에 하나씩 JSON으로 추가하는 exporter
+
+    :param path: 기록할 파일 경로
+    """
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+
+    def write(self, record):
+        line = json.dumps(record, ensure_ascii=False, default=str, separators=(',', ':')) + '\n'
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as file:
+                file.write(line)
+
+
+def serve_prometheus(registry, port=9100, host='127.0.0.1'):
+    """
+    /metrics 경로로 Prometheus text를 제공하는 HTTP 서버를 백그라운드 thread로 실행하는 메서드
+    전략 이름, 주문 시간 등이 노출되므로 기본은 localhost에서만 접근 가능 (다른 host에서 수집하려면 host 지정)
+
+    :return: ThreadingHTTPServer (shutdown()으로 종료)
+    """
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args):
+            pass
+
+        def do_GET(self):
+            body = registry.prometheus().encode('utf-8')
+            self.send_response(200 if self.path.startswith('/metrics') else 404)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"[Metrics] Prometheus metrics http://{host}:{port}/metrics")
+    return server
+
+
+# 프로그램 전체가 함께 쓰는 기본 registry
+metrics = MetricsRegistry()
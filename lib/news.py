@@ -0,0 +1,209 @@
+import threading
+
+from html.parser import HTMLParser
+from urllib.parse import quote
+
+from lib.cache import TTLCache
+from lib.transport import get_transport
+
+try:
+    from selenium import webdriver
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+except ImportError:
+    webdriver = None
+
+
+TITLE_CLASS = 'JtKRv'
+TIME_CLASS = 'hvbAAd'
+VOID_TAGS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'source', 'track', 'wbr'}
+
+
+class _NewsHTMLParser(HTMLParser):
+    """
+    Google News 검색 결과 HTML에서 제목(JtKRv)과 시간(hvbAAd) 요소를 순서대로 모으는 parser
+    """
+    def __init__(self):
+        super().__init__()
+        self.titles = []
+        self.timestamps = []
+        self.current = None
+        self.depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in VOID_TAGS:
+            return
+        if self.current is not None:
+            self.depth += 1
+            return
+
+        attrs = dict(attrs)
+        classes = (attrs.get('class') or '').split()
+        if TITLE_CLASS in classes:
+            self.current = {'text': ''}
+            self.titles.append(self.current)
+            self.depth = 0
+        elif TIME_CLASS in classes:
+            self.current = {'text': '', 'datetime': attrs.get('datetime')}
+            self.timestamps.append(self.current)
+            self.depth = 0
+
+    def handle_endtag(self, tag):
+        if self.current is None or tag in VOID_TAGS:
+            return
+        if self.depth == 0:
+            self.current['text'] = self.current['text'].strip()
+            self.current = None
+        else:
+            self.depth -= 1
+
+    def handle_data(self, data):
+        if self.current is not None:
+            self.current['text'] += data
+
+
+def parse_news_html(html):
+    """
+    Google News 검색 결과 HTML을 기사 list로 바꾸는 메서드
+
+    :return: [{"Title", "Timestamp", "Time"}, ...]
+    """
+    parser = _NewsHTMLParser()
+    parser.feed(html)
+
+    return [
+        {"Title": title['text'], "Timestamp": timestamp['datetime'], "Time": timestamp['text']}
+        for title, timestamp in zip(parser.titles, parser.timestamps)
+    ]
+
+
+class GoogleNewsCollector:
+    """
+    Google News 검색 결과를 수집하는 서비스
+    keyword별 결과를 ttl 동안 캐시해 여러 전략/ticker가 같은 뉴스를 요청해도 한 번만 수집한다.
+
+    mode='http': 공유 HTTP transport로 HTML을 받아 parsing (브라우저 없음)
+    mode='browser': 미리 띄워 둔 headless Chrome pool을 재사용하고, 고정 sleep 대신 기사 요소가 나타날 때까지만 기다림
+
+    :param base_url: 검색 서버 주소 (테스트 시 저장된 HTML을 제공하는 로컬 서버 주소로 변경 가능)
+    :param mode: 'http' 또는 'browser'
+    :param pool_size: browser 모드에서 유지할 Chrome 수
+    :param ttl: keyword별 캐시 유효 시간 (초)
+    :param timeout: 페이지 로딩 최대 대기 시간 (초)
+    """
+    def __init__(self, base_url='https://news.google.com', mode='http', pool_size=1, ttl=600, timeout=10):
+        self.base_url = base_url
+        self.mode = mode
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.cache = TTLCache(ttl=ttl)
+        self.transport = get_transport()
+        self.drivers = []    # 쉬고 있는 Chrome
+        self.all_drivers = set()    # 쉬고 있거나 사용 중인 Chrome 전체 (close에서 모두 종료)
+        self.driver_count = 0    # 쉬고 있거나 사용 중인 Chrome 수 (띄우는 중인 것 포함)
+        self.driver_path = None
+        self.condition = threading.Condition()
+
+    def search_url(self, keyword, when='1d'):
+        query = f"{keyword} when:{when}" if when else keyword
+        return f"{self.base_url}/search?q={quote(query)}"
+
+    def _new_driver(self):
+        if webdriver is None:
+            raise ImportError("browser 모드에는 selenium 패키지가 필요합니다.")
+
+        if self.driver_path is None:
+            from webdriver_manager.chrome import ChromeDriverManager
+            self.driver_path = ChromeDriverManager().install()
+
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless')
+        options.add_argument('--no-sandbox')
+        options.add_argument('--disable-dev-shm-usage')
+
+        return webdriver.Chrome(service=Service(self.driver_path), options=options)
+
+    def _acquire_driver(self):
+        # 쉬는 Chrome이 없고 pool이 가득 차면 반환/폐기될 때까지 대기 (폐기되면 깨어나 새로 띄움)
+        with self.condition:
+            while not self.drivers and self.driver_count >= self.pool_size:
+                self.condition.wait()
+            if self.drivers:
+                return self.drivers.pop()
+            self.driver_count += 1
+
+        try:
+            driver = self._new_driver()
+        except Exception:
+            with self.condition:
+                self.driver_count -= 1
+                self.condition.notify()
+            raise
+        with self.condition:
+            self.all_drivers.add(driver)
+        return driver
+
+    def _release_driver(self, driver):
+        with self.condition:
+            # close 중에 사용하던 Chrome은 이미 종료됐으므로 pool에 돌려놓지 않음
+            if driver in self.all_drivers:
+                self.drivers.append(driver)
+                self.condition.notify()
+
+    def _discard_driver(self, driver):
+        with self.condition:
+            if driver in self.all_drivers:
+                self.all_drivers.discard(driver)
+                self.driver_count -= 1
+                self.condition.notify()
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _fetch_browser(self, url):
+        driver = self._acquire_driver()
+        try:
+            driver.get(url)
+            try:
+                WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located((By.CLASS_NAME, TITLE_CLASS)))
+            except Exception:
+                # 검색 결과가 없는 경우
+                pass
+            html = driver.page_source
+        except Exception:
+            self._discard_driver(driver)
+            raise
+
+        self._release_driver(driver)
+        return parse_news_html(html)
+
+    def _fetch_http(self, url):
+        response, _ = self.transport.get(url, parse_json=False, timeout=self.timeout)
+        response.raise_for_status()
+        return parse_news_html(response.text)
+
+    def collect(self, keyword, when='1d'):
+        """
+        keyword 뉴스 목록을 반환하는 메서드 (ttl 안에 같은 keyword를 요청하면 캐시 사용)
+
+        :param keyword: 검색어
+        :param when: 검색 기간 (기본값: 지난 24시간)
+        :return: [{"Title", "Timestamp", "Time"}, ...]
+        """
+        url = self.search_url(keyword, when)
+        fetch = self._fetch_browser if self.mode == 'browser' else self._fetch_http
+
+        return self.cache.get_or_compute((keyword, when), lambda: fetch(url))
+
+    def close(self):
+        """
+        browser pool의 Chrome을 모두 종료하는 메서드 (사용 중인 Chrome 포함)
+        """
+        with self.condition:
+            drivers = list(self.all_drivers)
+            self.drivers = []
+        for driver in drivers:
+            self._discard_driver(driver)
@@ -0,0 +1,218 @@
+import os
+import json
+import itertools
+import numpy as np
+import pandas as pd
+
+from multiprocessing import shared_memory
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from lib.backtest import vectorized_backtest
+from lib.indicators import sma, rolling_std
+
+
+def sma_cross_signal(arrays, fast=20, slow=60):
+    """
+    단기 이동평균이 장기 이동평균 위에 있으면 보유하는 signal
+    """
+    close = arrays['close']
+    return (sma(close, fast) > sma(close, slow)).astype(np.float64)
+
+
+def bollinger_signal(arrays, window=20, k=2.0):
+    """
+    종가가 하단 밴드 아래로 내려가면 매수, 중간 밴드 위로 올라가면 매도하는 signal
+    """
+    close = arrays['close']
+    middle = sma(close, window)
+    lower = middle - k * rolling_std(close, window)
+
+    signal = np.full(len(close), np.nan)
+    signal[close < lower] = 1.0
+    signal[close > middle] = 0.0
+    return pd.Series(signal).ffill().fillna(0).to_numpy()
+
+
+def param_grid(**ranges):
+    """
+    파라미터 조합 list를 만드는 메서드
+
+    예시: param_grid(fast=[5, 10, 20], slow=[60, 120]) -> [{'fast': 5, 'slow': 60}, ...]
+    """
+    keys = list(ranges)
+    values = [[v.item() if isinstance(v, np.generic) else v for v in r] for r in ranges.values()]
+    return [dict(zip(keys, combo)) for combo in itertools.product(*values)]
+
+
+def walk_forward_splits(length, train_size, test_size, step=None):
+    """
+    walk-forward 학습/검증 구간을 나누는 메서드
+
+    :param length: 전체 봉 수
+    :param train_size: 학습 구간 봉 수
+    :param test_size: 검증 구간 봉 수
+    :param step: 다음 구간으로 이동할 봉 수 (비우면 test_size)
+    :return: [(학습 slice, 검증 slice), ...]
+    """
+    step = step or test_size
+    splits = []
+    start = 0
+    while start + train_size + test_size <= length:
+        splits.append((slice(start, start + train_size), slice(start + train_size, start + train_size + test_size)))
+        start += step
+    return splits
+
+
+class SharedOHLCV:
+    """
+    여러 ticker의 OHLCV 배열을 shared memory 하나에 올려 프로세스 간에 복사 없이 공유하는 클래스
+    (컬럼 수, 전체 봉 수) float64 배열에 ticker별 구간을 이어 붙인다.
+
+    with SharedOHLCV(data) as shared:
+        pool에 shared.spec 전달 -> 각 프로세스에서 SharedOHLCV.attach(spec)
+    """
+    def __init__(self, data, columns=('open', 'high', 'low', 'close', 'volume')):
+        self.columns = list(columns)
+        self.offsets = {}
+        total = 0
+        for ticker, df in data.items():
+            self.offsets[ticker] = (total, total + len(df))
+            total += len(df)
+
+        self.shm = shared_memory.SharedMemory(create=True, size=max(total, 1) * len(self.columns) * 8)
+        array = np.ndarray((len(self.columns), total), dtype=np.float64, buffer=self.shm.buf)
+        for ticker, df in data.items():
+            start, end = self.offsets[ticker]
+            array[:, start:end] = df[self.columns].to_numpy(dtype=np.float64).T
+
+        self.spec = {'name': self.shm.name, 'columns': self.columns, 'offsets': self.offsets, 'total': total}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.shm.close()
+        self.shm.unlink()
+
+    @staticmethod
+    def attach(spec):
+        """
+        다른 프로세스에서 shared memory에 붙어 {ticker: {컬럼: 배열}}을 반환 (복사 없음)
+        """
+        shm = shared_memory.SharedMemory(name=spec['name'])
+        array = np.ndarray((len(spec['columns']), spec['total']), dtype=np.float64, buffer=shm.buf)
+        data = {
+            ticker: {c: array[i, start:end] for i, c in enumerate(spec['columns'])}
+            for ticker, (start, end) in spec['offsets'].items()
+        }
+        return shm, data
+
+
+_worker = {}
+
+
+def _init_worker(spec):
+    _worker['shm'], _worker['data'] = SharedOHLCV.attach(spec)
+
+
+def _evaluate(ticker, signal, params_list, train_size, test_size, fee, periods_per_year):
+    """
+    한 ticker에 대해 여러 파라미터 조합을 walk-forward 구간별로 평가 (worker 프로세스에서 실행)
+    """
+    arrays = _worker['data'][ticker]
+    close = arrays['close']
+    if train_size is None:
+        splits = [(slice(0, len(close)), slice(len(close), len(close)))]
+    else:
+        splits = walk_forward_splits(len(close), train_size, test_size)
+
+    rows = []
+    for params in params_list:
+        # 지표는 과거 값만 사용하므로 전체 구간에서 한 번만 계산
+        signals = signal(arrays, **params)
+        for i, (train, test) in enumerate(splits):
+            row = {'ticker': ticker, 'split': i, **params}
+            for name, part in (('train', train), ('test', test)):
+                if part.stop - part.start < 2:
+                    continue
+                stats = vectorized_backtest(close[part], signals[part], fee=fee, periods_per_year=periods_per_year)['stats']
+                row[f'{name}_return'] = float(stats['total_return'])
+                row[f'{name}_sharpe'] = float(stats['sharpe'])
+                row[f'{name}_max_drawdown'] = float(stats['max_drawdown'])
+            rows.append(row)
+
+    return rows
+
+
+def _task_key(ticker, params):
+    return json.dumps([ticker, params], sort_keys=True, default=str)
+
+
+def sweep(data, signal, grid, train_size=None, test_size=None, fee=0.0005, periods_per_year=365, checkpoint=None, max_workers=None, chunk_size=16):
+    """
+    모든 ticker × 파라미터 조합을 프로세스 풀에서 병렬로 백테스트하는 메서드
+    OHLCV 배열은 shared memory로 공유하고, 결과는 checkpoint 파일(JSONL)에 바로 기록해
+    중단 후 다시 실행하면 끝난 조합은 건너뛴다. (평가 구간이 없어 결과 행이 없는 조합도 완료 표시 행을 남김)
+
+    :param data: {ticker: OHLCV DataFrame}
+    :param signal: signal(arrays, **params) -> 목표 비중 배열, 모듈 최상위 함수여야 함 (예: sma_cross_signal)
+    :param grid: param_grid 결과
+    :param train_size: walk-forward 학습 봉 수 (비우면 전체 구간 한 번만 평가)
+    :param test_size: walk-forward 검증 봉 수
+    :param checkpoint: 결과를 이어 쓸 JSONL 파일 경로
+    :param max_workers: 프로세스 수 (비우면 CPU 코어 수)
+    :param chunk_size: 한 작업에 묶을 파라미터 조합 수
+    :return: 결과 DataFrame (ticker, split, 파라미터, train/test 성과)
+    """
+    rows, done = [], set()
+    if checkpoint is not None and os.path.exists(checkpoint):
+        with open(checkpoint, 'r', encoding='utf-8') as file:
+            for line in file:
+                row = json.loads(line)
+                done.add(_task_key(row['ticker'], {k: row[k] for k in grid[0]}))
+                if not row.get('completed'):
+                    rows.append(row)
+
+    tasks = []
+    for ticker in data:
+        todo = [p for p in grid if _task_key(ticker, p) not in done]
+        for i in range(0, len(todo), chunk_size):
+            tasks.append((ticker, todo[i:i + chunk_size]))
+
+    print(f"[Optimizer] {len(tasks)}개 작업 시작 (완료된 조합 {len(done)}개 건너뜀)")
+
+    with SharedOHLCV(data) as shared:
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(shared.spec,)) as executor:
+            futures = {
+                executor.submit(_evaluate, ticker, signal, params_list, train_size, test_size, fee, periods_per_year): (ticker, params_list)
+                for ticker, params_list in tasks
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                rows.extend(result)
+                if checkpoint is not None:
+                    ticker, params_list = futures[future]
+                    with open(checkpoint, 'a', encoding='utf-8') as file:
+                        for row in result:
+                            file.write(json.dumps(row) + '\n')
+                        # 결과 행 뒤에 조합마다 완료 표시를 써서 중간에 끊긴 작업과 구분
+                        for params in params_list:
+                            file.write(json.dumps({'ticker': ticker, **params, 'completed': True}) + '\n')
+
+    return pd.DataFrame(rows)
+
+
+def walk_forward_report(results, params, metric='train_sharpe'):
+    """
+    구간마다 학습 성과가 가장 좋은 파라미터를 골라 검증 성과를 모으는 메서드
+
+    :param results: sweep 결과 DataFrame
+    :param params: 파라미터 컬럼 이름 list
+    :param metric: 파라미터 선택 기준 컬럼
+    :return: ticker, split별 선택된 파라미터와 검증 성과 DataFrame
+    """
+    best = results.loc[results.groupby(['ticker', 'split'])[metric].idxmax()]
+    return best[['ticker', 'split'] + list(params) + [c for c in results.columns if c.startswith('test_')]].reset_index(drop=True)
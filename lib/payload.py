@@ -0,0 +1,180 @@
+import json
+import math
+import hashlib
+import numpy as np
+import pandas as pd
+
+from lib.cache import TTLCache
+from lib.metrics import metrics
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+def to_json(obj):
+    """
+    공백 없는 JSON 문자열 (한글은 escape 하지 않음)
+    """
+    return json.dumps(obj, separators=(',', ':'), ensure_ascii=False, default=str)
+
+
+def estimate_tokens(text):
+    """
+    토큰 수 추정 (tiktoken이 있으면 정확히 계산, 없으면 4글자당 1토큰으로 근사)
+    """
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def _round_sig(value, digits):
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return None
+    if value == 0:
+        return 0
+    rounded = float(f"{value:.{digits}g}")
+    return int(rounded) if rounded.is_integer() else rounded
+
+
+def compact_market_data(df, rows=None, digits=6):
+    """
+    지표가 포함된 OHLCV DataFrame을 split 형식의 작은 dict로 변환하는 메서드
+    유효 숫자 digits자리로 반올림하고, NaN은 null, 날짜는 'YYYY-MM-DD'로 줄인다.
+    지시문의 Market Analysis 구조(columns/index/data)는 그대로 유지한다.
+
+    :param rows: 최근 몇 행만 남길지 (비우면 전체)
+    :return: {'columns': [...], 'index': [...], 'data': [[...], ...]}
+    """
+    if rows is not None:
+        df = df.iloc[-rows:]
+    if 'value' in df.columns and 'volume' in df.columns:
+        # 거래대금은 close * volume과 거의 같으므로 제외
+        df = df.drop(columns=['value'])
+
+    index = pd.DatetimeIndex(df.index)
+    daily = bool((index == index.normalize()).all())
+    labels = index.strftime('%Y-%m-%d' if daily else '%Y-%m-%d %H:%M')
+
+    values = df.to_numpy(dtype=np.float64)
+    data = [[_round_sig(v, digits) for v in row] for row in values.tolist()]
+
+    return {'columns': list(df.columns), 'index': list(labels), 'data': data}
+
+
+def compact_orderbook(orderbook, levels=5):
+    """
+    호가 정보에서 상위 levels개 호가만 남기는 메서드
+    지시문의 Current Investment State 예시와 같은 key를 유지하고 수량만 반올림한다.
+
+    :param orderbook: pyupbit.get_orderbook 또는 WebSocket orderbook 메시지
+    :return: {'market', 'timestamp', 'total_ask_size', 'total_bid_size', 'orderbook_units': [...]}
+    """
+    units = [
+        {
+            'ask_price': u['ask_price'],
+            'bid_price': u['bid_price'],
+            'ask_size': _round_sig(u['ask_size'], 4),
+            'bid_size': _round_sig(u['bid_size'], 4),
+        }
+        for u in orderbook.get('orderbook_units', [])[:levels]
+    ]
+    return {
+        'market': orderbook.get('market'),
+        'timestamp': orderbook.get('timestamp'),
+        'total_ask_size': _round_sig(orderbook.get('total_ask_size', 0), 6),
+        'total_bid_size': _round_sig(orderbook.get('total_bid_size', 0), 6),
+        'orderbook_units': units,
+    }
+
+
+def compact_news(news, limit=None):
+    """
+    뉴스 list를 (Title, Timestamp, Time) tuple list로 변환하는 메서드
+    """
+    news = news if limit is None else news[:limit]
+    return [[n['Title'], n['Timestamp'], n['Time']] for n in news]
+
+
+def compact_fear_greed(data, limit=None):
+    """
+    공포 탐욕 지수 list를 split 형식으로 변환하는 메서드 (최신순)
+
+    :param data: alternative.me fng API의 data list
+    :return: {'columns': ['date', 'value', 'value_classification'], 'data': [[...], ...]}
+    """
+    data = data if limit is None else data[:limit]
+    rows = []
+    for d in data:
+        timestamp = d.get('timestamp', '')
+        date = pd.Timestamp(int(timestamp), unit='s').strftime('%Y-%m-%d') if str(timestamp).isdigit() else timestamp
+        rows.append([date, int(d['value']), d['value_classification']])
+    return {'columns': ['date', 'value', 'value_classification'], 'data': rows}
+
+
+class PayloadBuilder:
+    """
+    LLM 요청 메시지를 만드는 클래스
+    - 고정된 지시문(instructions)을 항상 첫 system 메시지로 두어 provider의 prompt cache가 같은 prefix를 재사용하도록 함
+    - 입력 섹션을 압축 JSON으로 만들고, 토큰 예산을 넘으면 가장 큰 섹션부터 줄임
+    - 같은 메시지의 요청은 ttl 동안 이전 응답을 재사용
+
+    :param instructions: 지시문
+    :param budget: 전체 메시지 토큰 예산
+    :param ttl: 같은 요청의 응답을 재사용할 시간 (초)
+    """
+    def __init__(self, instructions, budget=8000, ttl=300):
+        self.instructions = instructions
+        self.instructions_tokens = estimate_tokens(instructions)
+        self.budget = budget
+        self.responses = TTLCache(ttl=ttl, maxsize=256)
+
+    def build(self, sections):
+        """
+        섹션 list로 메시지를 만드는 메서드
+
+        :param sections: [(이름, render(level)), ...] 메시지 순서대로.
+            render는 level이 클수록 작은 객체를 반환하고, 더 줄일 수 없으면 None을 반환한다.
+            예산을 넘으면 list 뒤쪽 섹션부터가 아니라 가장 큰 섹션부터 한 단계씩 줄인다.
+        :return: (messages, 섹션별 토큰 수 dict)
+        """
+        levels = {name: 0 for name, _ in sections}
+        renders = dict(sections)
+        texts = {name: to_json(render(0)) for name, render in sections}
+        tokens = {name: estimate_tokens(text) for name, text in texts.items()}
+        exhausted = set()
+
+        while self.instructions_tokens + sum(tokens.values()) > self.budget:
+            candidates = [name for name in tokens if name not in exhausted]
+            if not candidates:
+                print(f"[Payload] 토큰 예산 {self.budget} 초과: {self.instructions_tokens + sum(tokens.values())}")
+                break
+
+            name = max(candidates, key=lambda n: tokens[n])
+            obj = renders[name](levels[name] + 1)
+            if obj is None:
+                exhausted.add(name)
+                continue
+            levels[name] += 1
+            texts[name] = to_json(obj)
+            tokens[name] = estimate_tokens(texts[name])
+
+        messages = [{"role": "system", "content": self.instructions}]
+        messages += [{"role": "user", "content": texts[name]} for name, _ in sections]
+
+        return messages, tokens
+
+    def complete(self, client, model, messages, **kwargs):
+        """
+        client.chat.completions.create 호출 결과 문자열을 반환하는 메서드 (같은 요청은 캐시 사용)
+        """
+        key = hashlib.sha256(to_json([model, messages, kwargs]).encode('utf-8')).hexdigest()
+
+        def create():
+            with metrics.timer('llm_call', model=model):
+                response = client.chat.completions.create(model=model, messages=messages, **kwargs)
+            return response.choices[0].message.content
+
+        return self.responses.get_or_compute(key, create)
@@ -0,0 +1,457 @@
+import os
+import json
+import math
+import time
+import threading
+
+from lib.slicing import order_fills
+
+
+class Ledger:
+    """
+    전략 하나의 sub-ledger (할당 금액, 현금, 보유 종목)
+    거래소 계좌는 여러 전략이 함께 쓰고, 각 전략의 현금과 수량은 체결로만 바뀐다.
+
+    :param name: 전략 이름
+    :param capital: 할당 금액 (config.json의 balance)
+    """
+    def __init__(self, name, capital, cash=None, positions=None, reserved=0.0, realized=0.0, peak=None, halted=False):
+        self.name = name
+        self.capital = float(capital)
+        self.cash = float(capital if cash is None else cash)
+        self.positions = positions or {}    # {ticker: {'volume', 'cost'}}, cost는 수수료 포함 매수 금액
+        self.reserved = reserved    # 체결 전인 매수 주문 금액
+        self.realized = realized
+        self.peak = peak
+        self.halted = halted
+
+    @property
+    def available(self):
+        return max(self.cash - self.reserved, 0.0)
+
+    def volume(self, ticker):
+        return self.positions.get(ticker, {}).get('volume', 0.0)
+
+    def apply_fill(self, ticker, side, volume, funds, fee):
+        """
+        체결을 반영하는 메서드
+
+        :param side: 'bid' (매수), 'ask' (매도)
+        :param funds: 체결 금액 (수수료 제외)
+        """
+        position = self.positions.setdefault(ticker, {'volume': 0.0, 'cost': 0.0})
+        if side == 'bid':
+            self.cash -= funds + fee
+            position['volume'] += volume
+            position['cost'] += funds + fee
+        else:
+            held = position['volume']
+            sold = min(volume, held)
+            cost = position['cost'] * sold / held if held else 0.0
+            self.cash += funds - fee
+            self.realized += funds - fee - cost
+            position['volume'] = held - sold
+            position['cost'] -= cost
+        if position['volume'] <= 1e-12:
+            del self.positions[ticker]
+
+    def value(self, prices):
+        """
+        평가 금액 (가격이 없는 종목은 평균 매수가)
+        """
+        total = self.cash
+        for ticker, position in self.positions.items():
+            price = prices.get(ticker)
+            total += position['volume'] * price if price else position['cost']
+        return total
+
+    def to_dict(self):
+        return {
+            'capital': self.capital, 'cash': self.cash, 'positions': self.positions, 'reserved': self.reserved,
+            'realized': self.realized, 'peak': self.peak, 'halted': self.halted,
+        }
+
+
+class Portfolio:
+    """
+    전략별 sub-ledger와 위험 한도로 주문 크기를 정하는 클래스
+    - 전략 결정의 비율은 계좌 전체가 아니라 전략의 가용 현금/보유 수량 기준
+    - 주문 전 거래소를 다시 조회하지 않고 ledger, ExecutionEngine의 잔고 캐시, 마지막 가격으로 계산
+    - 체결은 ExecutionEngine.on_fill(on_fill), 분할 주문 결과(apply_reports)로 반영
+    - 위험 한도: 종목당 최대 비중(max_position), 변동성 목표(target_volatility), 낙폭 정지(drawdown_stop)
+
+    :param engine: ExecutionEngine (잔고 캐시, min_order 사용)
+    :param get_prices: ticker list를 받아 {ticker: 현재가}를 반환하는 함수 (UpbitExchanger.get_current_price 등)
+    :param max_position: 종목 하나의 평가 금액이 ledger 평가 금액에서 차지할 수 있는 최대 비율
+    :param target_volatility: 연 변동성 목표 (예: 0.6), 종목 변동성이 이보다 크면 매수 금액을 비례해 줄임
+    :param drawdown_stop: ledger 평가 금액이 고점 대비 이 비율 이상 하락하면 매수 중지 (예: 0.2)
+    :param halflife: 변동성 EWMA 반감기 (표본 수)
+    :param sample_interval: 변동성 표본 사이 최소 간격 (초), 이보다 짧은 간격의 가격 변화는 호가 잡음이므로 표본으로 쓰지 않음
+    :param fee: 매수 금액에서 남겨둘 수수료 비율
+    :param state_path: ledger 저장 파일 (비우면 저장하지 않음), 예약 금액과 체결 전 주문 uuid도 함께 저장
+    :param fill_retries: 체결 금액이 빠진 응답을 받았을 때 get_order로 다시 조회할 횟수
+    :param retry_delay: 다시 조회하기 전 대기 시간 (초, 시도마다 늘어남)
+    """
+    def __init__(self, engine, get_prices=None, max_position=1.0, target_volatility=None, drawdown_stop=None,
+                 halflife=20, sample_interval=86400, fee=0.0005, state_path='./data/portfolio.json', fill_retries=3, retry_delay=1.0):
+        self.engine = engine
+        self.get_prices = get_prices
+        self.defaults = {'max_position': max_position, 'target_volatility': target_volatility, 'drawdown_stop': drawdown_stop}
+        self.alpha = 1 - 0.5 ** (1 / halflife)
+        self.sample_interval = sample_interval
+        self.fee = fee
+        self.state_path = state_path
+        self.fill_retries = fill_retries
+        self.retry_delay = retry_delay
+
+        self.ledgers = {}
+        self.limits = {}
+        self.pending = {}    # {uuid: (전략 이름, 예약한 매수 금액)}
+        self.prices = {}
+        self.sampled = {}    # {ticker: (마지막 표본 가격, 시각)}
+        self.variances = {}
+        self.observations = {}
+        self.lock = threading.RLock()
+        self.load()
+
+    def load(self):
+        if not self.state_path or not os.path.exists(self.state_path):
+            return
+        with open(self.state_path, encoding='utf-8') as file:
+            state = json.load(file)
+        for name, data in state.items():
+            pending = data.pop('pending', {})
+            self.ledgers[name] = Ledger(name, **data)
+            for uuid, amount in pending.items():
+                self.pending[uuid] = (name, amount)
+        if self.pending and self.engine is not None:
+            self.reconcile()
+
+    def save(self):
+        if not self.state_path:
+            return
+        # on_fill(engine tracker thread), track/apply_reports(scheduler worker)가 동시에 저장하므로 쓰는 동안 lock 유지
+        with self.lock:
+            state = {name: ledger.to_dict() for name, ledger in self.ledgers.items()}
+            for uuid, (name, amount) in self.pending.items():
+                state[name].setdefault('pending', {})[uuid] = amount
+            os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+            temp = f"{self.state_path}.tmp"
+            with open(temp, 'w', encoding='utf-8') as file:
+                json.dump(state, file)
+            os.replace(temp, self.state_path)
+
+    def reconcile(self):
+        """
+        저장해 둔 체결 전 주문을 거래소와 맞추는 메서드 (load에서 호출)
+        끝난 주문은 바로 반영하고, 아직 열려 있는 주문은 engine이 다시 추적하게 하고,
+        거래소에 없는 주문은 예약 금액을 해제한다. 조회에 실패한 주문은 다음 reconcile까지 남겨둔다.
+        """
+        with self.lock:
+            uuids = list(self.pending)
+
+        finished, unknown = [], []
+        for uuid in uuids:
+            try:
+                order = self.engine.exchanger.get_order(uuid)
+            except Exception as e:
+                print(f"[Portfolio] {uuid} 주문 조회 실패: {e}")
+                continue
+            if not isinstance(order, dict) or order.get('uuid') != uuid:
+                unknown.append(uuid)
+            elif order.get('state') in self.engine.FINAL_STATES:
+                finished.append(order)
+            else:
+                self.engine.track([order])
+
+        for order in finished:
+            self.on_fill(order)
+        if unknown:
+            with self.lock:
+                for uuid in unknown:
+                    self._drop_pending(uuid, "거래소에 없는 주문")
+            self.save()
+
+    def _drop_pending(self, uuid, reason):
+        # lock을 잡은 상태에서 호출, 체결을 반영하지 못한 주문의 예약 금액을 해제
+        entry = self.pending.pop(uuid, None)
+        if entry is None:
+            return
+        name, amount = entry
+        ledger = self.ledgers[name]
+        ledger.reserved = max(ledger.reserved - amount, 0.0)
+        print(f"[Portfolio] {name} 주문 {uuid}: {reason}, 예약 금액 {amount:.0f}원 해제 (체결은 반영하지 않음)")
+
+    def allocate(self, name, capital, **limits):
+        """
+        전략에 금액을 할당하는 메서드 (이미 있으면 할당 금액이 바뀐 만큼만 현금을 늘리거나 줄임)
+
+        :param limits: 전략별 위험 한도 (max_position, target_volatility, drawdown_stop), 비우면 기존 한도 유지
+        :return: Ledger
+        """
+        with self.lock:
+            if limits or name not in self.limits:
+                self.limits[name] = {**self.defaults, **limits}
+            ledger = self.ledgers.get(name)
+            if ledger is None:
+                ledger = self.ledgers[name] = Ledger(name, capital)
+            elif ledger.capital != float(capital):
+                print(f"[Portfolio] {name} 할당 금액 변경 {ledger.capital:.0f} -> {float(capital):.0f}")
+                ledger.cash += float(capital) - ledger.capital
+                ledger.capital = float(capital)
+        return ledger
+
+    def reset(self, name):
+        """
+        낙폭 정지를 해제하고 고점을 현재 평가 금액으로 다시 잡는 메서드
+        """
+        with self.lock:
+            ledger = self.ledgers[name]
+            ledger.halted = False
+            ledger.peak = ledger.value(self.prices)
+
+    def mark(self, prices, now=None):
+        """
+        현재가를 반영하는 메서드
+        종목별 변동성(EWMA, 시간 간격으로 정규화한 연 변동성)과 ledger 고점/낙폭을 갱신한다.
+        변동성 표본은 마지막 표본에서 sample_interval 이상 지났을 때만 추가한다.
+
+        :param prices: {ticker: 현재가}
+        """
+        now = time.time() if now is None else now
+        with self.lock:
+            for ticker, price in prices.items():
+                self.prices[ticker] = price
+                previous, sampled_at = self.sampled.get(ticker, (None, None))
+                if previous is None:
+                    self.sampled[ticker] = (price, now)
+                elif now - sampled_at >= self.sample_interval:
+                    days = (now - sampled_at) / 86400
+                    sample = math.log(price / previous) ** 2 / days
+                    variance = self.variances.get(ticker)
+                    self.variances[ticker] = sample if variance is None else variance + self.alpha * (sample - variance)
+                    self.observations[ticker] = self.observations.get(ticker, 0) + 1
+                    self.sampled[ticker] = (price, now)
+
+            for name, ledger in self.ledgers.items():
+                equity = ledger.value(self.prices)
+                ledger.peak = equity if ledger.peak is None else max(ledger.peak, equity)
+                stop = self.limits.get(name, self.defaults)['drawdown_stop']
+                if stop and not ledger.halted and equity <= ledger.peak * (1 - stop):
+                    ledger.halted = True
+                    print(f"[Portfolio] {name} 고점 대비 {equity / ledger.peak - 1:.1%} 하락, 매수 중지")
+
+    def seed_volatility(self, volatilities, periods_per_year=365):
+        """
+        저장된 캔들로 계산한 변동성으로 EWMA를 초기화하는 메서드 (screener의 volatility factor 등)
+
+        :param volatilities: {ticker: 봉 단위 로그 수익률 표준편차}
+        """
+        with self.lock:
+            for ticker, volatility in volatilities.items():
+                if volatility and math.isfinite(volatility):
+                    self.variances[ticker] = volatility ** 2 * periods_per_year / 365
+                    self.observations[ticker] = max(self.observations.get(ticker, 0), 5)
+
+    def volatility(self, ticker):
+        """
+        연 변동성 추정치 (관측이 5번 미만이면 None)
+        """
+        if self.observations.get(ticker, 0) < 5:
+            return None
+        return math.sqrt(self.variances[ticker] * 365)
+
+    def exposure(self, name):
+        """
+        ledger의 현재 노출 요약
+
+        :return: {'equity', 'cash', 'positions': {ticker: 평가 금액}, 'gross', 'drawdown', 'realized', 'halted'}
+        """
+        with self.lock:
+            ledger = self.ledgers[name]
+            equity = ledger.value(self.prices)
+            positions = {t: p['volume'] * self.prices.get(t, 0.0) or p['cost'] for t, p in ledger.positions.items()}
+            return {
+                'equity': equity,
+                'cash': ledger.cash,
+                'positions': positions,
+                'gross': sum(positions.values()) / equity if equity > 0 else 0.0,
+                'drawdown': equity / ledger.peak - 1 if ledger.peak else 0.0,
+                'realized': ledger.realized,
+                'halted': ledger.halted,
+            }
+
+    def refresh_prices(self, tickers):
+        if self.get_prices is None or not tickers:
+            return
+        try:
+            self.mark(self.get_prices(list(tickers)))
+        except Exception as e:
+            print(f"[Portfolio] 현재가 조회 실패: {e}")
+
+    def plan(self, name, decisions):
+        """
+        전략 결정을 ledger와 위험 한도 안에서 주문 list로 바꾸는 메서드
+        - 매수: 가용 현금 * 비율 (비율 합이 1을 넘으면 줄임), 변동성 목표와 종목 최대 비중, 계좌 KRW 잔고로 제한
+        - 매도: ledger 보유 수량 * 비율, 계좌 보유 수량으로 제한
+        - 낙폭 정지 중이면 매수하지 않음
+        매수 금액은 체결될 때까지 예약(reserved)해 다음 주문에서 다시 쓰지 않는다.
+
+        :param decisions: [(ticker, action, percentage, price), ...], price가 없으면 시장가
+        :return: ExecutionEngine.submit/run_sliced에 넣을 주문 list
+        """
+        self.refresh_prices({ticker for ticker, _, _, _ in decisions})
+        balances = self.engine.refresh_balances()
+        min_order = self.engine.min_order
+
+        with self.lock:
+            ledger = self.ledgers[name]
+            limits = self.limits.get(name, self.defaults)
+            equity = ledger.value(self.prices)
+            krw = balances.get('KRW', {}).get('balance', 0.0)    # 체결 전 주문 금액은 거래소가 locked로 옮겨 이미 빠져 있음
+            cash = base = ledger.available
+
+            total = sum(percentage for _, action, percentage, _ in decisions if action == 'buy')
+            scale = 1 / total if total > 1 else 1
+
+            orders = []
+            for ticker, action, percentage, price in decisions:
+                if action == 'buy':
+                    if ledger.halted:
+                        print(f"[Portfolio] {name} 낙폭 정지 중이라 {ticker} 매수 건너뜀")
+                        continue
+                    amount = base * percentage * scale
+                    volatility = self.volatility(ticker)
+                    if limits['target_volatility'] and volatility:
+                        amount *= min(1.0, limits['target_volatility'] / volatility)
+                    mark = self.prices.get(ticker) or price
+                    held = ledger.volume(ticker) * mark if mark else ledger.positions.get(ticker, {}).get('cost', 0.0)
+                    amount = min(amount, limits['max_position'] * equity - held, cash, krw) * (1 - self.fee)
+                    if amount < min_order:
+                        print(f"[Portfolio] {name} {ticker} 매수 금액 {max(amount, 0):.0f}원이 최소 주문 금액보다 작아 건너뜀")
+                        continue
+                    cash -= amount
+                    krw -= amount
+                    if price:
+                        orders.append({'ticker': ticker, 'side': 'bid', 'ord_type': 'limit', 'price': price, 'volume': round(amount / price, 8)})
+                    else:
+                        orders.append({'ticker': ticker, 'side': 'bid', 'ord_type': 'price', 'price': round(amount)})
+                elif action == 'sell':
+                    held = balances.get(self.engine._currency(ticker), {}).get('balance', 0.0)
+                    volume = round(min(ledger.volume(ticker) * percentage, held), 8)
+                    mark = price or self.prices.get(ticker)
+                    if volume <= 0 or (mark and mark * volume < min_order):
+                        print(f"[Portfolio] {name} {ticker} 매도 수량이 부족해 건너뜀")
+                        continue
+                    if price:
+                        orders.append({'ticker': ticker, 'side': 'ask', 'ord_type': 'limit', 'price': price, 'volume': volume})
+                    else:
+                        orders.append({'ticker': ticker, 'side': 'ask', 'ord_type': 'market', 'volume': volume})
+
+            # 해제할 때와 같은 값이 되도록 반올림한 주문 금액으로 예약
+            ledger.reserved += sum(self._order_amount(order) for order in orders)
+
+        return orders
+
+    def _order_amount(self, order):
+        if order['side'] != 'bid':
+            return 0.0
+        if order['ord_type'] == 'price':
+            return float(order['price'])
+        return float(order['price']) * float(order['volume'])
+
+    def release(self, name, orders):
+        """
+        제출하지 못한 주문의 예약 금액을 해제하는 메서드 (plan 후 주문 실행이 실패한 경우)
+
+        :param orders: plan 결과 중 거래소에 전달되지 않은 주문
+        """
+        with self.lock:
+            ledger = self.ledgers[name]
+            for order in orders:
+                ledger.reserved = max(ledger.reserved - self._order_amount(order), 0.0)
+
+    def track(self, name, orders, results):
+        """
+        submit 결과의 주문 uuid를 전략에 연결하는 메서드 (실패한 주문의 예약 금액은 바로 해제)
+        연결하기 전에 이미 끝난 주문(engine.finished)은 여기서 반영한다.
+
+        :param orders: plan 결과
+        :param results: ExecutionEngine.submit 결과 (orders와 같은 순서)
+        """
+        uuids = []
+        with self.lock:
+            ledger = self.ledgers[name]
+            for order, result in zip(orders, results):
+                amount = self._order_amount(order)
+                if 'uuid' in result:
+                    self.pending[result['uuid']] = (name, amount)
+                    uuids.append(result['uuid'])
+                else:
+                    ledger.reserved = max(ledger.reserved - amount, 0.0)
+        # 재시작해도 체결 전 주문을 이어서 반영할 수 있도록 pending을 바로 저장
+        self.save()
+
+        with self.engine.condition:
+            finished = [self.engine.finished[u] for u in uuids if u in self.engine.finished]
+        for order in finished:
+            self.on_fill(order)
+
+    def on_fill(self, order):
+        """
+        주문이 끝났을 때 ledger에 체결을 반영하는 메서드 (ExecutionEngine(on_fill=...)에 연결)
+        추적 중이 아닌 주문(다른 프로그램, 전략 밖에서 낸 주문)은 무시한다.
+        체결 금액을 알 수 없는 응답(trades가 없는 시장가 매도)이면 get_order로 체결 내역을 다시 조회하고,
+        fill_retries번 조회해도 알 수 없으면 예약 금액만 해제한다.
+        """
+        uuid = order['uuid']
+        with self.lock:
+            if uuid not in self.pending:
+                return
+
+        volume, funds, fee = order_fills(order)
+        for attempt in range(self.fill_retries if funds is None else 0):
+            if attempt:
+                time.sleep(self.retry_delay * attempt)
+            try:
+                detail = self.engine.exchanger.get_order(uuid)
+                if isinstance(detail, dict) and detail.get('uuid') == uuid:
+                    order = detail
+                    volume, funds, fee = order_fills(order)
+                    if funds is not None:
+                        break
+            except Exception as e:
+                print(f"[Portfolio] {uuid} 주문 조회 실패: {e}")
+        if funds is None:
+            # 0원으로 반영하면 ledger 현금이 사라지고, pending에 남겨두면 예약 금액이 풀리지 않으므로 해제만 함
+            with self.lock:
+                self._drop_pending(uuid, f"{order['market']} 체결 금액을 알 수 없음")
+            self.save()
+            return
+
+        with self.lock:
+            entry = self.pending.pop(uuid, None)
+            if entry is None:
+                return
+            name, amount = entry
+            ledger = self.ledgers[name]
+            ledger.reserved = max(ledger.reserved - amount, 0.0)
+            if volume > 0:
+                ledger.apply_fill(order['market'], order['side'], volume, funds, fee)
+                print(f"[Portfolio] {name} {order['market']} {order['side']} {volume:.8f} 체결 {funds:.0f}원")
+        self.save()
+
+    def apply_reports(self, name, orders, reports):
+        """
+        분할 주문(ExecutionEngine.run_sliced) 결과를 ledger에 반영하는 메서드
+
+        :param orders: plan 결과
+        :param reports: run_sliced 결과 (orders와 같은 순서)
+        """
+        with self.lock:
+            ledger = self.ledgers[name]
+            for order, report in zip(orders, reports):
+                ledger.reserved = max(ledger.reserved - self._order_amount(order), 0.0)
+                if report['executed_volume'] > 0:
+                    ledger.apply_fill(report['ticker'], report['side'], report['executed_volume'], report['executed_funds'], report['paid_fee'])
+        self.save()
@@ -0,0 +1,124 @@
+import os
+import time
+import hashlib
+import threading
+import importlib.util
+import numpy as np
+
+from lib.metrics import metrics
+
+
+class StrategyRegistry:
+    """
+    전략 모듈을 한 번만 불러와 보관하는 registry
+    모듈 수준에서 만든 client와 상태를 실행마다 유지하고, 파일의 mtime이 바뀌고 내용(hash)도 바뀌었을 때만 다시 불러온다.
+    다시 불러올 때는 새 모듈을 불러온 뒤 이전 모듈의 close()가 있으면 호출해 browser pool 등 자원을 정리한다.
+    불러오는 시간과 전략 결정 시간을 따로 기록한다.
+
+    :param directory: 전략 파일 폴더
+    :param history: 전략별로 보관할 최근 결정 시간 수
+    """
+    def __init__(self, directory="./strategies", history=1000):
+        self.directory = directory
+        self.history = history
+        self.modules = {}
+        self.locks = {}
+
+    def _path(self, name):
+        return os.path.join(self.directory, f"{name}.py")
+
+    def _load(self, name, path, digest, mtime):
+        start = time.perf_counter()
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        load_time = time.perf_counter() - start
+        metrics.observe('strategy_load', load_time, strategy=name)
+
+        entry = self.modules.get(name, {'loads': 0, 'load_time': 0.0, 'decision_times': []})
+        if 'module' in entry:
+            self._close(name, entry['module'])
+        entry.update({
+            'module': module,
+            'hash': digest,
+            'mtime': mtime,
+            'loads': entry['loads'] + 1,
+            'load_time': entry['load_time'] + load_time,
+            'last_load_time': load_time,
+        })
+        self.modules[name] = entry
+        print(f"[Registry] {name} 전략 불러옴 ({load_time:.3f}s)")
+
+        return module
+
+    def _close(self, name, module):
+        close = getattr(module, 'close', None)
+        if not callable(close):
+            return
+        try:
+            close()
+        except Exception as e:
+            print(f"[Registry] {name} 이전 모듈 정리 실패: {e}")
+
+    def close(self):
+        """
+        불러온 모든 전략 모듈의 close()를 호출하는 메서드 (프로그램 종료 시)
+        """
+        for name, entry in list(self.modules.items()):
+            self._close(name, entry['module'])
+
+    def get(self, name):
+        """
+        전략 모듈을 반환하는 메서드 (파일이 바뀐 경우에만 다시 불러옴)
+        """
+        path = self._path(name)
+        mtime = os.stat(path).st_mtime_ns
+
+        # 전략마다 따로 잠가서 한 전략을 불러오는 동안 다른 전략이 기다리지 않도록 함
+        with self.locks.setdefault(name, threading.Lock()):
+            entry = self.modules.get(name)
+            if entry is not None and entry['mtime'] == mtime:
+                return entry['module']
+
+            with open(path, 'rb') as file:
+                digest = hashlib.sha256(file.read()).hexdigest()
+            if entry is not None and entry['hash'] == digest:
+                # 내용은 그대로이고 mtime만 바뀐 경우 (touch, git checkout 등)
+                entry['mtime'] = mtime
+                return entry['module']
+
+            return self._load(name, path, digest, mtime)
+
+    def run(self, name, *args, **kwargs):
+        """
+        전략의 strategy()를 실행하고 결정 시간을 기록하는 메서드
+
+        :return: strategy()의 반환값
+        """
+        module = self.get(name)
+
+        start = time.perf_counter()
+        try:
+            return module.strategy(*args, **kwargs)
+        finally:
+            decision_time = time.perf_counter() - start
+            metrics.observe('strategy_decision', decision_time, strategy=name)
+            entry = self.modules[name]
+            entry['decision_times'] = (entry['decision_times'] + [decision_time])[-self.history:]
+
+    def stats(self):
+        """
+        전략별 통계 {name: {'loads', 'load_time', 'last_load_time', 'decisions', 'decision_p50', 'decision_p99'}}
+        """
+        result = {}
+        for name, entry in list(self.modules.items()):
+            times = entry['decision_times']
+            result[name] = {
+                'loads': entry['loads'],
+                'load_time': entry['load_time'],
+                'last_load_time': entry['last_load_time'],
+                'decisions': len(times),
+                'decision_p50': float(np.percentile(times, 50)) if times else None,
+                'decision_p99': float(np.percentile(times, 99)) if times else None,
+            }
+        return result
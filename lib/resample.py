@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from lib.store import OHLCVStore
+
+
+# Upbit interval 순서 (앞의 interval로 뒤의 interval을 만들 수 있는지는 can_resample 참조)
+INTERVALS = ['1m', '3m', '5m', '10m', '15m', '30m', '60m', '240m', 'days', 'weeks', 'months']
+
+MINUTE_NS = 60 * 10 ** 9
+DAY_NS = 1440 * MINUTE_NS
+# Upbit 주봉은 월요일 00:00 UTC에 시작 (1970-01-01은 목요일이므로 4일 뒤가 첫 월요일)
+WEEK_OFFSET_NS = 4 * DAY_NS
+
+
+def _minutes(interval):
+    if interval[-1] == 'm':
+        return int(interval[:-1])
+    return {'days': 1440, 'weeks': 7 * 1440}.get(interval)
+
+
+def can_resample(base, interval):
+    """
+    base interval 캔들로 interval 캔들을 만들 수 있는지 확인하는 메서드
+    interval의 모든 캔들 경계가 base 캔들 경계와 겹쳐야 한다. (예: 1m -> 모두, days -> weeks, months / weeks -> months 불가)
+    """
+    if INTERVALS.index(base) >= INTERVALS.index(interval):
+        return False
+    if interval == 'months':
+        return base != 'weeks'
+    return _minutes(interval) % _minutes(base) == 0
+
+
+def bucket_starts(timestamps, interval):
+    """
+    각 timestamp가 속한 interval 캔들의 시작 시각 (Upbit UTC 캔들 경계)
+    분봉과 일봉은 epoch 기준 고정 간격, 주봉은 월요일 00:00, 월봉은 매월 1일 00:00
+
+    :param timestamps: int64 epoch-ns 배열
+    :return: int64 epoch-ns 배열
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    if interval == 'months':
+        if len(timestamps) == 0:
+            return timestamps
+        # 날짜가 바뀌는 행만 datetime64[M]로 변환해 반복 (행마다 달력 계산을 하지 않음)
+        days = timestamps // DAY_NS
+        changes = np.concatenate([[0], np.flatnonzero(np.diff(days)) + 1])
+        months = days[changes].astype('datetime64[D]').astype('datetime64[M]').astype('datetime64[ns]').view(np.int64)
+        return np.repeat(months, np.diff(np.append(changes, len(days))))
+    if interval == 'weeks':
+        return (timestamps - WEEK_OFFSET_NS) // (7 * DAY_NS) * (7 * DAY_NS) + WEEK_OFFSET_NS
+    step = _minutes(interval) * MINUTE_NS
+    return timestamps // step * step
+
+
+def resample_ohlcv(df, interval):
+    """
+    낮은 interval OHLCV를 interval 캔들로 합치는 메서드
+    정렬된 캔들을 캔들 경계마다 자른 뒤 reduceat으로 구간별 open/high/low/close/volume을 한 번에 계산한다.
+    거래량 0인 캔들(fill_empty_rows_volume_zero로 채운 행)은 가격 계산에서 제외하고,
+    구간 전체가 거래량 0이면 직전 종가로 채운 거래량 0 캔들을 만든다. (저장소의 빈 캔들 처리와 같음)
+
+    :param df: timestamp index를 가진 OHLCV DataFrame (upbit schema)
+    :param interval: 3m, 5m, ..., 240m, days, weeks, months
+    :return: 같은 컬럼의 DataFrame, index는 각 캔들의 시작 시각
+    """
+    if len(df) == 0:
+        return df.iloc[:0]
+
+    timestamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+    buckets = bucket_starts(timestamps, interval)
+    starts = np.concatenate([[0], np.flatnonzero(np.diff(buckets)) + 1])
+    ends = np.concatenate([starts[1:], [len(buckets)]]) - 1
+
+    volume = df['volume'].to_numpy(dtype=np.float64)
+    traded = volume > 0
+    positions = np.arange(len(df))
+    first = np.minimum.reduceat(np.where(traded, positions, len(df)), starts)
+    last = np.maximum.reduceat(np.where(traded, positions, -1), starts)
+    empty = last < 0
+    first = np.where(empty, ends, first)
+    last = np.where(empty, ends, last)
+
+    close = df['close'].to_numpy(dtype=np.float64)
+    high = np.maximum.reduceat(np.where(traded, df['high'].to_numpy(dtype=np.float64), -np.inf), starts)
+    low = np.minimum.reduceat(np.where(traded, df['low'].to_numpy(dtype=np.float64), np.inf), starts)
+
+    result = pd.DataFrame({
+        'open': np.where(empty, close[ends], df['open'].to_numpy(dtype=np.float64)[first]),
+        'high': np.where(empty, close[ends], high),
+        'low': np.where(empty, close[ends], low),
+        'close': close[last],
+        'volume': np.add.reduceat(volume, starts),
+    }, index=pd.DatetimeIndex(buckets[starts].view('datetime64[ns]'), name='timestamp'))
+
+    return result.astype({c: df[c].dtype for c in result.columns if c in df.columns})
+
+
+def base_interval(store, ticker, interval=None):
+    """
+    저장소에 있는 ticker의 가장 낮은 interval (interval을 주면 그 interval을 만들 수 있는 것 중에서)
+    """
+    stored = [i for i in INTERVALS if store.last_timestamp(ticker, i) is not None]
+    if interval is not None:
+        stored = [i for i in stored if can_resample(i, interval)]
+    return stored[0] if stored else None
+
+
+def resample_store(ticker, intervals, base=None, source='upbit', store=None):
+    """
+    저장소의 base interval 캔들로 intervals 캔들을 만들어 저장하는 메서드
+    이미 저장된 interval은 마지막 캔들(미완성이었을 수 있음)의 시작 시각부터 새 base 캔들만 읽어 다시 계산한다.
+    Upbit에서는 base interval 하나만 수집하면 된다.
+
+    :param intervals: 만들 interval list 예시: ['5m', '60m', 'days', 'weeks', 'months']
+    :param base: 사용할 base interval (비우면 저장소에 있는 가장 낮은 interval)
+    :param store: OHLCVStore (비우면 ./data/store/{source})
+    :return: {interval: 새로 저장한 캔들 DataFrame}
+    """
+    store = store or OHLCVStore(f"./data/store/{source}")
+    base = base or base_interval(store, ticker)
+    if base is None:
+        raise FileNotFoundError(f"{ticker} 데이터가 저장되어 있지 않습니다.")
+
+    results = {}
+    for interval in intervals:
+        if interval == base:
+            continue
+        if not can_resample(base, interval):
+            print(f"[Resample] {ticker} {base}로 {interval} 캔들을 만들 수 없습니다.")
+            continue
+
+        last = store.last_timestamp(ticker, interval)
+        start = None
+        if last is not None:
+            start = pd.Timestamp(int(bucket_starts(np.array([last.value]), interval)[0]))
+        df = resample_ohlcv(store.read(ticker, base, start=start), interval)
+        if len(df) > 0:
+            store.write(df, ticker, interval)
+        results[interval] = df
+
+    return results
@@ -0,0 +1,187 @@
+import time
+import threading
+import numpy as np
+
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+class Job:
+    """
+    스케줄러에 등록된 작업 하나
+
+    :param name: 작업 이름
+    :param func: 실행할 함수
+    :param args: 함수 인자
+    :param next_run: 처음 실행할 datetime
+    :param period: 다음 실행까지의 timedelta
+    :param timeout: 실행 제한 시간(초), 넘기면 timeout으로 기록하고 cancel event를 set
+        timeout을 주면 func은 cancel keyword 인자(threading.Event)를 받아 늦은 작업(주문 등)을 건너뛸 수 있어야 한다.
+    """
+    def __init__(self, name, func, args, next_run, period, timeout=None):
+        self.name = name
+        self.func = func
+        self.args = args
+        self.next_run = next_run
+        self.period = period
+        self.timeout = timeout
+        self.future = None
+        self.started_at = None
+        self.timed_out = False
+        self.cancel = None
+
+        self.runs = 0
+        self.failures = 0
+        self.timeouts = 0
+        self.skipped = 0
+        self.runtimes = []
+        self.drifts = []
+
+    def schedule_next(self, now):
+        # 예정 시각 기준으로 다음 실행을 잡아 실행 시간만큼 밀리지 않도록 함 (놓친 회차는 건너뜀)
+        while self.next_run <= now:
+            self.next_run += self.period
+
+
+class StrategyScheduler:
+    """
+    전략을 thread pool에서 동시에 실행하는 스케줄러
+    느린 전략이 다른 전략의 실행 시각을 늦추지 않고, 같은 전략은 이전 실행이 끝나기 전에 다시 실행되지 않는다.
+    실행마다 예정 시각 대비 지연(drift)과 실행 시간을 기록한다.
+
+    :param max_workers: 동시에 실행할 최대 작업 수
+    :param history: 작업별로 보관할 최근 기록 수
+    """
+    def __init__(self, max_workers=8, history=1000):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="strategy")
+        self.history = history
+        self.jobs = []
+        self.lock = threading.Lock()
+        self.running = False
+
+    def _add(self, job):
+        with self.lock:
+            self.jobs.append(job)
+        return job
+
+    def every(self, seconds, func, *args, name=None, timeout=None):
+        """
+        seconds초마다 실행 (1분 미만 주기 가능)
+        """
+        now = datetime.now()
+        return self._add(Job(name or func.__name__, func, args, now, timedelta(seconds=seconds), timeout))
+
+    def daily(self, at, func, *args, days=1, name=None, timeout=None):
+        """
+        days일마다 at('HH:MM' 또는 'HH:MM:SS') 시각에 실행
+        """
+        next_run = self._next_time(at)
+        return self._add(Job(name or func.__name__, func, args, next_run, timedelta(days=days), timeout))
+
+    def weekly(self, weekday, at, func, *args, name=None, timeout=None):
+        """
+        매주 weekday('monday' 등) at 시각에 실행
+        """
+        next_run = self._next_time(at)
+        while next_run.weekday() != WEEKDAYS.index(weekday):
+            next_run += timedelta(days=1)
+        return self._add(Job(name or func.__name__, func, args, next_run, timedelta(weeks=1), timeout))
+
+    def _next_time(self, at):
+        parts = [int(p) for p in at.split(':')]
+        now = datetime.now()
+        next_run = now.replace(hour=parts[0], minute=parts[1], second=parts[2] if len(parts) > 2 else 0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        return next_run
+
+    def _execute(self, job, cancel):
+        start = time.perf_counter()
+        try:
+            if cancel is not None:
+                return job.func(*job.args, cancel=cancel)
+            return job.func(*job.args)
+        except Exception as e:
+            job.failures += 1
+            print(f"[Scheduler] {job.name} 실행 실패: {e}")
+        finally:
+            runtime = time.perf_counter() - start
+            job.runtimes = (job.runtimes + [runtime])[-self.history:]
+            job.runs += 1
+            if job.timed_out:
+                print(f"[Scheduler] {job.name} 제한 시간 초과 후 {runtime:.1f}초 만에 종료")
+
+    def run_pending(self):
+        """
+        실행 시각이 된 작업을 thread pool에 넣고, 제한 시간을 넘긴 작업을 기록하고 취소를 요청하는 메서드
+        """
+        now = datetime.now()
+        with self.lock:
+            jobs = list(self.jobs)
+
+        for job in jobs:
+            busy = job.future is not None and not job.future.done()
+
+            if busy and job.timeout is not None and not job.timed_out and time.perf_counter() - job.started_at > job.timeout:
+                job.timed_out = True
+                job.timeouts += 1
+                job.cancel.set()
+                print(f"[Scheduler] {job.name} 제한 시간 {job.timeout}초 초과, 취소 요청")
+
+            if job.next_run > now:
+                continue
+
+            scheduled = job.next_run
+            job.schedule_next(now)
+            if busy:
+                # 이전 실행이 끝나지 않았으면 이번 회차는 건너뜀
+                job.skipped += 1
+                print(f"[Scheduler] {job.name} 이전 실행이 끝나지 않아 건너뜀")
+                continue
+
+            job.drifts = (job.drifts + [(now - scheduled).total_seconds()])[-self.history:]
+            job.timed_out = False
+            job.cancel = threading.Event() if job.timeout is not None else None
+            job.started_at = time.perf_counter()
+            job.future = self.executor.submit(self._execute, job, job.cancel)
+
+    def next_wakeup(self):
+        """
+        다음 작업 실행까지 남은 초
+        """
+        with self.lock:
+            if not self.jobs:
+                return 1.0
+            next_run = min(job.next_run for job in self.jobs)
+        return max((next_run - datetime.now()).total_seconds(), 0.0)
+
+    def run_forever(self, max_sleep=0.5):
+        """
+        stop()이 호출될 때까지 스케줄을 실행하는 메서드
+
+        :param max_sleep: 최대 대기 초 (timeout 확인 주기)
+        """
+        self.running = True
+        while self.running:
+            self.run_pending()
+            time.sleep(min(self.next_wakeup(), max_sleep))
+
+    def stop(self, wait=True):
+        self.running = False
+        self.executor.shutdown(wait=wait)
+
+    def stats(self):
+        """
+        작업별 실행 통계 {name: {'runs', 'failures', 'timeouts', 'skipped', 'runtime_p50', 'runtime_p99', 'drift_p50', 'drift_p99'}}
+        """
+        result = {}
+        for job in self.jobs:
+            row = {'runs': job.runs, 'failures': job.failures, 'timeouts': job.timeouts, 'skipped': job.skipped}
+            for key, values in (('runtime', job.runtimes), ('drift', job.drifts)):
+                row[f'{key}_p50'] = float(np.percentile(values, 50)) if values else None
+                row[f'{key}_p99'] = float(np.percentile(values, 99)) if values else None
+            result[job.name] = row
+        return result
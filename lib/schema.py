@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+
+
+# source별 OHLCV 컬럼과 dtype
+# exact: 주문 가격 계산, 저장용 (KRW 가격은 float32로 정확히 표현되지 않으므로 float64)
+# compact: 전 종목 분석, 백테스트용 (float32, 상대 오차 약 1e-7)
+SCHEMAS = {
+    'upbit': ['open', 'high', 'low', 'close', 'volume'],
+    'yf': ['open', 'high', 'low', 'close', 'adjclose', 'volume'],
+}
+PRECISIONS = {
+    'exact': 'float64',
+    'compact': 'float32',
+}
+
+
+def _conforms(df, columns, dtype):
+    index = df.index
+    return (
+        isinstance(index, pd.DatetimeIndex)
+        and index.tz is None
+        and index.dtype == 'datetime64[ns]'
+        and index.name == 'timestamp'
+        and list(df.columns) == columns
+        and all(df[c].dtype == dtype for c in columns)
+    )
+
+
+def normalize_ohlcv(df, source='upbit', precision='exact'):
+    """
+    fetcher 출력 OHLCV를 source의 schema로 맞추는 메서드 (수집 시 한 번만 호출)
+    - index: 'timestamp' 이름의 tz-naive UTC DatetimeIndex (int64 epoch-ns)
+    - 컬럼: SCHEMAS[source] 순서, PRECISIONS[precision] dtype (schema에 없는 컬럼은 제외)
+    - 정렬, 중복 timestamp 제거 (마지막 값 유지)
+    이미 schema에 맞으면 복사하지 않고 그대로 반환한다.
+
+    :param source: 'upbit', 'yf'
+    :param precision: 'exact' (float64), 'compact' (float32)
+    :return: Pandas DataFrame
+    """
+    columns = [c for c in SCHEMAS[source] if c in df.columns]
+    dtype = np.dtype(PRECISIONS[precision])
+    if _conforms(df, columns, dtype) and df.index.is_monotonic_increasing and df.index.is_unique:
+        return df
+
+    index = df.index
+    if not isinstance(index, pd.DatetimeIndex):
+        index = pd.DatetimeIndex(pd.to_datetime(index, utc=index.dtype == object))
+    if index.tz is not None:
+        index = index.tz_convert('UTC').tz_localize(None)
+    index = index.as_unit('ns').rename('timestamp')
+
+    result = pd.DataFrame(
+        {c: pd.to_numeric(df[c], errors='coerce').to_numpy(dtype=dtype) for c in columns},
+        index=index,
+    )
+    if not (index.is_monotonic_increasing and index.is_unique):
+        result = result[~result.index.duplicated(keep='last')].sort_index()
+
+    return result
+
+
+def concat_universe(frames, precision='compact'):
+    """
+    {ticker: OHLCV DataFrame}를 하나의 긴 DataFrame으로 합치는 메서드
+    ticker 컬럼은 category, 가격 컬럼은 precision dtype
+
+    :return: timestamp index와 ticker, open, high, low, close, volume 컬럼을 가진 DataFrame
+    """
+    tickers = list(frames)
+    dtype = np.dtype(PRECISIONS[precision])
+    columns = [c for c in SCHEMAS['yf'] if all(c in df.columns for df in frames.values())]
+
+    lengths = [len(frames[t]) for t in tickers]
+    index = pd.DatetimeIndex(
+        np.concatenate([pd.DatetimeIndex(frames[t].index).as_unit('ns').asi8 for t in tickers]).view('datetime64[ns]')
+        if tickers else np.empty(0, dtype='datetime64[ns]'),
+        name='timestamp',
+    )
+    codes = np.repeat(np.arange(len(tickers), dtype=np.int32), lengths)
+    data = {'ticker': pd.Categorical.from_codes(codes, categories=tickers)}
+    for c in columns:
+        data[c] = np.concatenate([frames[t][c].to_numpy(dtype=dtype) for t in tickers]) if tickers else np.empty(0, dtype=dtype)
+
+    return pd.DataFrame(data, index=index)
+
+
+def parse_krx_numbers(df):
+    """
+    KRX 응답의 문자열 숫자 컬럼('1,234.5', '-', '')을 숫자로 바꾸는 메서드
+    모든 object 컬럼을 하나의 Series로 펼쳐 문자열 정리와 숫자 변환을 한 번에 한다.
+    모든 값이 숫자인 컬럼만 변환하며 정수 컬럼은 int64, 나머지는 float64로 만든다.
+    반복되는 문자열 컬럼(종목 코드, 이름 등)은 category로 바꾼다.
+    """
+    text_columns = [c for c in df.columns if df[c].dtype == object]
+    if not text_columns or len(df) == 0:
+        return df
+
+    shape = (len(df), len(text_columns))
+    cleaned = pd.Series(df[text_columns].to_numpy().ravel()).str.replace(',', '', regex=False).str.strip()
+    empty = cleaned.isin(['', '-']).to_numpy().reshape(shape)
+    numbers = pd.to_numeric(cleaned, errors='coerce').to_numpy(dtype=np.float64).reshape(shape)
+    numbers[empty] = np.nan
+    numeric = (~np.isnan(numbers) | empty).all(axis=0) & (~empty).any(axis=0)
+
+    result = {}
+    for column in df.columns:
+        if column not in text_columns:
+            result[column] = df[column]
+            continue
+
+        i = text_columns.index(column)
+        if numeric[i]:
+            values = numbers[:, i]
+            if not empty[:, i].any() and (values % 1 == 0).all():
+                result[column] = values.astype(np.int64)
+            else:
+                result[column] = values
+        elif df[column].nunique() <= len(df) // 2:
+            result[column] = df[column].astype('category')
+        else:
+            result[column] = df[column]
+
+    return pd.DataFrame(result, index=df.index)
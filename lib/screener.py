@@ -0,0 +1,295 @@
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.store import OHLCVStore
+
+
+# 종합 점수에 쓰는 factor별 가중치 (음수는 작을수록 좋음)
+DEFAULT_WEIGHTS = {
+    'momentum_7': 0.5,
+    'momentum_30': 1.0,
+    'volume_surge': 0.5,
+    'volatility': -0.5,
+    'trend': 0.5,
+}
+
+
+class UniversePanel:
+    """
+    여러 종목의 OHLCV를 시간 × 종목 2차원 배열로 맞춘 저장소
+    모든 종목의 timestamp 합집합을 행으로 두고, 해당 시각에 캔들이 없는 종목은 NaN으로 둔다.
+
+    :param timestamps: int64 epoch-ns 배열 (T,)
+    :param tickers: 종목 list (N,)
+    :param data: {컬럼: (T, N) float64 배열}
+    """
+    def __init__(self, timestamps, tickers, data):
+        self.timestamps = timestamps
+        self.tickers = list(tickers)
+        self.data = data
+
+    def __getitem__(self, column):
+        return self.data[column]
+
+    def __len__(self):
+        return len(self.timestamps)
+
+    @property
+    def index(self):
+        return pd.DatetimeIndex(self.timestamps.view('datetime64[ns]'), name='timestamp')
+
+    @classmethod
+    def from_arrays(cls, series, columns=('open', 'high', 'low', 'close', 'volume')):
+        """
+        {ticker: (int64 epoch-ns timestamp 배열, {컬럼: 배열})}로 panel을 만드는 메서드 (OHLCVStore.read_arrays 형식)
+        """
+        tickers = list(series)
+        stamps = [series[t][0] for t in tickers]
+        timestamps = np.unique(np.concatenate(stamps)) if stamps else np.empty(0, dtype=np.int64)
+
+        data = {c: np.full((len(timestamps), len(tickers)), np.nan) for c in columns}
+        for j, ticker in enumerate(tickers):
+            rows = np.searchsorted(timestamps, stamps[j])
+            for c in columns:
+                data[c][rows, j] = series[ticker][1][c]
+
+        return cls(timestamps, tickers, data)
+
+    @classmethod
+    def from_frames(cls, frames, columns=('open', 'high', 'low', 'close', 'volume')):
+        """
+        {ticker: OHLCV DataFrame}로 panel을 만드는 메서드
+        """
+        series = {
+            t: (pd.DatetimeIndex(df.index).as_unit('ns').asi8, {c: df[c].to_numpy(dtype=np.float64) for c in columns})
+            for t, df in frames.items()
+        }
+        return cls.from_arrays(series, columns)
+
+    @classmethod
+    def from_store(cls, tickers=None, interval='days', start=None, source='upbit', store=None,
+                   columns=('open', 'high', 'low', 'close', 'volume'), max_workers=8):
+        """
+        저장소의 여러 종목을 동시에 읽어 panel을 만드는 메서드
+
+        :param tickers: 종목 list (비우면 저장소 전체)
+        :param start: 이 시각 이후 캔들만 사용 (비우면 전체)
+        :param store: OHLCVStore (비우면 ./data/store/{source})
+        """
+        store = store or OHLCVStore(f"./data/store/{source}")
+        tickers = store.tickers() if tickers is None else tickers
+        return cls.from_arrays(_read_many(store, tickers, interval, start, list(columns), max_workers), columns)
+
+    def append(self, series):
+        """
+        새 캔들을 붙이는 메서드
+        새 캔들의 가장 이른 시각 이후 행은 새 값으로 바꾸므로 미완성이었던 마지막 캔들도 갱신된다.
+        series에 없는 종목의 해당 행은 기존 값을 유지한다.
+
+        :param series: {ticker: (timestamp 배열, {컬럼: 배열})} (from_arrays 형식, panel에 없는 종목은 무시)
+        """
+        series = {t: s for t, s in series.items() if t in self.tickers and len(s[0]) > 0}
+        if not series:
+            return self
+
+        new = UniversePanel.from_arrays(series, tuple(self.data))
+        keep = self.timestamps < new.timestamps[0]
+        overlap = np.flatnonzero(~keep)
+        timestamps = np.union1d(self.timestamps[overlap], new.timestamps)
+
+        columns = [self.tickers.index(t) for t in new.tickers]
+        old_rows = np.searchsorted(timestamps, self.timestamps[overlap])
+        new_rows = np.searchsorted(timestamps, new.timestamps)
+        for c, values in self.data.items():
+            tail = np.full((len(timestamps), len(self.tickers)), np.nan)
+            tail[old_rows] = values[overlap]
+            replaced = tail[:, columns]
+            replaced[new_rows] = new.data[c]
+            tail[:, columns] = np.where(np.isnan(replaced), tail[:, columns], replaced)
+            self.data[c] = np.concatenate([values[keep], tail])
+        self.timestamps = np.concatenate([self.timestamps[keep], timestamps])
+
+        return self
+
+    def add_tickers(self, series):
+        """
+        새 종목 열을 붙이는 메서드 (새 종목에만 있는 시각은 기존 종목을 NaN으로 둔 행으로 추가)
+
+        :param series: {ticker: (timestamp 배열, {컬럼: 배열})} (from_arrays 형식, 이미 있는 종목은 무시)
+        """
+        series = {t: s for t, s in series.items() if t not in self.tickers and len(s[0]) > 0}
+        if not series:
+            return self
+
+        new = UniversePanel.from_arrays(series, tuple(self.data))
+        timestamps = np.union1d(self.timestamps, new.timestamps)
+        old_rows = np.searchsorted(timestamps, self.timestamps)
+        new_rows = np.searchsorted(timestamps, new.timestamps)
+        for c, values in self.data.items():
+            merged = np.full((len(timestamps), len(self.tickers) + len(new.tickers)), np.nan)
+            merged[old_rows, :len(self.tickers)] = values
+            merged[new_rows, len(self.tickers):] = new.data[c]
+            self.data[c] = merged
+        self.timestamps = timestamps
+        self.tickers = self.tickers + new.tickers
+
+        return self
+
+    def tail(self, rows):
+        """
+        최근 rows 행만 남긴 panel (배열은 복사하지 않음)
+        """
+        return UniversePanel(self.timestamps[-rows:], self.tickers, {c: v[-rows:] for c, v in self.data.items()})
+
+
+def _read_many(store, tickers, interval, start, columns, max_workers):
+    # {ticker: (timestamp 배열, {컬럼: 배열})}, 데이터가 없는 종목은 제외
+    def read(ticker):
+        try:
+            return store.read_arrays(ticker, interval, start=start, columns=columns)
+        except FileNotFoundError:
+            return None
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="screener") as pool:
+        series = dict(zip(tickers, pool.map(read, tickers)))
+
+    return {t: s for t, s in series.items() if s is not None and len(s[0]) > 0}
+
+
+def _last_valid(values):
+    # 종목별 마지막 유효 값 (중간에 캔들이 없는 종목도 가장 최근 값 사용)
+    filled = pd.DataFrame(values).ffill().to_numpy()
+    return filled[-1], filled
+
+
+def compute_factors(panel, momentum=(7, 30), volatility=20, volume=(1, 20), rsi=14, bollinger=(20, 2), sma=60):
+    """
+    panel의 마지막 행 기준 factor를 모든 종목에 대해 한 번에 계산하는 메서드
+    - momentum_n: n봉 수익률
+    - volatility: volatility봉 로그 수익률 표준편차
+    - volume_surge: 최근 volume[0]봉 평균 거래량 / 그 전 volume[1]봉 평균 거래량
+    - rsi: Wilder RSI (lib.indicators.rsi와 같은 값)
+    - bollinger_b: 볼린저 밴드 안의 위치 (0: 하단, 1: 상단)
+    - trend: 종가 / SMA_sma - 1
+    - value: 최근 volume[1]봉 평균 거래대금
+
+    :return: 종목 index, factor 컬럼의 DataFrame (데이터가 부족한 factor는 NaN)
+    """
+    last_close, close = _last_valid(panel['close'])
+    volumes = np.nan_to_num(panel['volume'])
+    factors = {}
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        for n in momentum:
+            factors[f'momentum_{n}'] = last_close / close[-n - 1] - 1 if len(close) > n else np.full(close.shape[1], np.nan)
+
+        returns = np.diff(np.log(close[-volatility - 1:]), axis=0)
+        factors['volatility'] = np.std(returns, axis=0, ddof=1) if len(returns) > 1 else np.full(close.shape[1], np.nan)
+
+        recent, base = volume
+        recent_volume = volumes[-recent:].mean(axis=0)
+        base_volume = volumes[-recent - base:-recent].mean(axis=0) if len(volumes) > recent else np.zeros(close.shape[1])
+        factors['volume_surge'] = np.where(base_volume > 0, recent_volume / base_volume, np.nan)
+
+        change = pd.DataFrame(close).diff()
+        gain = change.clip(lower=0).ewm(alpha=1 / rsi, min_periods=rsi).mean().to_numpy()[-1]
+        loss = (-change).clip(lower=0).ewm(alpha=1 / rsi, min_periods=rsi).mean().to_numpy()[-1]
+        factors[f'rsi_{rsi}'] = 100 * gain / (gain + loss)
+
+        length, k = bollinger
+        window = close[-length:]
+        middle = window.mean(axis=0)
+        std = window.std(axis=0, ddof=1)
+        factors['bollinger_b'] = (last_close - (middle - k * std)) / (2 * k * std)
+        if len(close) < length:
+            factors['bollinger_b'][:] = np.nan
+
+        factors['trend'] = last_close / close[-sma:].mean(axis=0) - 1 if len(close) >= sma else np.full(close.shape[1], np.nan)
+        factors['value'] = (np.nan_to_num(panel['close'][-base:]) * volumes[-base:]).mean(axis=0)
+
+    return pd.DataFrame(factors, index=pd.Index(panel.tickers, name='ticker'))
+
+
+def rank_candidates(factors, weights=None, min_value=None, top=None):
+    """
+    factor의 종목 간 백분위 순위에 가중치를 곱해 더한 점수로 종목을 정렬하는 메서드
+
+    :param weights: {factor: 가중치} (비우면 DEFAULT_WEIGHTS), 음수면 작을수록 높은 점수
+    :param min_value: 평균 거래대금이 이보다 작은 종목은 제외
+    :param top: 상위 몇 종목만 반환할지 (비우면 전체)
+    :return: factor와 score 컬럼을 가진 DataFrame (score 내림차순)
+    """
+    weights = DEFAULT_WEIGHTS if weights is None else weights
+    factors = factors.dropna(subset=list(weights))
+    if min_value is not None:
+        factors = factors[factors['value'] >= min_value]
+
+    ranks = factors[list(weights)].rank(pct=True)
+    score = sum(ranks[name] * w if w >= 0 else (1 - ranks[name]) * -w for name, w in weights.items())
+    result = factors.assign(score=score / sum(abs(w) for w in weights.values())).sort_values('score', ascending=False)
+
+    return result if top is None else result.iloc[:top]
+
+
+class UniverseScreener:
+    """
+    저장소 전체 종목을 panel로 들고 있다가 매 주기 새 캔들만 읽어 다시 순위를 매기는 클래스
+
+    :param interval: 저장소 interval
+    :param tickers: 종목 list (비우면 저장소 전체)
+    :param lookback: panel에 남길 최근 봉 수 (factor 계산에 필요한 길이 이상)
+    :param weights: rank_candidates 가중치
+    :param min_value: 최소 평균 거래대금
+    :param store: OHLCVStore (비우면 ./data/store/{source})
+    """
+    def __init__(self, interval='days', tickers=None, lookback=250, weights=None, min_value=None,
+                 source='upbit', store=None, max_workers=8):
+        self.interval = interval
+        self.tickers = tickers
+        self.lookback = lookback
+        self.weights = weights
+        self.min_value = min_value
+        self.store = store or OHLCVStore(f"./data/store/{source}")
+        self.max_workers = max_workers
+        self.panel = None
+
+    def refresh(self):
+        """
+        panel을 최신 상태로 만드는 메서드 (처음에는 최근 lookback봉 전체, 이후에는 마지막 행 이후만 읽음)
+        tickers를 비웠으면 매번 저장소 종목 목록을 다시 읽어 새로 생긴 종목은 panel 구간 전체를 읽어 추가한다.
+        """
+        if self.panel is None or len(self.panel) == 0:
+            tickers = self.store.tickers() if self.tickers is None else self.tickers
+            series = _read_many(self.store, tickers, self.interval, None, ['close', 'volume'], self.max_workers)
+            self.panel = UniversePanel.from_arrays(series, ('close', 'volume')).tail(self.lookback)
+            return self.panel
+
+        # 새 종목을 붙이면 마지막 행이 늦어질 수 있으므로 기존 종목의 마지막 시각을 먼저 기억
+        last = pd.Timestamp(int(self.panel.timestamps[-1]))
+        if self.tickers is None:
+            known = set(self.panel.tickers)
+            added = [t for t in self.store.tickers() if t not in known]
+            if added:
+                first = pd.Timestamp(int(self.panel.timestamps[0]))
+                self.panel = self.panel.add_tickers(_read_many(self.store, added, self.interval, first, ['close', 'volume'], self.max_workers))
+
+        series = _read_many(self.store, self.panel.tickers, self.interval, last, ['close', 'volume'], self.max_workers)
+        self.panel = self.panel.append(series).tail(self.lookback)
+
+        return self.panel
+
+    def screen(self, top=None, refresh=True):
+        """
+        :return: rank_candidates 결과 DataFrame
+        """
+        if refresh or self.panel is None:
+            self.refresh()
+        return rank_candidates(compute_factors(self.panel), self.weights, self.min_value, top)
+
+    def candidates(self, top=10, refresh=True):
+        """
+        점수 상위 종목 list
+        """
+        return list(self.screen(top=top, refresh=refresh).index)
@@ -0,0 +1,264 @@
+import time
+
+from abc import ABC, abstractmethod
+
+
+def _levels(orderbook, side):
+    """
+    side 주문이 체결될 반대편 호가 [(가격, 수량), ...] (매수 'bid'는 매도 호가, 매도 'ask'는 매수 호가)
+    """
+    key = 'ask' if side == 'bid' else 'bid'
+    return [(float(u[f'{key}_price']), float(u[f'{key}_size'])) for u in orderbook['orderbook_units']]
+
+
+def mid_price(orderbook):
+    """
+    최우선 매수/매도 호가의 중간 가격
+    """
+    unit = orderbook['orderbook_units'][0]
+    return (float(unit['ask_price']) + float(unit['bid_price'])) / 2
+
+
+def sweep_price(orderbook, side, volume=None, amount=None):
+    """
+    시장가 주문이 보이는 호가를 순서대로 먹을 때의 평균 체결 가격
+
+    :param side: 'bid' (매수), 'ask' (매도)
+    :param volume: 주문 수량
+    :param amount: 주문 금액 (시장가 매수, volume 대신 사용)
+    :return: 평균 체결 가격 (호가 잔량이 부족하면 None)
+    """
+    filled, funds = 0.0, 0.0
+    for price, size in _levels(orderbook, side):
+        if volume is not None:
+            take = min(size, volume - filled)
+        else:
+            take = min(size, (amount - funds) / price)
+        filled += take
+        funds += take * price
+        if (volume is not None and filled >= volume - 1e-12) or (amount is not None and funds >= amount - 1e-6):
+            return funds / filled
+    return None
+
+
+def order_fills(order):
+    """
+    거래소 주문 응답에서 (체결 수량, 체결 금액, 수수료)를 꺼내는 메서드
+    trades가 있으면 trades의 funds 합계, executed_funds가 있으면 그 값을 사용한다.
+    둘 다 없으면 시장가 매수(price)는 주문 총액에서 남은 금액(locked)을 뺀 값, 지정가는 executed_volume * price를 사용한다.
+    체결 수량이 있는데 금액을 알 수 없으면(가격이 없는 시장가 매도) 체결 금액은 None (get_order로 trades를 다시 조회해야 함)
+    """
+    volume = float(order.get('executed_volume') or 0)
+    trades = order.get('trades') or []
+    if trades:
+        funds = sum(float(t['funds']) for t in trades)
+    elif order.get('executed_funds') is not None:
+        funds = float(order['executed_funds'])
+    elif not volume:
+        funds = 0.0
+    elif order.get('ord_type') == 'price':
+        funds = float(order.get('price') or 0) - float(order.get('locked') or 0)
+    elif order.get('price'):
+        funds = volume * float(order['price'])
+    else:
+        funds = None
+    return volume, funds, float(order.get('paid_fee') or 0)
+
+
+class OrderSlicer(ABC):
+    """
+    큰 주문(parent)을 여러 개의 지정가 주문(child)으로 나눠 실행하는 알고리즘의 기본 클래스
+    child는 반대편 호가 가격에 지정가로 내서 보이는 잔량만 먹고, 다음 child 전에 남은 수량을 취소 후 다시 주문한다.
+    하위 클래스는 child 수량(_child_volume), 종료 조건(_done), child 유지 시간(wait_time)을 정한다.
+
+    :param exchanger: request_order, get_order, cancel_order를 가진 거래소 객체 (UpbitExchanger, SimulatedBookExchanger 등)
+    :param get_orderbook: ticker를 받아 호가 dict를 반환하는 함수 (pyupbit.get_orderbook, UpbitWebSocketClient.orderbook 등)
+    :param max_levels: child 한 개가 먹을 수 있는 최대 호가 단계 수
+    :param min_order: 최소 주문 금액 (Upbit KRW 마켓 5000원)
+    :param sleep: 대기 함수 (시뮬레이션에서는 가상 시간을 진행하는 함수)
+    :param clock: 현재 시간 함수
+    """
+    def __init__(self, exchanger, get_orderbook, max_levels=1, min_order=5000, sleep=time.sleep, clock=time.monotonic):
+        self.exchanger = exchanger
+        self.get_orderbook = get_orderbook
+        self.max_levels = max_levels
+        self.min_order = min_order
+        self.sleep = sleep
+        self.clock = clock
+
+    @abstractmethod
+    def _child_volume(self, remaining, levels, step):
+        pass
+
+    @abstractmethod
+    def _done(self, step, elapsed):
+        pass
+
+    @abstractmethod
+    def wait_time(self, step):
+        pass
+
+    def _max_levels(self, step):
+        return self.max_levels
+
+    def _child_price(self, levels, volume, max_levels):
+        # volume을 채울 때까지 max_levels 단계 안에서 필요한 가장 나쁜 호가
+        depth = 0.0
+        for i, (price, size) in enumerate(levels[:max_levels]):
+            depth += size
+            if depth >= volume or i == max_levels - 1:
+                return price
+        return levels[-1][0]
+
+    def _settle(self, order):
+        # 남은 수량은 취소하고 최종 체결 결과를 조회
+        if order.get('state') not in ('done', 'cancel'):
+            try:
+                self.exchanger.cancel_order(order['uuid'])
+            except Exception as e:
+                print(f"[Slicer] 주문 취소 실패: {e}")
+        return self.exchanger.get_order(order['uuid'])
+
+    def run(self, ticker, side, volume=None, amount=None, limit_price=None):
+        """
+        parent 주문을 실행하는 메서드
+
+        :param side: 'bid' (매수), 'ask' (매도)
+        :param volume: 주문 수량 (매도, 또는 수량 기준 매수)
+        :param amount: 주문 금액 (금액 기준 매수)
+        :param limit_price: child 주문 가격 상한(매수)/하한(매도), 비우면 제한 없음
+        :return: 실행 결과 dict
+            executed_volume, executed_funds, avg_price, paid_fee,
+            arrival_price (시작 시 중간 가격), slippage_bps (arrival 대비 불리한 정도),
+            sweep_price, sweep_slippage_bps (시작 시 같은 수량을 시장가로 냈을 때의 추정치),
+            children, remaining, elapsed
+        """
+        start = self.clock()
+        book = self.get_orderbook(ticker)
+        arrival = mid_price(book)
+        sweep = sweep_price(book, side, volume=volume, amount=amount)
+
+        by_amount = volume is None
+        remaining = amount if by_amount else volume
+        executed_volume = executed_funds = paid_fee = 0.0
+        children = step = 0
+
+        while not self._done(step, self.clock() - start):
+            if step > 0:
+                book = self.get_orderbook(ticker)
+            levels = _levels(book, side)
+            best = levels[0][0]
+
+            remaining_volume = remaining / best if by_amount else remaining
+            if remaining_volume * best < self.min_order:
+                break
+
+            child = self._child_volume(remaining_volume, levels, step)
+            price = self._child_price(levels, child, self._max_levels(step))
+            if limit_price is not None:
+                price = min(price, limit_price) if side == 'bid' else max(price, limit_price)
+            child = round(min(child, remaining / price if by_amount else remaining), 8)
+            if child * price < self.min_order:
+                child = round(min(self.min_order / price * 1.001, remaining_volume), 8)
+
+            try:
+                order = self.exchanger.request_order(ticker, side, 'limit', volume=child, price=price)
+            except Exception as e:
+                print(f"[Slicer] {ticker} child 주문 실패: {e}")
+                break
+            if not isinstance(order, dict) or 'uuid' not in order:
+                # 잔고 부족, 호가 단위 오류 등은 예외 대신 error dict로 돌아옴
+                print(f"[Slicer] {ticker} child 주문 거부: {order}")
+                break
+            children += 1
+
+            self.sleep(self.wait_time(step))
+            filled, funds, fee = order_fills(self._settle(order))
+
+            executed_volume += filled
+            executed_funds += funds
+            paid_fee += fee
+            remaining -= funds if by_amount else filled
+            step += 1
+
+        avg_price = executed_funds / executed_volume if executed_volume else None
+        sign = 1 if side == 'bid' else -1
+
+        def bps(price):
+            return sign * (price - arrival) / arrival * 10000 if price else None
+
+        return {
+            'ticker': ticker,
+            'side': side,
+            'executed_volume': executed_volume,
+            'executed_funds': executed_funds,
+            'avg_price': avg_price,
+            'paid_fee': paid_fee,
+            'arrival_price': arrival,
+            'slippage_bps': bps(avg_price),
+            'sweep_price': sweep,
+            'sweep_slippage_bps': bps(sweep),
+            'children': children,
+            'remaining': max(remaining, 0.0),
+            'elapsed': self.clock() - start,
+        }
+
+
+class TWAPSlicer(OrderSlicer):
+    """
+    duration 동안 slices번에 나눠 같은 간격으로 주문하는 TWAP 알고리즘
+    child 수량은 남은 수량 / 남은 횟수이므로 앞에서 덜 체결된 수량은 뒤 child로 넘어간다.
+    마지막 child는 max_levels 대신 last_levels 단계까지 먹어 최대한 완료한다.
+
+    :param duration: 전체 실행 시간 (초)
+    :param slices: child 주문 수
+    :param last_levels: 마지막 child가 먹을 수 있는 최대 호가 단계 수
+    """
+    def __init__(self, exchanger, get_orderbook, duration=300, slices=10, last_levels=5, **kwargs):
+        super().__init__(exchanger, get_orderbook, **kwargs)
+        self.duration = duration
+        self.slices = slices
+        self.last_levels = last_levels
+
+    def _child_volume(self, remaining, levels, step):
+        return remaining / (self.slices - step)
+
+    def _max_levels(self, step):
+        return self.last_levels if step == self.slices - 1 else self.max_levels
+
+    def _done(self, step, elapsed):
+        return step >= self.slices
+
+    def wait_time(self, step):
+        return self.duration / self.slices
+
+
+class IcebergSlicer(OrderSlicer):
+    """
+    보이는 호가 잔량의 일부만 반복해서 주문하는 iceberg 알고리즘
+    child 수량은 min(display, 반대편 최우선 호가 잔량 * participation)이고, refresh초마다 취소 후 새 최우선 호가로 다시 주문한다.
+
+    :param display: child 한 개의 최대 수량 (비우면 호가 잔량 기준만 사용)
+    :param participation: 최우선 호가 잔량 중 가져갈 비율
+    :param refresh: child 주문 유지 시간 (초)
+    :param timeout: 전체 최대 실행 시간 (초)
+    """
+    def __init__(self, exchanger, get_orderbook, display=None, participation=0.5, refresh=1.0, timeout=300, **kwargs):
+        super().__init__(exchanger, get_orderbook, **kwargs)
+        self.display = display
+        self.participation = participation
+        self.refresh = refresh
+        self.timeout = timeout
+
+    def _child_volume(self, remaining, levels, step):
+        depth = sum(size for _, size in levels[:self.max_levels])
+        volume = min(remaining, depth * self.participation)
+        if self.display is not None:
+            volume = min(volume, self.display)
+        return volume
+
+    def _done(self, step, elapsed):
+        return elapsed >= self.timeout
+
+    def wait_time(self, step):
+        return self.refresh
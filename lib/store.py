@@ -0,0 +1,220 @@
+import os
+import json
+import numpy as np
+import pandas as pd
+
+from lib.schema import normalize_ohlcv
+
+
+class OHLCVStore:
+    """
+    ticker, interval, 기간별로 나눠 저장하는 컬럼 단위 OHLCV 저장소
+
+    root/{ticker}/{interval}/meta.json          컬럼별 dtype
+    root/{ticker}/{interval}/{partition}/*.bin  컬럼별 raw numpy 배열 (timestamp는 int64 epoch-ns)
+
+    분 단위 interval은 월(YYYY-MM), 나머지는 연(YYYY) 단위로 partition을 나눈다.
+    새 캔들은 파일 끝에 이어 쓰고, 기존 구간과 겹치면 해당 partition의 겹친 지점 이후만 다시 쓴다.
+    읽을 때는 memmap으로 필요한 partition, 기간, 컬럼만 읽는다.
+    """
+    def __init__(self, root='./data/store'):
+        self.root = root
+
+    def _series_dir(self, ticker, interval):
+        return os.path.join(self.root, ticker, interval)
+
+    def _partition_keys(self, timestamps, interval):
+        """
+        int64 epoch-ns 배열의 각 원소가 속한 partition 이름 배열을 반환
+        """
+        unit = 'M' if interval[-1] == 'm' else 'Y'
+        periods = timestamps.astype('datetime64[ns]').astype(f'datetime64[{unit}]')
+        return np.datetime_as_string(periods, unit=unit)
+
+    def _load_meta(self, ticker, interval):
+        path = os.path.join(self._series_dir(ticker, interval), 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path, 'r', encoding='utf-8') as file:
+            return json.load(file)
+
+    def _save_meta(self, ticker, interval, meta):
+        series_dir = self._series_dir(ticker, interval)
+        os.makedirs(series_dir, exist_ok=True)
+        with open(os.path.join(series_dir, 'meta.json'), 'w', encoding='utf-8') as file:
+            json.dump(meta, file)
+
+    def _partitions(self, ticker, interval):
+        series_dir = self._series_dir(ticker, interval)
+        if not os.path.exists(series_dir):
+            return []
+        return sorted(p for p in os.listdir(series_dir) if os.path.isdir(os.path.join(series_dir, p)))
+
+    def _read_column(self, partition_dir, column, dtype):
+        path = os.path.join(partition_dir, f'{column}.bin')
+        if not os.path.exists(path) or os.path.getsize(path) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(path, dtype=dtype, mode='r')
+
+    def _write_partition(self, partition_dir, timestamps, values, meta, offset):
+        """
+        partition의 offset 번째 행부터 잘라내고 새 행을 이어 쓰는 메서드
+        timestamp 파일을 마지막에 써서 중간에 실패해도 timestamp 길이까지만 유효하게 읽히도록 함
+        """
+        os.makedirs(partition_dir, exist_ok=True)
+        items = [(c, values[c], np.dtype(d)) for c, d in meta['columns'].items()]
+        items.append(('timestamp', timestamps, np.dtype('int64')))
+
+        for column, array, dtype in items:
+            path = os.path.join(partition_dir, f'{column}.bin')
+            with open(path, 'ab') as file:
+                file.truncate(offset * dtype.itemsize)
+                file.write(np.ascontiguousarray(array, dtype=dtype).tobytes())
+
+    def write(self, df, ticker, interval):
+        """
+        OHLCV DataFrame을 저장하는 메서드
+        기존 캔들과 timestamp가 겹치면 새 값으로 덮어씀
+
+        :param df: timestamp index를 가진 DataFrame
+        :param ticker: 티커 ('KRW-BTC' 등)
+        :param interval: 1m, 3m, ..., days, weeks, months
+        """
+        if len(df) == 0:
+            return
+
+        df = df[~df.index.duplicated(keep='last')].sort_index()
+
+        meta = self._load_meta(ticker, interval)
+        if meta is None:
+            meta = {'columns': {c: str(df[c].dtype) if df[c].dtype.kind in 'iuf' else 'float64' for c in df.columns}}
+            self._save_meta(ticker, interval, meta)
+
+        missing = set(meta['columns']) - set(df.columns)
+        if missing:
+            raise ValueError(f"{ticker} {interval} 저장 실패, 누락된 컬럼: {sorted(missing)}")
+
+        timestamps = pd.DatetimeIndex(df.index).as_unit('ns').asi8
+        keys = self._partition_keys(timestamps, interval)
+        bounds = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts = np.concatenate([[0], bounds])
+        ends = np.concatenate([bounds, [len(keys)]])
+
+        series_dir = self._series_dir(ticker, interval)
+        for s, e in zip(starts, ends):
+            partition_dir = os.path.join(series_dir, keys[s])
+            new_ts = timestamps[s:e]
+            new_values = {c: df[c].values[s:e] for c in meta['columns']}
+
+            old_ts = self._read_column(partition_dir, 'timestamp', 'int64')
+            offset = int(np.searchsorted(old_ts, new_ts[0], side='left'))
+
+            if offset < len(old_ts):
+                # 겹치는 지점 이후의 기존 행과 병합 (같은 timestamp는 새 값 우선)
+                tail_ts = np.array(old_ts[offset:])
+                keep = ~np.isin(tail_ts, new_ts)
+                merged_ts = np.concatenate([tail_ts[keep], new_ts])
+                order = np.argsort(merged_ts, kind='stable')
+                merged_values = {}
+                for c, d in meta['columns'].items():
+                    tail = np.array(self._read_column(partition_dir, c, d)[offset:len(old_ts)])
+                    merged_values[c] = np.concatenate([tail[keep], new_values[c].astype(d)])[order]
+                new_ts, new_values = merged_ts[order], merged_values
+
+            del old_ts
+            self._write_partition(partition_dir, new_ts, new_values, meta, offset)
+
+    def read(self, ticker, interval, start=None, end=None, columns=None):
+        """
+        저장된 OHLCV를 DataFrame으로 읽는 메서드
+        start, end가 걸친 partition만 열고 요청한 컬럼만 읽음
+
+        :param start: 시작 시각 (포함, 비우면 처음부터)
+        :param end: 끝 시각 (포함, 비우면 끝까지)
+        :param columns: 읽을 컬럼 list (비우면 전체, []이면 timestamp만)
+        :return: Pandas DataFrame
+        """
+        timestamps, data = self.read_arrays(ticker, interval, start=start, end=end, columns=columns)
+        index = pd.DatetimeIndex(timestamps.view('datetime64[ns]'), name='timestamp')
+        return pd.DataFrame(data, index=index, columns=list(data))
+
+    def read_arrays(self, ticker, interval, start=None, end=None, columns=None):
+        """
+        read와 같지만 DataFrame을 만들지 않고 numpy 배열을 반환하는 메서드 (여러 종목을 자주 읽을 때 사용)
+
+        :return: (int64 epoch-ns timestamp 배열, {컬럼: 배열})
+        """
+        meta = self._load_meta(ticker, interval)
+        if meta is None:
+            raise FileNotFoundError(f"{ticker} {interval} 데이터가 저장되어 있지 않습니다.")
+
+        if columns is None:
+            columns = list(meta['columns'])
+        dtypes = {c: meta['columns'][c] for c in columns}
+
+        start_ns = pd.Timestamp(start).as_unit('ns').value if start is not None else None
+        end_ns = pd.Timestamp(end).as_unit('ns').value if end is not None else None
+
+        partitions = self._partitions(ticker, interval)
+        if start_ns is not None:
+            first = self._partition_keys(np.array([start_ns]), interval)[0]
+            partitions = [p for p in partitions if p >= first]
+        if end_ns is not None:
+            last = self._partition_keys(np.array([end_ns]), interval)[0]
+            partitions = [p for p in partitions if p <= last]
+
+        ts_parts = []
+        col_parts = {c: [] for c in columns}
+        series_dir = self._series_dir(ticker, interval)
+        for partition in partitions:
+            partition_dir = os.path.join(series_dir, partition)
+            ts = self._read_column(partition_dir, 'timestamp', 'int64')
+            lo = int(np.searchsorted(ts, start_ns, side='left')) if start_ns is not None else 0
+            hi = int(np.searchsorted(ts, end_ns, side='right')) if end_ns is not None else len(ts)
+            if lo >= hi:
+                continue
+
+            ts_parts.append(np.array(ts[lo:hi]))
+            for c, d in dtypes.items():
+                col_parts[c].append(np.array(self._read_column(partition_dir, c, d)[lo:hi]))
+
+        if ts_parts:
+            timestamps = np.concatenate(ts_parts)
+            data = {c: np.concatenate(col_parts[c]) for c in columns}
+        else:
+            timestamps = np.empty(0, dtype='int64')
+            data = {c: np.empty(0, dtype=d) for c, d in dtypes.items()}
+
+        return timestamps, data
+
+    def last_timestamp(self, ticker, interval):
+        """
+        저장된 마지막 캔들의 timestamp를 확인하는 메서드
+
+        :return: Timestamp, 저장된 데이터가 없으면 None
+        """
+        series_dir = self._series_dir(ticker, interval)
+        for partition in reversed(self._partitions(ticker, interval)):
+            ts = self._read_column(os.path.join(series_dir, partition), 'timestamp', 'int64')
+            if len(ts) > 0:
+                return pd.Timestamp(int(ts[-1]))
+
+        return None
+
+    def tickers(self):
+        """
+        저장된 ticker list를 반환하는 메서드
+        """
+        if not os.path.exists(self.root):
+            return []
+        return sorted(t for t in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, t)))
+
+    def import_pickle(self, file_path, ticker, interval):
+        """
+        기존 save_ohlcv_to_pkl 형식의 pickle 파일을 저장소로 옮기는 메서드
+
+        :param file_path: 예시: './data/store/KRW-BTC_days_ohlcv_upbit.pkl'
+        """
+        df = pd.read_pickle(file_path)
+        df = normalize_ohlcv(df, source='yf' if 'adjclose' in df.columns else 'upbit')
+        self.write(df, ticker, interval)
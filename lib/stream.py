@@ -0,0 +1,258 @@
+import json
+import uuid
+import asyncio
+import threading
+import numpy as np
+
+try:
+    import websockets
+except ImportError:
+    websockets = None
+
+
+class RingBuffer:
+    """
+    최근 capacity개의 행만 보관하는 미리 할당된 numpy 링 버퍼
+    모든 행을 [i]와 [i + capacity]에 두 번 써서 최근 n개 행을 항상 연속된 view(복사 없음)로 꺼낼 수 있다.
+
+    :param capacity: 보관할 최대 행 수
+    :param columns: 컬럼 이름 list
+    """
+    def __init__(self, capacity, columns):
+        self.capacity = capacity
+        self.columns = list(columns)
+        self.data = np.full((capacity * 2, len(self.columns)), np.nan, dtype=np.float64)
+        self.timestamps = np.zeros(capacity * 2, dtype=np.int64)
+        self.count = 0
+        self.head = 0  # 다음에 쓸 위치
+
+    def __len__(self):
+        return min(self.count, self.capacity)
+
+    def append(self, timestamp, row):
+        i = self.head
+        self.data[i] = row
+        self.data[i + self.capacity] = row
+        self.timestamps[i] = timestamp
+        self.timestamps[i + self.capacity] = timestamp
+        self.head = (i + 1) % self.capacity
+        self.count += 1
+
+    def update_last(self, row):
+        """
+        마지막 행을 덮어쓰는 메서드 (진행 중인 캔들 갱신용)
+        """
+        i = (self.head - 1) % self.capacity
+        self.data[i] = row
+        self.data[i + self.capacity] = row
+
+    def last(self):
+        """
+        마지막 행 (복사 없는 view), 비어 있으면 None
+        """
+        if self.count == 0:
+            return None
+        return self.data[(self.head - 1) % self.capacity + self.capacity]
+
+    def view(self, n=None):
+        """
+        최근 n개 행을 오래된 순서로 담은 (timestamp 배열, 데이터 배열) view
+
+        :param n: 꺼낼 행 수 (비우면 보관 중인 전체)
+        """
+        n = len(self) if n is None else min(n, len(self))
+        end = self.head + self.capacity
+        return self.timestamps[end - n:end], self.data[end - n:end]
+
+    def column(self, name, n=None):
+        """
+        최근 n개 행의 한 컬럼 view
+        """
+        _, data = self.view(n)
+        return data[:, self.columns.index(name)]
+
+
+class CandleAggregator:
+    """
+    체결(trade)을 모아 ticker별 캔들을 RingBuffer에 만드는 클래스
+
+    :param interval: 캔들 주기 (초)
+    :param capacity: ticker별로 보관할 캔들 수
+    """
+    COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+    def __init__(self, interval=60, capacity=1000):
+        self.interval_ms = interval * 1000
+        self.capacity = capacity
+        self.buffers = {}
+        self.buckets = {}
+        self.late_trades = 0
+
+    def add_trade(self, code, timestamp_ms, price, volume):
+        """
+        :param code: 티커 ('KRW-BTC' 등)
+        :param timestamp_ms: 체결 시각 (epoch ms)
+        :param price: 체결 가격
+        :param volume: 체결량
+        """
+        buffer = self.buffers.get(code)
+        if buffer is None:
+            buffer = self.buffers[code] = RingBuffer(self.capacity, self.COLUMNS)
+
+        bucket = timestamp_ms // self.interval_ms
+        current = self.buckets.get(code)
+
+        if current is None or bucket > current:
+            self.buckets[code] = bucket
+            buffer.append(bucket * self.interval_ms * 1000000, (price, price, price, price, volume))
+        elif bucket == current:
+            row = buffer.last()
+            buffer.update_last((row[0], max(row[1], price), min(row[2], price), price, row[4] + volume))
+        else:
+            # 이미 닫힌 캔들에 늦게 도착한 체결은 버림
+            self.late_trades += 1
+
+    def candles(self, code, n=None):
+        """
+        최근 n개 캔들 view (timestamp는 epoch-ns, 마지막 캔들은 진행 중일 수 있음)
+
+        :return: (timestamp 배열, (n, 5) open/high/low/close/volume 배열), 데이터가 없으면 None
+        """
+        buffer = self.buffers.get(code)
+        if buffer is None:
+            return None
+        return buffer.view(n)
+
+
+class UpbitWebSocketClient:
+    """
+    Upbit WebSocket(ticker, trade, orderbook)을 asyncio로 받아 메모리에 보관하는 클래스
+    trade는 CandleAggregator로 캔들을 만들고, ticker와 orderbook은 종목별 최신 메시지만 보관한다.
+    연결이 끊기면(서버가 정상 종료한 경우 포함) backoff 후 다시 연결하고, 메시지를 받은 연결에서만 backoff를 초기화한다.
+
+    :param codes: 구독할 티커 list
+    :param url: WebSocket 주소 (테스트 시 로컬 재생 서버 주소로 변경 가능)
+    :param types: 구독할 메시지 종류
+    :param interval: 캔들 주기 (초)
+    :param capacity: ticker별로 보관할 캔들 수
+    :param on_message: 메시지마다 호출할 callback(message)
+    """
+    def __init__(self, codes, url="wss://api.upbit.com/websocket/v1", types=("ticker", "trade", "orderbook"), interval=60, capacity=1000, on_message=None):
+        self.codes = list(codes)
+        self.url = url
+        self.types = list(types)
+        self.aggregator = CandleAggregator(interval=interval, capacity=capacity)
+        self.tickers = {}
+        self.orderbooks = {}
+        self.on_message = on_message
+        self.running = False
+        self.thread = None
+        self.loop = None
+        self.ws = None
+        self.stopped = None
+
+    def _subscribe_message(self):
+        message = [{"ticket": str(uuid.uuid4())}]
+        message += [{"type": t, "codes": self.codes} for t in self.types]
+        return json.dumps(message)
+
+    def handle(self, message):
+        """
+        수신한 메시지 하나를 처리하는 메서드
+        """
+        if isinstance(message, (bytes, bytearray)):
+            message = message.decode('utf-8')
+        data = json.loads(message)
+
+        kind = data.get('type')
+        code = data.get('code')
+        if kind == 'trade':
+            self.aggregator.add_trade(code, data['trade_timestamp'], data['trade_price'], data['trade_volume'])
+        elif kind == 'ticker':
+            self.tickers[code] = data
+        elif kind == 'orderbook':
+            self.orderbooks[code] = data
+
+        if self.on_message is not None:
+            self.on_message(data)
+
+    async def run(self, max_backoff=30):
+        """
+        WebSocket에 연결해 stop()이 호출될 때까지 메시지를 받는 메서드
+        """
+        if websockets is None:
+            raise ImportError("websockets 패키지가 필요합니다. (pip install websockets)")
+
+        self.loop = asyncio.get_running_loop()
+        self.stopped = asyncio.Event()
+        self.running = True
+        backoff = 1
+        while self.running:
+            reason = "서버가 연결을 종료함"
+            try:
+                async with websockets.connect(self.url, ping_interval=60) as ws:
+                    self.ws = ws
+                    await ws.send(self._subscribe_message())
+                    print(f"[UpbitWebSocket] {self.codes} 구독 시작")
+                    async for message in ws:
+                        # 연결 직후 끊기는 서버에 계속 바로 재연결하지 않도록 메시지를 받은 뒤에만 backoff 초기화
+                        backoff = 1
+                        self.handle(message)
+                        if not self.running:
+                            break
+            except Exception as e:
+                reason = e
+            finally:
+                self.ws = None
+            if not self.running:
+                break
+
+            print(f"[UpbitWebSocket] 연결 끊김, {backoff}초 후 재연결: {reason}")
+            try:
+                await asyncio.wait_for(self.stopped.wait(), timeout=backoff)
+            except asyncio.TimeoutError:
+                pass
+            backoff = min(backoff * 2, max_backoff)
+
+    def start(self):
+        """
+        별도 스레드의 event loop에서 run()을 시작하는 메서드 (동기 코드에서 사용)
+        """
+        def target():
+            self.loop = asyncio.new_event_loop()
+            self.loop.run_until_complete(self.run())
+
+        self.thread = threading.Thread(target=target, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        """
+        run()을 끝내는 메서드 (다음 메시지나 backoff를 기다리지 않도록 연결을 닫고 대기를 깨움)
+        """
+        self.running = False
+        if self.loop is None or self.loop.is_closed():
+            return
+        if self.stopped is not None:
+            self.loop.call_soon_threadsafe(self.stopped.set)
+        if self.ws is not None:
+            asyncio.run_coroutine_threadsafe(self.ws.close(), self.loop)
+
+    def candles(self, code, n=None):
+        """
+        최근 n개 캔들 view (CandleAggregator.candles 참조)
+        """
+        return self.aggregator.candles(code, n)
+
+    def orderbook(self, code):
+        """
+        최근 orderbook 메시지, 없으면 None (OrderSlicer의 get_orderbook으로 사용 가능)
+        """
+        return self.orderbooks.get(code)
+
+    def current_price(self, code):
+        """
+        최근 ticker 메시지의 현재가, 없으면 None
+        """
+        ticker = self.tickers.get(code)
+        return ticker['trade_price'] if ticker else None
@@ -0,0 +1,163 @@
+import time
+import random
+import bisect
+import threading
+import requests
+
+from urllib.parse import urlparse
+from requests.adapters import HTTPAdapter
+
+
+class LatencyHistogram:
+    """
+    고정 구간(ms) 응답 시간 histogram
+
+    :param bounds: 구간 경계 (ms)
+    """
+    BOUNDS = (1, 2.5, 5, 10, 25, 50, 75, 100, 150, 250, 500, 750, 1000, 2500, 5000, 10000)
+
+    def __init__(self, bounds=BOUNDS):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        ms = seconds * 1000
+        with self.lock:
+            self.counts[bisect.bisect_left(self.bounds, ms)] += 1
+            self.count += 1
+            self.total += ms
+            if error:
+                self.errors += 1
+
+    def percentile(self, q):
+        """
+        q 분위 응답 시간의 근사값 (해당 구간의 상한, ms)
+        """
+        if self.count == 0:
+            return None
+        target = q * self.count
+        cumulative = 0
+        for i, c in enumerate(self.counts):
+            cumulative += c
+            if cumulative >= target:
+                return self.bounds[i] if i < len(self.bounds) else float('inf')
+
+    def summary(self):
+        return {
+            'count': self.count,
+            'errors': self.errors,
+            'mean_ms': self.total / self.count if self.count else None,
+            'p50_ms': self.percentile(0.5),
+            'p99_ms': self.percentile(0.99),
+        }
+
+
+class HTTPTransport:
+    """
+    fetcher와 exchanger가 함께 쓰는 keep-alive HTTP 요청 계층
+    host별 connection pool을 재사용하고, 429/5xx/JSON 오류 시 jitter backoff 후 재시도하며
+    endpoint별 응답 시간 histogram을 기록한다.
+
+    :param timeout: (연결, 읽기) timeout 초
+    :param max_retries: 최대 재시도 횟수
+    :param backoff: 재시도 대기 기본 초 (시도마다 2배, 0 ~ 해당 값 사이 무작위)
+    :param pool_maxsize: host별 최대 connection 수
+    """
+    RETRY_STATUS = (429, 500, 502, 503, 504)
+
+    def __init__(self, timeout=(3.05, 10), max_retries=3, backoff=0.5, pool_maxsize=32):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=8, pool_maxsize=pool_maxsize)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.histograms = {}
+
+    def _sleep(self, attempt):
+        time.sleep(random.uniform(0, self.backoff * (2 ** attempt)))
+
+    def request(self, method, url, endpoint=None, headers=None, rate_limiter=None, idempotent=True, parse_json=True, **kwargs):
+        """
+        HTTP 요청 메서드
+
+        :param method: 'GET', 'POST', 'DELETE'
+        :param endpoint: histogram 이름 (비우면 URL 경로)
+        :param headers: headers dict 또는 시도마다 새 headers를 만드는 함수 (JWT nonce 재생성용)
+        :param rate_limiter: 시도마다 토큰을 얻고 Remaining-Req 헤더로 보정할 RateLimiter
+        :param idempotent: False면 429(요청 거부)일 때만 재시도 (주문처럼 중복 실행되면 안 되는 요청)
+        :param parse_json: True면 JSON을 파싱해 (response, data) 반환, False면 (response, None)
+        :return: (requests.Response, 파싱한 JSON)
+        """
+        endpoint = endpoint or f"{method} {urlparse(url).path}"
+        histogram = self.histograms.get(endpoint) or self.histograms.setdefault(endpoint, LatencyHistogram())
+        kwargs.setdefault('timeout', self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if rate_limiter is not None:
+                rate_limiter.acquire()
+
+            start = time.perf_counter()
+            try:
+                response = self.session.request(method, url, headers=headers() if callable(headers) else headers, **kwargs)
+            except requests.RequestException:
+                histogram.observe(time.perf_counter() - start, error=True)
+                if not idempotent or attempt == self.max_retries:
+                    raise
+                self._sleep(attempt)
+                continue
+            histogram.observe(time.perf_counter() - start, error=response.status_code >= 400)
+
+            if rate_limiter is not None:
+                rate_limiter.update_from_header(response.headers.get('Remaining-Req'))
+                if response.status_code == 429:
+                    rate_limiter.penalize()
+
+            retryable = response.status_code == 429 or (idempotent and response.status_code in self.RETRY_STATUS)
+            if retryable and attempt < self.max_retries:
+                self._sleep(attempt)
+                continue
+
+            if not parse_json:
+                return response, None
+            try:
+                return response, response.json()
+            except ValueError:
+                if not idempotent or attempt == self.max_retries:
+                    raise
+                self._sleep(attempt)
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def delete(self, url, **kwargs):
+        return self.request('DELETE', url, **kwargs)
+
+    def stats(self):
+        """
+        endpoint별 응답 시간 요약 {endpoint: {'count', 'errors', 'mean_ms', 'p50_ms', 'p99_ms'}}
+        """
+        return {endpoint: h.summary() for endpoint, h in list(self.histograms.items())}
+
+
+_default_transport = None
+_default_lock = threading.Lock()
+
+
+def get_transport():
+    """
+    모든 fetcher, exchanger가 공유하는 기본 HTTPTransport
+    """
+    global _default_transport
+    with _default_lock:
+        if _default_transport is None:
+            _default_transport = HTTPTransport()
+        return _default_transport
@@ -2,11 +2,17 @@ import os
 import shutil
 import pandas as pd
 
+from lib.datasets import INTERVAL_FREQ, get_empty_ranges, fill_empty_rows_volume_zero
+from lib.store import OHLCVStore
+from lib.schema import SCHEMAS, normalize_ohlcv
+
 
 def save_ohlcv_to_pkl(data, file_name):
     temp_path = f"./data/temp/{file_name}.pkl"
     store_path = f"./data/store/{file_name}.pkl"
 
+    # 저장 시 schema로 맞춰 두면 불러올 때 변환이 필요 없음
+    data = normalize_ohlcv(data, source='yf' if 'adjclose' in data.columns else 'upbit')
     data.to_pickle(temp_path)
 
     if not os.path.exists(store_path):
@@ -15,10 +21,8 @@ def save_ohlcv_to_pkl(data, file_name):
         temp = pd.read_pickle(temp_path)
         store = pd.read_pickle(store_path)
 
-        store.update(temp)
-
-        overlap_index = store.index.intersection(temp.index)
-        store.loc[overlap_index] = temp.loc[overlap_index]
+        # 겹치는 구간은 temp 값으로 덮어쓰고 새 구간은 추가
+        store = temp.combine_first(store)
 
         store.to_pickle(store_path)
         os.remove(temp_path)
@@ -32,7 +36,99 @@ def load_ohlcv_pkl(file_path: str):
     :return: PandasDataFrame
     """
     df = pd.read_pickle(file_path)
-    df.index = pd.to_datetime(df.index)
-    df[['open', 'high', 'low', 'close', 'volume']] = df[['open', 'high', 'low', 'close', 'volume']].astype(float)
+
+    # save_ohlcv_to_pkl로 저장한 파일은 이미 schema에 맞으므로 변환 없이 그대로 반환
+    return normalize_ohlcv(df, source='yf' if 'adjclose' in df.columns else 'upbit')
+
+
+def save_ohlcv(data, ticker, interval, source='upbit'):
+    """
+    OHLCV DataFrame을 컬럼 단위 저장소에 저장하는 메서드
+    store 전체를 다시 쓰지 않고 새 캔들만 이어 씀
+
+    :param source: 저장소 하위 폴더 이름 ('upbit', 'yf' 등)
+    """
+    if source in SCHEMAS:
+        data = normalize_ohlcv(data, source=source)
+    OHLCVStore(f"./data/store/{source}").write(data, ticker, interval)
+
+
+def load_ohlcv(ticker, interval, start=None, end=None, columns=None, source='upbit'):
+    """
+    컬럼 단위 저장소에서 OHLCV를 불러오는 메서드
+    필요한 기간과 컬럼만 읽음
+
+    :param start: 시작 시각 (비우면 처음부터)
+    :param end: 끝 시각 (비우면 끝까지)
+    :param columns: 읽을 컬럼 list 예시: ['close', 'volume'] (비우면 전체)
+    :return: PandasDataFrame
+    """
+    return OHLCVStore(f"./data/store/{source}").read(ticker, interval, start=start, end=end, columns=columns)
+
+
+def _fetch_gaps(fetcher, ticker, interval, gaps, freq):
+    """
+    비어있는 구간마다 캔들을 다시 요청하는 메서드
+
+    :param gaps: get_empty_ranges 결과 [(구간 시작, 구간 끝), ...]
+    :return: 구간 안의 캔들 DataFrame list
+    """
+    frames = []
+    for start, end in gaps:
+        # Upbit의 to 파라미터는 해당 시각을 포함하지 않음
+        gap = fetcher.get_ohlcv(ticker=ticker, interval=interval, start_date=start, end_date=end + pd.Timedelta(freq))
+        frames.append(gap[(gap.index >= start) & (gap.index <= end)])
+    return frames
+
+
+def update_ohlcv(fetcher, ticker, interval, source='upbit', fill_gaps=True):
+    """
+    저장소에 없는 캔들만 수집해 저장하는 메서드
+    마지막 저장 캔들 이후의 캔들과 저장소 내부의 빈 구간만 요청하고, 저장된 데이터가 없으면 전체 기간을 수집
+    거래량 0으로 채운 행은 이후 빈 구간으로 보이지 않으므로 채우기 전에 빈 구간을 한 번 다시 요청한다.
+
+    :param fetcher: get_ohlcv(ticker, interval, start_date, end_date)를 가진 fetcher (UpbitOHLCVFetcher 등)
+    :param ticker: 티커 ('KRW-BTC' 등)
+    :param interval: 1m, 3m, ..., days, weeks, months
+    :param source: 저장소 하위 폴더 이름
+    :param fill_gaps: 저장소 내부의 빈 구간을 다시 요청할지 여부
+    :return: 새로 수집한 캔들 DataFrame
+    """
+    store = OHLCVStore(f"./data/store/{source}")
+    freq = INTERVAL_FREQ.get(interval)
+    last = store.last_timestamp(ticker, interval)
+    if last is None:
+        df = fetcher.get_ohlcv(ticker=ticker, interval=interval)
+        if len(df) == 0:
+            return df
+        if fill_gaps and freq is not None:
+            gaps = get_empty_ranges(df.reset_index(), freq)
+            df = pd.concat([df] + _fetch_gaps(fetcher, ticker, interval, gaps, freq)).sort_index()
+            df = df[~df.index.duplicated(keep='last')]
+        store.write(fill_empty_rows_volume_zero(df, freq=freq), ticker, interval)
+        return df
+
+    # 마지막 캔들은 수집 당시 미완성이었을 수 있으므로 다시 받아서 덮어씀
+    new = fetcher.get_ohlcv(ticker=ticker, interval=interval, start_date=last)
+    frames = [new[new.index >= last]]
+
+    gaps = []
+    if fill_gaps and freq is not None:
+        timestamps = store.read(ticker, interval, columns=[])
+        gaps = get_empty_ranges(timestamps.reset_index(), freq)
+        frames += _fetch_gaps(fetcher, ticker, interval, gaps, freq)
+
+    df = pd.concat(frames).sort_index()
+    df = df[~df.index.duplicated(keep='last')]
+    if len(df) == 0:
+        return df
+
+    store.write(df, ticker, interval)
+
+    # 다시 요청해도 비어있는 구간(거래 없음)은 거래량 0으로 채움
+    if gaps or len(df) > 1:
+        window_start = min([last] + [start - pd.Timedelta(freq) for start, _ in gaps]) if freq else last
+        window = store.read(ticker, interval, start=window_start)
+        store.write(fill_empty_rows_volume_zero(window, freq=freq), ticker, interval)
 
     return df
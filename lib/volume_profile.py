@@ -0,0 +1,268 @@
+import math
+import numpy as np
+import pandas as pd
+
+from concurrent.futures import ThreadPoolExecutor
+
+from lib.store import OHLCVStore
+
+
+ZONE_COLUMNS = ['low', 'high', 'price', 'volume_share']
+
+
+def _bin_step(resolution):
+    # 가격 bin은 log 가격 기준 같은 간격 (resolution=0.005이면 bin 하나가 0.5%)
+    return math.log1p(resolution)
+
+
+def _bin_index(prices, step):
+    return np.floor(np.log(np.asarray(prices, dtype=np.float64)) / step).astype(np.int64)
+
+
+def profile_histogram(high, low, volume, step, origin=None, size=None):
+    """
+    캔들의 거래량을 [low, high] 구간의 가격 bin에 고르게 나눠 더한 volume profile
+    캔들마다 loop를 돌지 않고 구간 시작/끝 bin에 +v, -v를 bincount로 더한 뒤 누적합을 구한다.
+
+    :param step: log 가격 bin 간격 (_bin_step 참조)
+    :param origin: 첫 bin의 번호 (비우면 최저가 bin)
+    :param size: bin 개수 (비우면 최고가 bin까지)
+    :return: (origin, 거래량 array)
+    """
+    lo = _bin_index(low, step)
+    hi = np.maximum(_bin_index(high, step), lo)
+    volume = np.asarray(volume, dtype=np.float64)
+
+    if origin is None:
+        origin = int(lo.min())
+    if size is None:
+        size = int(hi.max()) - origin + 1
+
+    per_bin = volume / (hi - lo + 1)
+    diff = np.bincount(lo - origin, weights=per_bin, minlength=size + 1)
+    diff -= np.bincount(hi - origin + 1, weights=per_bin, minlength=size + 1)
+
+    return origin, np.cumsum(diff[:size])
+
+
+def _smooth(hist, width):
+    if width <= 0 or len(hist) < 3:
+        return hist
+    kernel = np.hanning(2 * width + 3)[1:-1]
+    return np.convolve(hist, kernel / kernel.sum(), mode='same')
+
+
+def zones_from_histogram(origin, hist, step, smooth=2, threshold=0.5, min_share=0.02, max_zones=10):
+    """
+    volume profile의 봉우리(매물대)를 찾아 가격 구간으로 바꾸는 메서드
+    봉우리에서 좌우로 거래량이 봉우리의 threshold 배 아래로 떨어지는 bin까지를 한 구간으로 본다.
+    큰 봉우리부터 고르고, 이미 고른 구간과 겹치는 봉우리는 건너뛴다.
+
+    :param smooth: 봉우리를 찾기 전 평활화 폭 (bin 수, 0이면 사용 안함)
+    :param threshold: 구간 경계 기준 (봉우리 거래량 대비 비율)
+    :param min_share: 전체 거래량 중 이 비율보다 작은 구간은 제외
+    :param max_zones: 최대 구간 수
+    :return: low, high, price (봉우리 가격), volume_share 컬럼의 DataFrame (가격 순)
+    """
+    total = hist.sum()
+    if len(hist) == 0 or total <= 0:
+        return pd.DataFrame(columns=ZONE_COLUMNS, dtype=np.float64)
+
+    density = _smooth(hist, smooth)
+    padded = np.concatenate([[-np.inf], density, [-np.inf]])
+    peaks = np.flatnonzero((padded[1:-1] > padded[:-2]) & (padded[1:-1] >= padded[2:]))
+    peaks = peaks[np.argsort(density[peaks], kind='stable')[::-1]]
+
+    cumulative = np.concatenate([[0.0], np.cumsum(hist)])
+    taken = np.zeros(len(hist), dtype=bool)
+    rows = []
+    for peak in peaks:
+        if taken[peak]:
+            continue
+        outside = (density < density[peak] * threshold) | taken
+        left_edges = np.flatnonzero(outside[:peak])
+        right_edges = np.flatnonzero(outside[peak + 1:])
+        left = left_edges[-1] + 1 if len(left_edges) else 0
+        right = peak + right_edges[0] if len(right_edges) else len(hist) - 1
+
+        share = (cumulative[right + 1] - cumulative[left]) / total
+        if share < min_share:
+            continue
+        taken[left:right + 1] = True
+        rows.append((
+            math.exp((origin + left) * step),
+            math.exp((origin + right + 1) * step),
+            math.exp((origin + peak + 0.5) * step),
+            share,
+        ))
+        if len(rows) >= max_zones:
+            break
+
+    return pd.DataFrame(rows, columns=ZONE_COLUMNS, dtype=np.float64).sort_values('price', ignore_index=True)
+
+
+def find_zones(df, resolution=0.005, **kwargs):
+    """
+    OHLCV DataFrame의 매물대(가격 구간)를 찾는 메서드
+    test/find_volume_profile_with__hdbscan.ipynb의 HDBSCAN 군집 min/max 선을
+    거래량 가중 가격 histogram의 봉우리 구간으로 대신한다. (1차원이므로 정렬/bincount 한 번이면 충분)
+    high, low가 없으면 close에 거래량을 모두 더한다.
+
+    :param resolution: 가격 bin 폭 (비율, 0.005 = 0.5%)
+    :param kwargs: zones_from_histogram 인자
+    :return: low, high, price, volume_share 컬럼의 DataFrame
+    """
+    df = df[df['volume'] > 0]
+    if len(df) == 0:
+        return pd.DataFrame(columns=ZONE_COLUMNS, dtype=np.float64)
+
+    step = _bin_step(resolution)
+    high = df['high'] if 'high' in df.columns else df['close']
+    low = df['low'] if 'low' in df.columns else df['close']
+    origin, hist = profile_histogram(high.to_numpy(), low.to_numpy(), df['volume'].to_numpy(), step)
+
+    return zones_from_histogram(origin, hist, step, **kwargs)
+
+
+def nearest_zones(zones, price):
+    """
+    현재 가격 아래의 가장 가까운 지지 구간과 위의 가장 가까운 저항 구간
+
+    :return: (support, resistance) zone dict, 없으면 None
+    """
+    below = zones[zones['high'] <= price]
+    above = zones[zones['low'] >= price]
+    support = below.iloc[-1].to_dict() if len(below) else None
+    resistance = above.iloc[0].to_dict() if len(above) else None
+    return support, resistance
+
+
+class VolumeProfile:
+    """
+    새 캔들이 들어올 때마다 갱신하는 volume profile (캔들 하나당 O(걸친 bin 수))
+    bin은 log 가격 기준으로 고정되어 있어 가격 범위가 넓어져도 기존 bin을 다시 나누지 않고 array만 늘린다.
+    halflife를 주면 오래된 캔들의 거래량이 반감기마다 절반이 된다. (매번 전체를 곱하지 않고 새 캔들의 가중치를 키움)
+    같은 캔들로 seed한 결과는 find_zones와 같다.
+
+    :param resolution: 가격 bin 폭 (비율)
+    :param halflife: 거래량 반감기 (캔들 수, 비우면 감쇠 없음)
+    :param kwargs: zones_from_histogram 인자
+    """
+    GROW = 64
+
+    def __init__(self, resolution=0.005, halflife=None, **kwargs):
+        self.step = _bin_step(resolution)
+        self.growth = 2 ** (1 / halflife) if halflife else 1.0
+        self.weight = 1.0
+        self.zone_options = kwargs
+        self.origin = None
+        self.hist = np.zeros(0)
+
+    def _reserve(self, lo, hi):
+        # bin 번호 [lo, hi]가 array 안에 들어오도록 양쪽으로 여유를 두고 늘림
+        if self.origin is None:
+            self.origin = lo - self.GROW
+            self.hist = np.zeros(hi - lo + 1 + 2 * self.GROW)
+            return
+        end = self.origin + len(self.hist)
+        left = max(self.origin - lo, 0)
+        right = max(hi + 1 - end, 0)
+        if left or right:
+            left = left and left + self.GROW
+            right = right and right + self.GROW
+            self.hist = np.concatenate([np.zeros(left), self.hist, np.zeros(right)])
+            self.origin -= left
+
+    def _rescale(self):
+        # 가중치가 너무 커지기 전에 전체를 나눠 정규화 (결과 zone은 비율이므로 변하지 않음)
+        if self.weight > 1e100:
+            self.hist /= self.weight
+            self.weight = 1.0
+
+    def update(self, high, low, volume):
+        """
+        캔들 하나를 더하는 메서드
+        """
+        if volume <= 0:
+            return
+        lo = int(math.floor(math.log(low) / self.step))
+        hi = max(int(math.floor(math.log(high) / self.step)), lo)
+        self._reserve(lo, hi)
+        self.weight *= self.growth
+        self.hist[lo - self.origin:hi - self.origin + 1] += volume * self.weight / (hi - lo + 1)
+        self._rescale()
+
+    def seed(self, df):
+        """
+        여러 캔들을 한 번에 더하는 벡터화 메서드 (update를 반복한 결과와 같음)
+        """
+        df = df[df['volume'] > 0]
+        if len(df) == 0:
+            return self
+        high = (df['high'] if 'high' in df.columns else df['close']).to_numpy()
+        low = (df['low'] if 'low' in df.columns else df['close']).to_numpy()
+        volume = df['volume'].to_numpy(dtype=np.float64)
+
+        lo = _bin_index(low, self.step)
+        hi = np.maximum(_bin_index(high, self.step), lo)
+        self._reserve(int(lo.min()), int(hi.max()))
+
+        weights = 1.0
+        if self.growth > 1:
+            # i번째 캔들 가중치 weight * growth^i, 마지막 캔들 가중치가 1이 되도록 기존 profile과 함께 나눔
+            log_growth = math.log(self.growth)
+            self.hist *= math.exp(-math.log(self.weight) - len(df) * log_growth)
+            weights = np.exp((np.arange(1, len(df) + 1) - len(df)) * log_growth)
+            self.weight = 1.0
+        _, hist = profile_histogram(high, low, volume * weights, self.step, origin=self.origin, size=len(self.hist))
+        self.hist += hist
+
+        return self
+
+    def zones(self, **kwargs):
+        """
+        현재 profile의 매물대 (find_zones 참조)
+        """
+        if self.origin is None:
+            return pd.DataFrame(columns=ZONE_COLUMNS, dtype=np.float64)
+        return zones_from_histogram(self.origin, self.hist, self.step, **{**self.zone_options, **kwargs})
+
+
+def find_zones_many(frames, max_workers=8, **kwargs):
+    """
+    여러 종목의 매물대를 동시에 찾는 메서드 (numpy 연산은 GIL을 놓으므로 thread pool 사용)
+
+    :param frames: {ticker: OHLCV DataFrame}
+    :return: {ticker: zones DataFrame}
+    """
+    tickers = list(frames)
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="volume-profile") as pool:
+        zones = pool.map(lambda t: find_zones(frames[t], **kwargs), tickers)
+        return dict(zip(tickers, zones))
+
+
+def scan_universe(interval='days', tickers=None, start=None, source='upbit', store=None, max_workers=8, **kwargs):
+    """
+    저장소의 모든 종목(또는 tickers)의 매물대를 찾는 메서드
+    종목마다 high, low, volume 컬럼만 읽어 읽기와 계산을 함께 thread pool에서 처리한다.
+
+    :param interval: 저장소 interval ('days', '60m' 등)
+    :param start: 이 시각 이후 캔들만 사용 (비우면 전체)
+    :param source: 저장소 하위 폴더 이름
+    :param store: 읽을 OHLCVStore (비우면 ./data/store/{source})
+    :return: {ticker: zones DataFrame} (데이터가 없는 종목은 제외)
+    """
+    store = store or OHLCVStore(f"./data/store/{source}")
+    tickers = store.tickers() if tickers is None else tickers
+
+    def scan(ticker):
+        try:
+            df = store.read(ticker, interval, start=start, columns=['high', 'low', 'volume'])
+        except FileNotFoundError:
+            return None
+        return find_zones(df, **kwargs)
+
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="volume-profile") as pool:
+        results = dict(zip(tickers, pool.map(scan, tickers)))
+
+    return {t: z for t, z in results.items() if z is not None}
@@ -4,92 +4,100 @@ load_dotenv()
 import requests
 import pyupbit
 import pandas as pd
-import pandas_ta as ta
 import json
 from openai import OpenAI
 from datetime import datetime
-import time
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.service import Service
-from webdriver_manager.chrome import ChromeDriverManager
 
+from lib.engines import get_upbit_exchanger
+from lib.indicators import add_indicators
+from lib.news import GoogleNewsCollector
+from lib.cache import TTLCache
+from lib.gather import gather_inputs
+from lib.screener import UniverseScreener
+from lib.metrics import metrics
+from lib.payload import PayloadBuilder, estimate_tokens, to_json, compact_market_data, compact_orderbook, compact_news, compact_fear_greed
 
-upbit = pyupbit.Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+
+exchanger = get_upbit_exchanger()    # trading.py와 같은 private client 공유
 client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+news_collector = GoogleNewsCollector(mode='browser', pool_size=1, ttl=600)
+input_cache = TTLCache(ttl=3600)    # 하루 단위로 바뀌는 입력(완성된 일봉, 공포 탐욕 지수) 캐시
+last_input_timings = {}
+payload_builder = None
+screener = UniverseScreener(interval='days', lookback=120)    # 저장소 전체 종목 순위 (새 캔들만 읽어 갱신)
+
+# 기본 종목 {ticker: 뉴스 검색어}, config.json의 params.tickers로 변경 가능
+BASKET = {"KRW-BTC": "bitcoin"}
+
+# 토큰 예산을 넘을 때 단계별로 줄여 보낼 크기
+MARKET_ROWS = [90, 60, 30, 14]
+NEWS_LIMITS = [None, 20, 10, 5]
+FEAR_GREED_DAYS = [30, 14, 7]
+ORDERBOOK_LEVELS = [15, 5, 3, 1]
+PACK_LEVEL = 2  # 한 번의 요청에 넣을 종목 수를 정할 때 가정하는 축소 단계
+TOKEN_BUDGET = 16000
+
+# 고정 지시문 뒤에 붙는 여러 종목 응답 형식 (고정 문자열이므로 prompt cache prefix에 포함됨)
+BATCH_INSTRUCTIONS = """
+
+## Multiple Trading Pairs
+Data 1 (News) and Data 2 (Market Analysis) are objects keyed by ticker (e.g. "KRW-BTC"), each value has the structure described above.
+Data 4 (Current Investment State) contains `current_time`, `krw_balance` and `assets`, an object keyed by ticker with `orderbook`, `balance` (amount of the coin held) and `avg_buy_price`.
+Decide independently for every ticker, sharing the KRW balance among them. Respond with one entry per ticker:
+(Response: {
+    "decisions": [
+        {"ticker": "KRW-BTC", "decision": "buy", "percentage": 20, "reason": "~~"},
+        {"ticker": "KRW-ETH", "decision": "hold", "percentage": 0, "reason": "~~"}
+    ]
+})
+"""
 
 def crawl_google_news(keyword):
-    service = Service(ChromeDriverManager().install())
+    # 모듈이 registry에 유지되는 동안 Chrome을 재사용하고, 같은 keyword는 10분 동안 캐시
+    return news_collector.collect(keyword, when='1d')  # 지난 24시간
 
-    options = webdriver.ChromeOptions()
-    options.add_argument('--headless')
-    options.add_argument('--no-sandbox')
-    options.add_argument('--disable-dev-shm-usage')
+def fetch_daily_candles(ticker, count=90):
+    # 완성된 일봉은 UTC 날짜가 바뀔 때까지 캐시하고, 진행 중인 오늘 일봉만 새로 요청
+    today = datetime.utcnow().date()
+    history = input_cache.get_or_compute(
+        ('days', ticker, today, count),
+        lambda: pyupbit.get_ohlcv(ticker, "day", count=count).iloc[:-1],
+        ttl=86400,
+    )
+    current = pyupbit.get_ohlcv(ticker, "day", count=1)
 
-    driver = webdriver.Chrome(service=service, options=options)
-    
-    try:
-        base_url = f'https://news.google.com/search?q={keyword}' # &hl=ko&gl=KR&ceid=KR:ko
-        search_url = base_url.format(keyword=keyword + ' when:1d') # 지난 24시간
-        
-        driver.get(search_url)
-        time.sleep(5) # 페이지가 완전히 로드될 때까지 기다림
-        
-        titles = driver.find_elements(By.CLASS_NAME, 'JtKRv')
-        timestamps = driver.find_elements(By.CLASS_NAME, 'hvbAAd')
-        
-        result = []
-        for title, timestamp in zip(titles, timestamps):
-            result.append({
-                "Title": title.text,
-                "Timestamp": timestamp.get_attribute('datetime'), 
-                "Time": timestamp.text
-                })
-        
-        return json.dumps(result)
-    finally:
-        driver.quit()
+    df = pd.concat([history, current])
+    df = df[~df.index.duplicated(keep='last')]
+
+    return df.iloc[-count:].copy()
 
 def fetch_and_prepare_data(ticker):
-    df = pyupbit.get_ohlcv(ticker, "day", count=90)
-
-    def add_indicators(df):
-        # Moving Averages
-        df['SMA_20'] = ta.sma(df['close'], length=20)
-        df['SMA_60'] = ta.sma(df['close'], length=60)
-
-        # RSI
-        df['RSI_14'] = ta.rsi(df['close'], length=14)
-
-        # Bollinger Bands
-        df['Middle_Band'] = df['close'].rolling(window=20).mean()
-        std_dev = df['close'].rolling(window=20).std()
-        df['Upper_Band'] = df['Middle_Band'] + (std_dev * 2)
-        df['Lower_Band'] = df['Middle_Band'] - (std_dev * 2)
-
-        return df
-
-    df = add_indicators(df)
-    df = df.to_json(orient='split')
-
-    return json.dumps(df)
-
-def get_current_status():
-    orderbook = pyupbit.get_orderbook(ticker="KRW-BTC")
-    current_time = orderbook['timestamp']
-    btc_balance = 0
-    krw_balance = 0
-    btc_avg_buy_price = 0
-    balances = upbit.get_balances()
-    for b in balances:
-        if b['currency'] == "BTC":
-            btc_balance = b['balance']
-            btc_avg_buy_price = b['avg_buy_price']
-        if b['currency'] == "KRW":
-            krw_balance = b['balance']
-
-    current_status = {'current_time': current_time, 'orderbook': orderbook, 'btc_balance': btc_balance, 'krw_balance': krw_balance, 'btc_avg_buy_price': btc_avg_buy_price}
-    return json.dumps(current_status)
+    df = fetch_daily_candles(ticker, count=90)
+
+    return add_indicators(df)
+
+def get_current_status(tickers=("KRW-BTC",)):
+    # 잔고와 호가는 종목 수와 관계없이 한 번씩만 요청
+    orderbooks = pyupbit.get_orderbook(ticker=list(tickers))
+    if isinstance(orderbooks, dict):
+        orderbooks = [orderbooks]
+    balances = {b['currency']: b for b in exchanger.get_account()}
+
+    assets = {}
+    for orderbook in orderbooks:
+        balance = balances.get(orderbook['market'].split('-')[1], {})
+        assets[orderbook['market']] = {
+            'orderbook': orderbook,
+            'balance': balance.get('balance', 0),
+            'avg_buy_price': balance.get('avg_buy_price', 0),
+        }
+
+    current_status = {
+        'current_time': max(orderbook['timestamp'] for orderbook in orderbooks),
+        'krw_balance': balances.get('KRW', {}).get('balance', 0),
+        'assets': assets,
+    }
+    return current_status
 
 def fetch_fear_and_greed_index(limit=1, date_format=''):
     """
@@ -98,7 +106,7 @@ def fetch_fear_and_greed_index(limit=1, date_format=''):
     - limit (int): Number of results to return. Default is 1.
     - date_format (str): Date format ('us', 'cn', 'kr', 'world'). Default is '' (unixtime).
     Returns:
-    - dict or str: The Fear and Greed Index data in the specified format.
+    - list: The Fear and Greed Index data (newest first).
     """
     base_url = "https://api.alternative.me/fng/"
     params = {
@@ -106,12 +114,11 @@ def fetch_fear_and_greed_index(limit=1, date_format=''):
         'format': 'json',
         'date_format': date_format
     }
-    response = requests.get(base_url, params=params)
-    myData = response.json()['data']
-    resStr = ""
-    for data in myData:
-        resStr += str(data)
-    return resStr
+    # 지수는 하루 한 번 갱신되므로 1시간 동안 캐시
+    return input_cache.get_or_compute(
+        ('fng', limit, date_format),
+        lambda: requests.get(base_url, params=params, timeout=10).json()['data'],
+    )
 
 def get_instructions(file_path):
     try:
@@ -123,51 +130,198 @@ def get_instructions(file_path):
     except Exception as e:
         print("An error occurred while reading the file:", e)
 
-def analyze_data_with_gpt(ticker="KRW-BTC", keyword="bitcoin", model="gpt-3.5-turbo"):
-    try:
-        data_json = fetch_and_prepare_data(ticker)
-        news_json = crawl_google_news(keyword)
-        fear_and_greed = fetch_fear_and_greed_index(limit=30)
-        current_status = get_current_status()
-
-        instructions_path = "./gpt/instructions.md"
-        instructions = get_instructions(instructions_path)
+def get_payload_builder(file_path="./gpt/instructions.md"):
+    # 지시문은 한 번만 읽어 고정된 system prefix로 재사용 (prompt cache)
+    global payload_builder
+    if payload_builder is None:
+        instructions = get_instructions(file_path)
         if not instructions:
-            print("No instructions found.")
             return None
-        
-        response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {"role": "system", "content": instructions},
-                {"role": "user", "content": news_json},
-                {"role": "user", "content": data_json},
-                {"role": "user", "content": fear_and_greed},
-                {"role": "user", "content": current_status}
-            ],
-            response_format={"type":"json_object"}
+        payload_builder = PayloadBuilder(instructions + BATCH_INSTRUCTIONS, budget=TOKEN_BUDGET, ttl=300)
+    return payload_builder
+
+_EXHAUSTED = object()
+
+def _level(sizes, level):
+    return sizes[level] if level < len(sizes) else _EXHAUSTED
+
+def _sections(tickers, basket, inputs):
+    """
+    종목 묶음의 메시지 섹션 [(이름, render(level)), ...] (Data 1 ~ Data 4 순서)
+    """
+    status = inputs['current_status']
+
+    def news(level):
+        limit = _level(NEWS_LIMITS, level)
+        if limit is _EXHAUSTED:
+            return None
+        return {t: compact_news(inputs['news'].get(basket[t], []), limit=limit) for t in tickers}
+
+    def market(level):
+        rows = _level(MARKET_ROWS, level)
+        if rows is _EXHAUSTED:
+            return None
+        return {t: compact_market_data(inputs['market'][t], rows=rows) for t in tickers}
+
+    def fear_greed(level):
+        days = _level(FEAR_GREED_DAYS, level)
+        if days is _EXHAUSTED:
+            return None
+        return compact_fear_greed(inputs['fear_and_greed'], limit=days)
+
+    def current_status(level):
+        levels = _level(ORDERBOOK_LEVELS, level)
+        if levels is _EXHAUSTED:
+            return None
+        assets = {
+            t: dict(status['assets'][t], orderbook=compact_orderbook(status['assets'][t]['orderbook'], levels=levels))
+            for t in tickers if t in status['assets']
+        }
+        return dict(status, assets=assets)
+
+    return [('news', news), ('market', market), ('fear_and_greed', fear_greed), ('current_status', current_status)]
+
+def plan_batches(builder, tickers, basket, inputs):
+    """
+    토큰 예산 안에서 종목을 최소 개수의 요청으로 나누는 메서드
+    종목별 크기를 PACK_LEVEL 기준으로 추정해 순서대로 채운다.
+    """
+    def cost(batch):
+        return sum(estimate_tokens(to_json(render(PACK_LEVEL))) for _, render in _sections(batch, basket, inputs))
+
+    shared = cost([])
+    available = builder.budget - builder.instructions_tokens - shared
+
+    batches, current, used = [], [], 0
+    for ticker in tickers:
+        size = cost([ticker]) - shared
+        if current and used + size > available:
+            batches.append(current)
+            current, used = [], 0
+        current.append(ticker)
+        used += size
+    if current:
+        batches.append(current)
+
+    return batches
+
+def _parse_decisions(advice, tickers):
+    if 'decisions' not in advice and len(tickers) == 1:
+        advice = {'decisions': [dict(advice, ticker=tickers[0])]}
+
+    decisions = {}
+    for d in advice.get('decisions', []):
+        if d.get('ticker') in tickers:
+            decisions[d['ticker']] = d
+    return decisions
+
+def analyze_basket(basket, model="gpt-3.5-turbo"):
+    """
+    여러 종목의 입력을 한 번에 모으고, 토큰 예산이 허락하는 만큼 묶어 GPT에 요청하는 메서드
+
+    :param basket: {ticker: 뉴스 검색어}
+    :return: {ticker: {'decision', 'percentage', 'reason'}}
+    """
+    try:
+        builder = get_payload_builder()
+        if builder is None:
+            print("No instructions found.")
+            return {}
+
+        tickers = list(basket)
+        keywords = set(basket.values())
+
+        # 서로 독립적인 입력을 동시에 수집 (잔고/호가/공포 탐욕 지수는 종목 수와 관계없이 한 번만 요청)
+        sources = {('market', t): (lambda t=t: fetch_and_prepare_data(t)) for t in tickers}
+        sources.update({('news', k): (lambda k=k: crawl_google_news(k)) for k in keywords})
+        sources['fear_and_greed'] = lambda: fetch_fear_and_greed_index(limit=30)
+        sources['current_status'] = lambda: get_current_status(tickers)
+
+        results, timings = gather_inputs(
+            sources,
+            timeouts={('news', k): 20 for k in keywords},
+            fallbacks={**{key: None for key in sources if key[0] in ('market', 'news')}, 'fear_and_greed': []},
         )
-        advice = response.choices[0].message.content
-        return json.loads(advice)
+        last_input_timings.clear()
+        last_input_timings.update(timings)
+        for name, timing in timings.items():
+            metrics.observe('input', timing['seconds'], error=timing['status'] != 'ok', source=name[0] if isinstance(name, tuple) else name)
+        print(f"[coinGPT] 입력 수집 시간: {max(v['seconds'] for v in timings.values()):.3f}s ({len(sources)}개 소스)")
+
+        inputs = {
+            'market': {t: results[('market', t)] for t in tickers if results[('market', t)] is not None},
+            'news': {k: results[('news', k)] or [] for k in keywords},
+            'fear_and_greed': results['fear_and_greed'],
+            'current_status': results['current_status'],
+        }
+        # 일봉이나 호가를 받지 못한 종목은 이번 결정에서 제외
+        tickers = [t for t in tickers if t in inputs['market'] and t in inputs['current_status']['assets']]
+        if not tickers:
+            return {}
+
+        batches = plan_batches(builder, tickers, basket, inputs)
+
+        def request(batch):
+            messages, tokens = builder.build(_sections(batch, basket, inputs))
+            print(f"[coinGPT] {len(batch)}개 종목 요청, 입력 토큰 추정: {tokens}")
+            advice = builder.complete(client, model, messages, response_format={"type": "json_object"})
+            return _parse_decisions(json.loads(advice), batch)
+
+        # 묶음별 GPT 요청도 동시에 실행
+        answers, timings = gather_inputs(
+            {i: (lambda b=b: request(b)) for i, b in enumerate(batches)},
+            fallbacks={i: {} for i in range(len(batches))},
+            default_timeout=120,
+        )
+        for timing in timings.values():
+            metrics.observe('llm_batch', timing['seconds'], error=timing['status'] != 'ok', model=model)
+
+        decisions = {}
+        for i in range(len(batches)):
+            decisions.update(answers[i])
+        return decisions
     except Exception as e:
         print(f"Error in analyzing data with GPT: {e}")
-        return None
-    
-def strategy():
-    ticker = "KRW-BTC"
-    keyword = "bitcoin"
-
-    advice = analyze_data_with_gpt(
-        ticker=ticker, 
-        keyword=keyword, 
-        model="gpt-4-turbo-preview"
-    )
+        return {}
+
+def analyze_data_with_gpt(ticker="KRW-BTC", keyword="bitcoin", model="gpt-3.5-turbo"):
+    return analyze_basket({ticker: keyword}, model=model).get(ticker)
+
+def close():
+    """
+    StrategyRegistry가 모듈을 다시 불러오거나 프로그램이 끝날 때 호출 (news browser pool의 Chrome 종료)
+    """
+    news_collector.close()
+
+def strategy(tickers=None, model="gpt-4-turbo-preview", screen=0):
+    """
+    :param tickers: {ticker: 뉴스 검색어} 또는 ticker list (검색어는 코인 심볼), 비우면 BASKET
+    :param screen: 저장소 전체 종목 중 screener 점수 상위 몇 종목을 basket에 더할지 (검색어는 코인 심볼)
+    :return: [(ticker, action, percentage, price), ...]
+    """
+    if tickers is None:
+        basket = dict(BASKET)
+    elif isinstance(tickers, dict):
+        basket = dict(tickers)
+    else:
+        basket = {t: t.split('-')[1] for t in tickers}
+
+    if screen:
+        try:
+            for ticker in screener.candidates(top=screen):
+                basket.setdefault(ticker, ticker.split('-')[1])
+        except Exception as e:
+            print(f"[coinGPT] 종목 screening 실패: {e}")
+
+    decisions = []
+    for ticker, advice in analyze_basket(basket, model=model).items():
+        action = advice["decision"]
+        percentage = advice["percentage"]
+        price = None    # 시장가
 
-    action = advice["decision"]
-    percentage = advice["percentage"]
-    price = None    # 시장가
+        if percentage > 1:
+            percentage /= 100
 
-    if percentage > 1:
-        percentage /= 100
+        decisions.append((ticker, action, percentage, price))
 
-    return ticker, action, percentage, price
\ No newline at end of file
+    return decisions
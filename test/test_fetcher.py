@@ -0,0 +1,96 @@
+import json
+import time
+import threading
+
+import pandas as pd
+import pytest
+
+from datetime import datetime
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+from lib.engines import UpbitOHLCVFetcher, RateLimiter
+from lib.transport import HTTPTransport
+
+DAYS = pd.date_range('2023-01-01', '2023-12-31', freq='1D')
+
+
+class CandleHandler(BaseHTTPRequestHandler):
+    # Upbit /candles/days처럼 to 이전 캔들을 최신순으로 count개씩 돌려주는 stub (Remaining-Req sec=0으로 속도 제한)
+    requests = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Remaining-Req', 'group=candles; min=1800; sec=0')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        CandleHandler.requests.append(time.monotonic())
+        if query['market'] == 'KRW-BAD':
+            return self._send(404, {'error': {'name': 'Code not found', 'message': 'market does not exist'}})
+
+        to = pd.Timestamp(query['to'])
+        days = DAYS[DAYS < to][::-1][:int(query['count'])]
+        self._send(200, [
+            {
+                'candle_date_time_utc': d.strftime('%Y-%m-%dT%H:%M:%S'),
+                'opening_price': 100.0, 'high_price': 110.0, 'low_price': 90.0, 'trade_price': 105.0,
+                'candle_acc_trade_volume': 1.0,
+            }
+            for d in days
+        ])
+
+
+@pytest.fixture
+def server():
+    CandleHandler.requests = []
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), CandleHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/v1"
+    httpd.shutdown()
+
+
+def test_get_ohlcv_many_collects_pages_and_reports_failures(server):
+    fetcher = UpbitOHLCVFetcher(server_url=server, rate_limiter=RateLimiter(rate=20), transport=HTTPTransport())
+    tickers = ['KRW-A', 'KRW-B', 'KRW-BAD', 'KRW-C']
+
+    start = time.monotonic()
+    results, failures = fetcher.get_ohlcv_many(tickers, start_date=datetime(2023, 1, 1), end_date=datetime(2024, 1, 1))
+    elapsed = time.monotonic() - start
+
+    assert sorted(results) == [('KRW-A', 'days'), ('KRW-B', 'days'), ('KRW-C', 'days')]
+    for df in results.values():
+        assert len(df) == len(DAYS)
+        assert df.index.is_monotonic_increasing
+    assert list(failures) == [('KRW-BAD', 'days')]
+
+    # 종목마다 200개, 165개, 빈 페이지 3번 요청, Remaining-Req sec=0이면 토큰이 매번 0으로 보정되어 초당 20회로 제한
+    requests = len(CandleHandler.requests)
+    assert requests == 3 * 3 + 1
+    # 처음 동시에 나간 종목별 첫 요청 이후에는 응답 헤더로 보정된 속도를 따름 (헤더가 없으면 capacity 20개가 바로 나감)
+    assert elapsed >= (requests - len(tickers)) / 20 * 0.9
+
+
+def test_get_ohlcv_many_isolates_callback_errors(server):
+    fetcher = UpbitOHLCVFetcher(server_url=server, rate_limiter=RateLimiter(rate=100), transport=HTTPTransport())
+    seen = []
+
+    def callback(ticker, interval, df):
+        if ticker == 'KRW-A':
+            raise ValueError('저장 실패')
+        seen.append((ticker, interval, len(df)))
+
+    results, failures = fetcher.get_ohlcv_many(['KRW-A', 'KRW-B'], ['days'], start_date=datetime(2023, 12, 1),
+                                               end_date=datetime(2024, 1, 1), callback=callback)
+    assert results == {}
+    assert seen == [('KRW-B', 'days', 200)]    # 첫 페이지에 start_date 이전 캔들이 있으므로 한 페이지만 요청
+    assert isinstance(failures[('KRW-A', 'days')], ValueError)
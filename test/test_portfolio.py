@@ -0,0 +1,320 @@
+import time
+
+import pytest
+
+from lib.backtest import SimulatedExchanger, SimulatedBookExchanger
+from lib.execution import ExecutionEngine
+from lib.portfolio import Portfolio, Ledger
+from lib.slicing import TWAPSlicer
+
+FEE = 0.0005
+
+
+def settle(portfolio, timeout=2):
+    # 백그라운드 tracker와 함께 poll해서 추적 중인 주문이 모두 ledger에 반영될 때까지 대기
+    deadline = time.monotonic() + timeout
+    while portfolio.pending and time.monotonic() < deadline:
+        portfolio.engine.poll()
+        time.sleep(0.01)
+    assert not portfolio.pending
+
+
+def make_portfolio(exchanger, prices, **kwargs):
+    kwargs.setdefault('state_path', None)
+    engine = kwargs.pop('engine', None) or ExecutionEngine(exchanger, poll_interval=0.01, balance_ttl=0)
+    portfolio = Portfolio(engine, get_prices=lambda tickers: {t: prices[t] for t in tickers}, **kwargs)
+    engine.on_fill = portfolio.on_fill
+    return portfolio
+
+
+def buy_and_fill(portfolio, exchanger, name, decisions, bar):
+    orders = portfolio.plan(name, decisions)
+    portfolio.track(name, orders, portfolio.engine.submit(orders))
+    exchanger.on_bar(*bar)
+    settle(portfolio)
+    return orders
+
+
+@pytest.fixture
+def market():
+    exchanger = SimulatedExchanger(balance=1000000, fee=FEE)
+    prices = {'KRW-BTC': 10000.0}
+    return exchanger, prices
+
+
+def test_ledger_apply_fill():
+    ledger = Ledger('a', 100000)
+    ledger.apply_fill('KRW-BTC', 'bid', 2.0, 20000.0, 10.0)
+    assert ledger.cash == pytest.approx(79990.0)
+    assert ledger.positions['KRW-BTC'] == {'volume': 2.0, 'cost': 20010.0}
+
+    ledger.apply_fill('KRW-BTC', 'ask', 1.0, 15000.0, 7.5)
+    assert ledger.cash == pytest.approx(94982.5)
+    assert ledger.realized == pytest.approx(15000.0 - 7.5 - 10005.0)
+    assert ledger.positions['KRW-BTC']['volume'] == pytest.approx(1.0)
+
+    ledger.apply_fill('KRW-BTC', 'ask', 1.0, 5000.0, 2.5)
+    assert 'KRW-BTC' not in ledger.positions
+    assert ledger.value({}) == pytest.approx(ledger.cash)
+
+
+def test_buy_reserves_then_fill_matches_exchange(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    ledger = portfolio.allocate('a', 500000)
+
+    orders = portfolio.plan('a', [('KRW-BTC', 'buy', 0.5, None)])
+    assert orders == [{'ticker': 'KRW-BTC', 'side': 'bid', 'ord_type': 'price', 'price': round(250000 * (1 - FEE))}]
+    assert ledger.reserved == round(250000 * (1 - FEE))
+    # 예약 금액은 다음 plan에서 다시 쓰지 않음
+    assert ledger.available == pytest.approx(500000 - 250000 * (1 - FEE))
+
+    portfolio.track('a', orders, portfolio.engine.submit(orders))
+    exchanger.on_bar('KRW-BTC', 1, 10000, 10100, 9900, 10000)
+    settle(portfolio)
+
+    funds = round(250000 * (1 - FEE))
+    assert ledger.reserved == 0
+    assert ledger.cash == pytest.approx(500000 - funds * (1 + FEE))
+    assert ledger.volume('KRW-BTC') == pytest.approx(exchanger.get_balance('KRW-BTC'))
+    assert 1000000 - exchanger.get_balance('KRW') == pytest.approx(500000 - ledger.cash)
+
+    orders = portfolio.plan('a', [('KRW-BTC', 'sell', 1.0, None)])
+    assert orders == [{'ticker': 'KRW-BTC', 'side': 'ask', 'ord_type': 'market', 'volume': round(funds / 10000, 8)}]
+    portfolio.track('a', orders, portfolio.engine.submit(orders))
+    exchanger.on_bar('KRW-BTC', 2, 11000, 11100, 10900, 11000)
+    settle(portfolio)
+
+    proceeds = funds / 10000 * 11000
+    assert ledger.positions == {}
+    assert ledger.cash == pytest.approx(500000 - funds * (1 + FEE) + proceeds * (1 - FEE))
+    assert ledger.realized == pytest.approx(proceeds * (1 - FEE) - funds * (1 + FEE))
+
+
+def test_strategies_do_not_share_cash(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    a = portfolio.allocate('a', 300000)
+    b = portfolio.allocate('b', 700000)
+
+    buy_and_fill(portfolio, exchanger, 'a', [('KRW-BTC', 'buy', 1.0, None)], ('KRW-BTC', 1, 10000, 10000, 10000, 10000))
+    assert a.available < 1
+    assert b.cash == 700000
+
+    # b는 a의 보유 수량을 팔 수 없음
+    assert portfolio.plan('b', [('KRW-BTC', 'sell', 1.0, None)]) == []
+
+
+def test_max_position_caps_buys(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    ledger = portfolio.allocate('a', 1000000, max_position=0.3)
+
+    orders = buy_and_fill(portfolio, exchanger, 'a', [('KRW-BTC', 'buy', 1.0, None)], ('KRW-BTC', 1, 10000, 10000, 10000, 10000))
+    assert orders[0]['price'] == round(300000 * (1 - FEE))
+    assert ledger.volume('KRW-BTC') * 10000 == pytest.approx(300000 * (1 - FEE))
+
+    # 이미 한도만큼 보유하고 있으므로 남은 여유가 최소 주문 금액보다 작아 건너뜀
+    assert portfolio.plan('a', [('KRW-BTC', 'buy', 1.0, None)]) == []
+    assert ledger.reserved == 0
+
+
+def test_drawdown_halts_buys_until_reset(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    ledger = portfolio.allocate('a', 1000000, drawdown_stop=0.2)
+
+    buy_and_fill(portfolio, exchanger, 'a', [('KRW-BTC', 'buy', 0.9, None)], ('KRW-BTC', 1, 10000, 10000, 10000, 10000))
+    assert not ledger.halted
+
+    prices['KRW-BTC'] = 7000.0
+    portfolio.refresh_prices(['KRW-BTC'])
+    assert ledger.halted
+    assert portfolio.exposure('a')['drawdown'] < -0.2
+
+    assert portfolio.plan('a', [('KRW-BTC', 'buy', 1.0, None)]) == []
+    # 매도는 계속 가능
+    assert [o['side'] for o in portfolio.plan('a', [('KRW-BTC', 'sell', 0.5, None)])] == ['ask']
+
+    portfolio.reset('a')
+    assert not ledger.halted
+    assert len(portfolio.plan('a', [('KRW-BTC', 'buy', 0.5, None)])) == 1
+
+
+class RejectingExchanger(SimulatedExchanger):
+    # 잔고 부족 등 4xx 응답처럼 uuid 없는 error dict를 반환
+    def request_order(self, ticker, side, ord_type, volume=None, price=None):
+        return {'error': {'name': 'insufficient_funds_bid', 'message': '주문가능한 금액(KRW)이 부족합니다.'}}
+
+
+def test_rejected_order_releases_reservation():
+    prices = {'KRW-BTC': 10000.0}
+    portfolio = make_portfolio(RejectingExchanger(balance=1000000), prices)
+    ledger = portfolio.allocate('a', 1000000)
+
+    orders = portfolio.plan('a', [('KRW-BTC', 'buy', 0.5, None)])
+    results = portfolio.engine.submit(orders)
+    assert 'error' in results[0]
+    portfolio.track('a', orders, results)
+    assert ledger.reserved == 0
+    assert ledger.cash == 1000000
+
+
+def test_release_unsubmitted_orders(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    ledger = portfolio.allocate('a', 1000000)
+
+    orders = portfolio.plan('a', [('KRW-BTC', 'buy', 0.5, None), ('KRW-BTC', 'buy', 0.2, 9000)])
+    assert ledger.reserved > 0
+    portfolio.release('a', orders)
+    assert ledger.reserved == pytest.approx(0, abs=1e-6)
+
+
+def test_market_sell_without_funds_refetches_order(market):
+    exchanger, prices = market
+    portfolio = make_portfolio(exchanger, prices)
+    ledger = portfolio.allocate('a', 1000000)
+    buy_and_fill(portfolio, exchanger, 'a', [('KRW-BTC', 'buy', 0.5, None)], ('KRW-BTC', 1, 10000, 10000, 10000, 10000))
+    volume = ledger.volume('KRW-BTC')
+    cash = ledger.cash
+
+    order = exchanger.request_order('KRW-BTC', 'ask', 'market', volume=volume)
+    portfolio.pending[order['uuid']] = ('a', 0.0)
+    exchanger.on_bar('KRW-BTC', 2, 12000, 12000, 12000, 12000)
+
+    # trades, executed_funds가 빠진 응답이어도 0원으로 반영하지 않음
+    stripped = {k: v for k, v in exchanger.get_order(order['uuid']).items() if k not in ('trades', 'executed_funds')}
+    portfolio.on_fill(stripped)
+    assert ledger.cash == pytest.approx(cash + volume * 12000 * (1 - FEE))
+    assert ledger.positions == {}
+
+
+class NoFundsExchanger(SimulatedExchanger):
+    # 체결 금액(trades, executed_funds)이 빠진 주문 조회 응답만 돌려줌
+    def get_order(self, uuid):
+        return {k: v for k, v in super().get_order(uuid).items() if k not in ('trades', 'executed_funds')}
+
+
+def test_unknown_funds_release_pending_order():
+    exchanger = NoFundsExchanger(balance=1000000, fee=FEE)
+    portfolio = make_portfolio(exchanger, {'KRW-BTC': 10000.0}, retry_delay=0)
+    ledger = portfolio.allocate('a', 1000000)
+    ledger.positions['KRW-BTC'] = {'volume': 1.0, 'cost': 10000.0}
+    exchanger.balances['BTC'] = 1.0
+
+    # 시장가 매도는 trades, executed_funds가 없으면 체결 금액을 알 수 없음
+    order = exchanger.request_order('KRW-BTC', 'ask', 'market', volume=1.0)
+    with portfolio.lock:
+        portfolio.pending[order['uuid']] = ('a', 0.0)
+        portfolio.pending['bid'] = ('a', 20000.0)
+        ledger.reserved = 20000.0
+    exchanger.on_bar('KRW-BTC', 1, 12000, 12000, 12000, 12000)
+
+    portfolio.on_fill(exchanger.get_order(order['uuid']))
+    assert order['uuid'] not in portfolio.pending
+    assert ledger.cash == 1000000    # 0원으로 반영하지 않음
+
+    # 매수 주문도 금액을 알 수 없으면 예약 금액을 해제
+    portfolio.on_fill({'uuid': 'bid', 'market': 'KRW-BTC', 'side': 'bid', 'ord_type': 'limit', 'executed_volume': '1.0'})
+    assert 'bid' not in portfolio.pending
+    assert ledger.reserved == 0
+
+
+class LookupExchanger(SimulatedExchanger):
+    # 거래소에 없는 uuid 조회는 Upbit처럼 error dict로 응답
+    def get_order(self, uuid):
+        if uuid not in self.orders:
+            return {'error': {'name': 'order_not_found', 'message': '주문을 찾지 못했습니다.'}}
+        return super().get_order(uuid)
+
+
+def test_pending_orders_survive_restart(tmp_path):
+    exchanger = LookupExchanger(balance=1000000, fee=FEE)
+    prices = {'KRW-BTC': 10000.0}
+    state_path = str(tmp_path / 'portfolio.json')
+    portfolio = make_portfolio(exchanger, prices, state_path=state_path)
+    portfolio.allocate('a', 1000000)
+
+    # 지정가 매수는 열린 채로, 시장가 매수는 재시작 전에 체결, 'missing'은 거래소에 없는 주문
+    orders = portfolio.plan('a', [('KRW-BTC', 'buy', 0.5, 9000)])
+    results = portfolio.engine.submit(orders)
+    portfolio.track('a', orders, results)
+    filled = exchanger.request_order('KRW-BTC', 'bid', 'price', price=100000)
+    with portfolio.lock:
+        portfolio.pending[filled['uuid']] = ('a', 100000.0)
+        portfolio.pending['missing'] = ('a', 50000.0)
+        portfolio.ledgers['a'].reserved += 150000.0
+    portfolio.save()
+    exchanger.on_bar('KRW-BTC', 1, 10000, 10000, 10000, 10000)
+
+    restarted = make_portfolio(exchanger, prices, state_path=state_path)
+    ledger = restarted.ledgers['a']
+    assert list(restarted.pending) == [results[0]['uuid']]
+    assert ledger.volume('KRW-BTC') == pytest.approx(100000 / 10000)
+    assert ledger.reserved == pytest.approx(orders[0]['price'] * orders[0]['volume'])
+
+    # 열린 주문은 새 engine이 다시 추적해 체결을 반영
+    exchanger.on_bar('KRW-BTC', 2, 9000, 9000, 9000, 9000)
+    settle(restarted)
+    assert ledger.reserved == pytest.approx(0, abs=1e-6)
+    assert ledger.volume('KRW-BTC') == pytest.approx(100000 / 10000 + orders[0]['volume'])
+
+
+def test_volatility_ignores_tick_noise():
+    portfolio = Portfolio(None, state_path=None)
+    for i in range(6):
+        portfolio.mark({'X': 100 * (1.001 if i % 2 else 1)}, now=1000 + 2 * i)
+    assert portfolio.volatility('X') is None
+
+    portfolio.seed_volatility({'X': 0.03})
+    seeded = portfolio.volatility('X')
+    assert seeded == pytest.approx(0.03 * 365 ** 0.5)
+    portfolio.mark({'X': 100.1}, now=1020)
+    assert portfolio.volatility('X') == seeded
+
+
+class BookAccount(SimulatedBookExchanger):
+    # 분할 주문 검증용 호가 모의 거래소에 잔고 조회만 추가
+    def get_account(self):
+        return [{'currency': 'KRW', 'balance': '100000000'}]
+
+
+def test_sliced_buy_applies_reports():
+    book = BookAccount(ticker='KRW-XRP', price=1000, depth=1000)
+    portfolio = make_portfolio(book, {'KRW-XRP': 1000.5})
+    ledger = portfolio.allocate('a', 1000000)
+
+    orders = portfolio.plan('a', [('KRW-XRP', 'buy', 0.5, None)])
+    slicer = TWAPSlicer(book, book.get_orderbook, duration=10, slices=5, sleep=book.sleep, clock=book.clock)
+    reports = portfolio.engine.run_sliced(orders, slicer)
+    portfolio.apply_reports('a', orders, reports)
+
+    report = reports[0]
+    assert report['executed_volume'] > 0
+    assert ledger.reserved == 0
+    assert ledger.volume('KRW-XRP') == pytest.approx(report['executed_volume'])
+    assert ledger.cash == pytest.approx(1000000 - report['executed_funds'] - report['paid_fee'])
+
+
+class RejectAfter(SimulatedBookExchanger):
+    # accepted개 child 이후의 주문은 error dict로 거부
+    def __init__(self, accepted, **kwargs):
+        super().__init__(**kwargs)
+        self.accepted = accepted
+
+    def request_order(self, *args, **kwargs):
+        if self.accepted == 0:
+            return {'error': {'name': 'invalid_price_bid', 'message': '호가 단위가 맞지 않습니다.'}}
+        self.accepted -= 1
+        return super().request_order(*args, **kwargs)
+
+
+def test_slicer_returns_partial_report_on_rejection():
+    book = RejectAfter(2, ticker='KRW-XRP', price=1000, depth=1000)
+    slicer = TWAPSlicer(book, book.get_orderbook, duration=10, slices=5, sleep=book.sleep, clock=book.clock)
+    report = slicer.run('KRW-XRP', 'bid', volume=500)
+
+    assert report['children'] == 2
+    assert report['executed_volume'] == pytest.approx(200)
+    assert report['remaining'] == pytest.approx(300)
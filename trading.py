@@ -1,127 +1,255 @@
 import os
 import re
-import pyupbit
-import pandas as pd
-import schedule
-import time
 import json
-from datetime import datetime
 from dotenv import load_dotenv
 load_dotenv()
-import importlib.util
 
-upbit = pyupbit.Upbit(os.getenv("UPBIT_ACCESS_KEY"), os.getenv("UPBIT_SECRET_KEY"))
+from lib.scheduler import StrategyScheduler, WEEKDAYS
+from lib.registry import StrategyRegistry
+from lib.engines import get_upbit_exchanger
+from lib.transport import get_transport
+from lib.execution import ExecutionEngine
+from lib.portfolio import Portfolio
+from lib.screener import UniversePanel, compute_factors
+from lib.metrics import metrics, JSONLExporter, serve_prometheus
+from lib.slicing import TWAPSlicer, IcebergSlicer
 
-def execute_buy_upbit(ticker, percentage, balance, price=None):
+exchanger = get_upbit_exchanger()    # 전략 모듈과 같은 private client를 공유
+engine = ExecutionEngine(exchanger)    # 잔고/미체결 주문 캐시, 동시 주문 제출, 체결 추적
+portfolio = Portfolio(engine, get_prices=exchanger.get_current_price)    # 전략별 sub-ledger와 위험 한도
+engine.on_fill = portfolio.on_fill
+registry = StrategyRegistry("./strategies")   # 전략 모듈은 한 번만 불러오고 파일이 바뀌면 다시 불러옴
+
+def make_slicer(execution):
+    """
+    config.json의 execution 설정으로 주문 분할 알고리즘을 만드는 함수
+    예: {"algo": "twap", "duration": 300, "slices": 10}, {"algo": "iceberg", "participation": 0.5, "refresh": 2, "timeout": 300}
+    """
+    options = dict(execution)
+    algo = options.pop("algo")
+    if algo == "twap":
+        return TWAPSlicer(exchanger, exchanger.get_orderbook, **options)
+    if algo == "iceberg":
+        return IcebergSlicer(exchanger, exchanger.get_orderbook, **options)
+    raise ValueError(f"{algo} is not available execution algorithm")
+
+def execute_buy_upbit(ticker, percentage, balance, price=None, execution=None, strategy="manual"):
     """
     Upbit 매수 주문 함수
     price를 비우면 시장가 매수
     :param ticker: 주문할 ticker
-    :param percentage: 가용 금액 대비 주문 비율
+    :param percentage: 전략 가용 금액 대비 주문 비율
+    :param balance: 전략에 할당된 금액
     :param price: 호가
+    :param execution: 주문 분할 설정 (비우면 한 번에 주문)
+    :param strategy: 주문을 기록할 전략 sub-ledger 이름
     """
-    print(f"Attempting to buy {ticker} with KRW balance...")
-    try:
-        krw_balance = upbit.get_balance("KRW")
-        amount_to_invest = krw_balance * (percentage)
-        if price:
-            result = upbit.buy_limit_order(ticker, price, amount_to_invest*0.9995)  # Adjust for fees
-        else:
-            result = upbit.buy_market_order(ticker, amount_to_invest*0.9995)  # Adjust for fees
-        print("Buy order successful:", result)
-    except Exception as e:
-        print(f"Failed to execute buy order: {e}")
+    print(f"Attempting to buy {ticker} with {strategy} KRW balance...")
+    return execute_upbit([(ticker, "buy", percentage, price)], balance, execution, strategy)
 
-def execute_sell_upbit(ticker, percentage, balance, price=None):
+def execute_sell_upbit(ticker, percentage, balance, price=None, execution=None, strategy="manual"):
     """
     Upbit 매도 주문 함수 
     price를 비우면 시장가 매도
     :param ticker: 주문할 ticker
-    :param percentage: 가용 금액 대비 주문 비율
+    :param percentage: 전략 보유 수량 대비 주문 비율
+    :param balance: 전략에 할당된 금액
     :param price: 호가
+    :param execution: 주문 분할 설정 (비우면 한 번에 주문)
+    :param strategy: 주문을 기록할 전략 sub-ledger 이름
     """
     print(f"Attempting to sell {ticker}...")
+    return execute_upbit([(ticker, "sell", percentage, price)], balance, execution, strategy)
+
+def execute_upbit(decisions, balance, execution=None, strategy="manual", sell_timeout=30):
+    """
+    Upbit 여러 종목 주문 함수
+    주문 크기는 portfolio가 전략 sub-ledger(할당 금액 balance)와 위험 한도, 캐시된 잔고로 정함
+    매도를 먼저 실행하고 체결을 ledger에 반영한 뒤 매수 주문을 만들어 매도 대금을 같은 rebalance에서 쓸 수 있게 함
+    execution이 없으면 한 번에 동시 제출 (체결은 engine이 백그라운드에서 추적해 ledger에 반영)
+    execution이 있으면 종목별로 TWAP/iceberg 분할 주문을 동시에 실행하고 slippage를 보고
+    :param decisions: [(ticker, action, percentage, price), ...]
+    :param balance: 전략에 할당된 금액
+    :param execution: 주문 분할 설정 (make_slicer 참조)
+    :param strategy: 전략 sub-ledger 이름
+    :param sell_timeout: 매수 전에 매도 체결을 기다리는 최대 시간(초), 지나면 체결된 매도까지만 반영하고 매수
+    :return: 매도, 매수 순서의 주문 결과 list
+    """
+    sells = [d for d in decisions if d[1] == "sell"]
+    buys = [d for d in decisions if d[1] == "buy"]
+    if not sells and not buys:
+        return []
+    print(f"Attempting to execute {len(sells) + len(buys)} orders...")
     try:
-        btc_balance = upbit.get_balance(ticker)
-        amount_to_sell = btc_balance * (percentage)
-        if price:
-            result = upbit.sell_limit_order(ticker, price, amount_to_sell)
-        else:
-            result = upbit.sell_market_order(ticker, amount_to_sell)
-        print("Sell order successful:", result)
+        portfolio.allocate(strategy, balance)
     except Exception as e:
-        print(f"Failed to execute sell order: {e}")
+        print(f"Failed to execute orders: {e}")
+        return []
 
-def excute_strategy(st):
-    try:
-        spec = importlib.util.spec_from_file_location(st, f"./strategies/{st}.py")
-        strategy = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(strategy)
+    results = []
+    if sells:
+        sold = submit_upbit(sells, execution, strategy)
+        if not execution:
+            # 지정가 매도는 timeout 안에 체결되지 않을 수 있으므로 끝난 주문만 먼저 반영 (나머지는 engine이 계속 추적)
+            finished = engine.wait([r['uuid'] for r in sold if 'uuid' in r], timeout=sell_timeout)
+            for order in finished.values():
+                portfolio.on_fill(order)
+        results += sold
+    if buys:
+        results += submit_upbit(buys, execution, strategy)
+    print("Orders submitted:", results)
+    return results
 
-        ticker, action, percentage, price = strategy.strategy()
+def submit_upbit(decisions, execution=None, strategy="manual"):
+    """
+    전략 sub-ledger 기준으로 주문을 만들어 제출하는 함수 (execute_upbit 참조)
+    :return: 주문 결과 list (실패하면 빈 list)
+    """
+    orders, handed_off = [], False
+    try:
+        orders = portfolio.plan(strategy, decisions)
+        if execution:
+            results = engine.run_sliced(orders, make_slicer(execution))
+            handed_off = True
+            portfolio.apply_reports(strategy, orders, results)
+        else:
+            results = engine.submit(orders)
+            handed_off = True
+            portfolio.track(strategy, orders, results)
+        return results
+    except Exception as e:
+        print(f"Failed to execute orders: {e}")
+        if not handed_off:
+            # plan에서 예약한 매수 금액은 apply_reports/track에서만 해제되므로 실행 전에 실패하면 여기서 해제
+            portfolio.release(strategy, orders)
+        return []
 
-        return ticker, action, percentage, price
+def excute_strategy(st, params=None):
+    """
+    전략 실행 함수
+    :param params: strategy()에 넘길 인자 (config.json의 params)
+    :return: [(ticker, action, percentage, price), ...] (결정 하나만 반환하는 전략도 list로 변환)
+    """
+    try:
+        decisions = registry.run(st, **(params or {}))
+        if decisions is None:
+            return []
+        if isinstance(decisions, tuple):
+            return [decisions]
+        return list(decisions)
     except Exception as e:
         print(f"{st}전략 실행 실패 ", e)
+        return []
 
 
-def make_decision_and_execute(st, market, balance):
+def make_decision_and_execute(st, market, balance, params=None, execution=None, cancel=None):
     """
     전략 및 주문 실행 함수
     :param st: 실행할 전략
     :param balance: 해당 전략에 할당된 가용 금액
+    :param params: strategy()에 넘길 인자
+    :param execution: 주문 분할 설정
+    :param cancel: 스케줄러가 제한 시간을 넘기면 set하는 threading.Event (set이면 주문하지 않음)
+    :return: 실행한 결정 list
     """
     print(f"Making decision of {st} in {market} and executing...")
     try:
-        ticker, action, percentage, price = excute_strategy(st)
-        if market == "upbit":
-            if action == "buy":
-                execute_buy_upbit(ticker, percentage, balance, price)
-            elif action == "sell":
-                execute_sell_upbit(ticker, percentage, balance, price)
-        elif market == "yahoo":
-            return
-        elif market == "binance":
-            return
-        elif market == "yahoo":
-            return
-        else:
-            print(f"{market} is not available market")
-            return
+        # 전략 로드/결정(registry), 데이터 입력과 LLM 호출(전략), 주문 제출/체결(execution) 시간이 하나의 trace record로 묶임
+        with metrics.trace('decide_and_execute', strategy=st):
+            decisions = excute_strategy(st, params)
+            if cancel is not None and cancel.is_set():
+                # 제한 시간이 지난 결정으로 늦게 주문하지 않음
+                print(f"{st}: 제한 시간을 넘겨 주문을 건너뜀")
+                return decisions
+            if market == "upbit":
+                with metrics.timer('execute', strategy=st):
+                    execute_upbit(decisions, balance, execution, strategy=st)
+            elif market == "yahoo":
+                return
+            elif market == "binance":
+                return
+            elif market == "yahoo":
+                return
+            else:
+                print(f"{market} is not available market")
+                return
 
-        return ticker, action, percentage, price
+        return decisions
     except Exception as e:
         print(f"Failed to make decisions in strategies: {e}")
 
+def seed_volatility(lookback=60):
+    """
+    저장소의 일봉으로 계산한 종목별 변동성(screener의 volatility factor)으로 portfolio 변동성 추정치를 초기화하는 함수
+    실행 중 가격 조회만으로는 하루에 표본 하나만 생기므로 시작 시와 매일 다시 채움
+    """
+    try:
+        panel = UniversePanel.from_store(interval="days", columns=("close", "volume")).tail(lookback)
+        if len(panel) == 0:
+            return
+        volatilities = compute_factors(panel)["volatility"].to_dict()
+        portfolio.seed_volatility(volatilities)
+        print(f"[Portfolio] {len(volatilities)}개 종목 변동성 초기화")
+    except Exception as e:
+        print(f"[Portfolio] 변동성 초기화 실패: {e}")
+
 def load_strategies():
     with open('./config.json') as file:
         strategies = json.load(file)
 
     return strategies
 
+def register_strategies(scheduler, strategies):
+    """
+    config.json의 전략을 스케줄러에 등록하는 함수
+    cycle: 정수 - N일마다 time에 실행, 요일 - 매주 해당 요일 time에 실행, "30s"/"5m"/"1h" - 해당 주기마다 실행
+    timeout: 전략 실행 제한 시간(초, 선택), 결정이 이 시간 안에 나오지 않으면 주문하지 않음
+    params: strategy()에 넘길 인자 (선택, 예: {"tickers": {"KRW-BTC": "bitcoin", "KRW-ETH": "ethereum"}})
+    execution: 주문 분할 설정 (선택, 예: {"algo": "twap", "duration": 300, "slices": 10}), timeout은 duration보다 길게 설정
+    risk: 전략 위험 한도 (선택, 예: {"max_position": 0.5, "target_volatility": 0.6, "drawdown_stop": 0.2})
+    """
+    for st, v in strategies.items():
+        cycle, market, balance, t = v["cycle"], v["market"], v["balance"], v.get("time", "00:00")  # 7 or "monday", "upbit", 500000, '08:00'
+        timeout = v.get("timeout")
+        params = v.get("params", {})
+        execution = v.get("execution")
+        portfolio.allocate(st, balance, **v.get("risk", {}))
+        if type(cycle) == int:
+            scheduler.daily(t, make_decision_and_execute, st, market, balance, params, execution, days=cycle, name=st, timeout=timeout)
+        elif cycle in WEEKDAYS:
+            scheduler.weekly(cycle, t, make_decision_and_execute, st, market, balance, params, execution, name=st, timeout=timeout)
+        elif re.fullmatch(r"\d+[smh]", cycle):
+            seconds = int(cycle[:-1]) * {"s": 1, "m": 60, "h": 3600}[cycle[-1]]
+            scheduler.every(seconds, make_decision_and_execute, st, market, balance, params, execution, name=st, timeout=timeout)
+        else:
+            print(f"{st}: {cycle} is not available cycle")
+
 if __name__ == "__main__":
     strategies = load_strategies()
 
-    for st, v in strategies.items():
-        cycle, market, balance, t = v # 7 or "monday", '08:00', 500000
-        if type(cycle) == int:
-            schedule.every(cycle).day.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "monday":
-            schedule.every().monday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "tuesday":
-            schedule.every().tuesday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "wednesday":
-            schedule.every().wednesday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "thursday":
-            schedule.every().thursday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "friday":
-            schedule.every().friday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "saturday":
-            schedule.every().saturday.at(t).do(make_decision_and_execute, st, market, balance)
-        elif cycle == "sunday":
-            schedule.every().sunday.at(t).do(make_decision_and_execute, st, market, balance)
+    scheduler = StrategyScheduler()
+    register_strategies(scheduler, strategies)
+
+    seed_volatility()
+    scheduler.daily("09:05", seed_volatility, name="volatility")    # Upbit 일봉은 09:00(KST)에 바뀜
+
+    # 단계별 시간과 transport/scheduler/registry 통계를 함께 보고
+    metrics.register_collector("transport", get_transport().stats)
+    metrics.register_collector("scheduler", scheduler.stats)
+    metrics.register_collector("registry", registry.stats)
+    if os.getenv("METRICS_JSONL"):
+        metrics.add_exporter(JSONLExporter(os.getenv("METRICS_JSONL")))
+        scheduler.every(300, metrics.export, name="metrics")
+    if os.getenv("METRICS_PORT"):
+        serve_prometheus(metrics, port=int(os.getenv("METRICS_PORT")), host=os.getenv("METRICS_HOST", "127.0.0.1"))
 
     print("자동 매매 시작\n", strategies)
-    while True:
-        schedule.run_pending()
-        time.sleep(1)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        print(scheduler.stats())
+        print(registry.stats())
+        print({st: portfolio.exposure(st) for st in strategies})
+        print(metrics.summary(collectors=False)["timings"])
+        scheduler.stop(wait=False)
+        registry.close()
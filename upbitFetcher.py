@@ -1,17 +1,21 @@
 from lib.engines import UpbitOHLCVFetcher
-from lib.datasets import fill_empty_rows_volume_zero
-from lib.utils import save_ohlcv_to_pkl
+from lib.utils import update_ohlcv
+from lib.resample import resample_store
 
 
 fetcher = UpbitOHLCVFetcher()
 
 tickers = fetcher.get_all_tickers_list()    # ["KRW-BTC", "KRW-ETH"] 로 설정해도 됨
-intervals = ["days", "weeks"]   # 1m, 3m, 5m, 10m, 15m, 30m, 60m, 240m, days, weeks, months
+base_interval = "days"    # Upbit에서 수집하는 interval (1m로 설정하면 모든 분봉도 만들 수 있음)
+intervals = ["weeks", "months"]   # base_interval 캔들로 만드는 interval: 3m, 5m, 10m, 15m, 30m, 60m, 240m, days, weeks, months
 
-for ticker in tickers:
-    for interval in intervals:
-        df = fetcher.get_ohlcv(ticker=ticker, interval=interval)
-        df = fill_empty_rows_volume_zero(df)
 
-        file_name = f"{ticker}_{interval}_ohlcv_upbit"
-        save_ohlcv_to_pkl(df, file_name)
+def update(ticker, interval):
+    # 저장소에 없는 base 캔들만 수집 (저장된 데이터가 없으면 전체 기간 수집) 후 나머지 interval은 저장소에서 만듦
+    df = update_ohlcv(fetcher, ticker, interval, source='upbit')
+    resample_store(ticker, intervals, base=interval, source='upbit')
+    return df
+
+
+# 모든 요청은 fetcher.rate_limiter를 공유하므로 Upbit 요청 제한에 맞춰 동시에 수집 (실패한 종목은 마지막에 보고)
+_, failures = fetcher.get_ohlcv_many(tickers, [base_interval], max_workers=8, callback=lambda *args: None, fetch=update)
@@ -1,6 +1,8 @@
+import pandas as pd
+
 from lib.engines import YHFOHLCVFetcher
 from lib.datasets import fill_empty_rows_volume_zero
-from lib.utils import save_ohlcv_to_pkl
+from lib.utils import save_ohlcv
 
 
 fetcher = YHFOHLCVFetcher()
@@ -12,6 +14,6 @@ for ticker in tickers:
     for interval in intervals:
         df = fetcher.get_ohlcv(ticker=ticker, interval=interval)
         df = fill_empty_rows_volume_zero(df)
+        df.index = pd.to_datetime(df.index)
 
-        file_name = f"{ticker}_{interval}_ohlcv_yf"
-        save_ohlcv_to_pkl(df, file_name)
+        save_ohlcv(df, ticker, interval, source='yf')